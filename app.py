@@ -99,6 +99,18 @@ def create_app():
         db.create_all()
         print("✅ Database initialized!")
 
+    # ==============================================================
+    # VISION WARM-UP (compile + first inferences before students join)
+    # ==============================================================
+    from backend.services.vision import start_warm_up
+    start_warm_up()
+
+    # ==============================================================
+    # PROCTOR SESSION SWEEPER (evicts idle live sessions)
+    # ==============================================================
+    from backend.services.proctor_sessions import start_session_sweeper
+    start_session_sweeper()
+
     # ==============================================================
     # ADMIN SQL CONSOLE (For Admin Only)
     # ==============================================================
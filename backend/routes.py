@@ -9,19 +9,18 @@ Bug fixes: PRN/Roll number formatting, delete operations, selection handling
 import csv
 import io
 import json
+import os
 import random
 import sqlite3
+import time
+import traceback
 
 from datetime import datetime
 from io import StringIO, BytesIO
-import base64
 
 # ============================
 # Third-Party Library Imports
 # ============================
-import cv2
-import numpy as np
-import pandas as pd
 from sqlalchemy import func, text
 
 # Flask imports
@@ -48,15 +47,43 @@ from models import (
 )
 
 from backend.utils.email_utils import send_otp_email
-from backend.services.pdf_generator import (
+# Heavy dependencies (pandas, reportlab, OpenCV / NumPy / OpenVINO) load
+# on first use behind these facades, not at import time
+from backend.services import import_export
+from backend.services.pdf_reports import (
     generate_result_pdf,
     generate_batch_report_pdf
 )
 
 # Proctoring system
-from backend.services.proctor_vision.openvino_vision import (
-    ProctorState,
-    OpenVINOProctor
+from backend.services import vision as vision_service
+from backend.services import metrics
+from backend.services.event_sink import (
+    init_event_sink,
+    record_event,
+    flush_events
+)
+from backend.services.proctor_state_store import get_state_store, rehydrate_state
+from backend.services.proctor_sessions import init_session_registry
+from backend.services.violation_counters import (
+    init_violation_counters,
+    get_violation_counters,
+    release_violation_counters
+)
+from backend.services.grading import SCORE_POLICY, SUBMIT_POLICY, grade_attempt
+from backend.services.answer_key import answer_sheet, invalidate_answer_key
+from backend.services.exam_closeout import close_attempts, init_exam_closeout, get_exam_closeout
+from backend.services.answer_autosave import (
+    AutosaveError,
+    save_answers,
+    init_answer_writer,
+    get_answer_writer
+)
+from backend.services.proctor_pipeline import (
+    FrameJob,
+    detect_and_record,
+    init_frame_pipeline,
+    get_frame_pipeline
 )
 
 from models import StudentAnswer
@@ -137,42 +164,146 @@ def admin_sql_run():
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
-# Global proctoring instances (one per student_exam_id)
-PROCTOR_INSTANCES = {}
+# Live proctoring sessions (one per student_exam_id), LRU/TTL bounded
+PROCTOR_INSTANCES = init_session_registry()
+
+# sid -> user id, resolved once per Socket.IO connection (no Flask-Login
+# user load per event)
+SOCKET_USERS = {}
 
-def decode_base64_image(data_url: str):
-    """Convert base64 image to OpenCV format"""
-    try:
-        if "," in data_url:
-            _, encoded = data_url.split(",", 1)
-        else:
-            encoded = data_url
-        img_bytes = base64.b64decode(encoded)
-        img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-        return img
-    except Exception as e:
-        print(f"Error decoding image: {e}")
-        return None
 
+def socket_user_id():
+    user_id = SOCKET_USERS.get(request.sid)
+    if user_id is None and current_user.is_authenticated:
+        user_id = SOCKET_USERS[request.sid] = current_user.id
+    return user_id
 
 def get_proctor_instance(student_exam_id: int, exam):
-    """Get or create a ProctorState instance"""
-    if student_exam_id not in PROCTOR_INSTANCES:
+    """Get or create a ProctorState instance (models are shared, state is per session)"""
+    store = get_state_store()
+    entry = PROCTOR_INSTANCES.get(student_exam_id)
+    if entry is None:
         max_warnings = getattr(exam, 'max_violations', 3) or 3
-        proctor_state = ProctorState(
-            session_id=f"exam-{student_exam_id}",
-            max_warnings=max_warnings
+        # Stored state (restart / other worker) first, else rebuild from the DB
+        proctor_state = (
+            store.load(student_exam_id)
+            or rehydrate_state(student_exam_id, max_warnings)
         )
-        vision = OpenVINOProctor(
-            proctor_state,
-            model_dir="models",  # Models folder in project root
-            device="CPU"
+        proctor_state.max_warnings = max_warnings
+        vision = vision_service.new_proctor(proctor_state)
+        entry = PROCTOR_INSTANCES.put(student_exam_id, (proctor_state, vision))
+    else:
+        # another worker may have advanced this session in a shared store
+        store.refresh(student_exam_id, entry[0])
+    return entry
+
+
+def release_proctor_session(student_exam_id, forget_state=True):
+    """Drop a finished attempt's live session (and, by default, its stored state)"""
+    PROCTOR_INSTANCES.release(student_exam_id)
+    if forget_state:
+        get_state_store().delete(student_exam_id)
+
+
+def on_attempts_closed(exam, student_exam_ids, whole_exam):
+    """
+    After the close-out job graded overdue attempts: drop live sessions,
+    log, and notify clients - one exam_force_ended per exam room when the
+    exam window closed, otherwise one student_force_ended per attempt room.
+    """
+    now = datetime.utcnow()
+    for se_id in student_exam_ids:
+        release_proctor_session(se_id)
+        record_event(
+            ActivityLog,
+            student_exam_id=se_id,
+            activity_type="exam_auto_submitted",
+            description="Exam time expired; submitted by the close-out job",
+            severity="low",
+            created_at=now
         )
-        PROCTOR_INSTANCES[student_exam_id] = (proctor_state, vision)
-    return PROCTOR_INSTANCES[student_exam_id]
+
+    message = 'Exam time is over. Your answers have been submitted.'
+    try:
+        if whole_exam:
+            socketio.emit('exam_force_ended', {
+                'exam_id': exam.id,
+                'force_ended': True,
+                'message': message
+            }, room=f"exam_{exam.id}", namespace='/')
+        else:
+            for se_id in student_exam_ids:
+                socketio.emit('student_force_ended', {
+                    'student_exam_id': se_id,
+                    'message': message
+                }, room=f"student_exam_{se_id}", namespace='/')
+    except Exception as e:
+        print("⚠️ Socket emit error:", e)
+
+
+def record_vision_result(student_exam, status, details):
+    """Persist a WARNING / TERMINATE / NO_FACE verdict from OpenVINOProctor"""
+    if status not in ("WARNING", "TERMINATE", "NO_FACE"):
+        return
+
+    record_event(
+        ExamViolation,
+        student_exam_id=student_exam.id,
+        violation_type=status,
+        severity="high" if status == "TERMINATE" else "medium",
+        message=details.get("message", ""),
+        yaw=details.get("yaw"),
+        pitch=details.get("pitch"),
+        roll=details.get("roll"),
+        deviation_yaw=details.get("dyaw"),
+        deviation_pitch=details.get("dpitch"),
+        deviation_roll=details.get("droll"),
+        faces_detected=details.get("faces_detected", 0),
+        timestamp=datetime.utcnow()
+    )
+
+    counters = get_violation_counters()
+    if counters is not None:
+        counters.seed(student_exam, backend=exam_detector_backend(student_exam), exam_id=student_exam.exam_id)
+        student_exam.total_violations = counters.incr(student_exam.id, total_violations=1)['total_violations']
+    else:
+        current_violations = getattr(student_exam, 'total_violations', 0) or 0
+        student_exam.total_violations = current_violations + 1
+
+    if status == "TERMINATE":
+        student_exam.proctoring_status = "terminated"
+        release_violation_counters(student_exam)
+        release_proctor_session(student_exam.id, forget_state=False)
+        flush_events()  # termination must never sit in the buffer
+    elif student_exam.total_violations >= 3:
+        student_exam.proctoring_status = "warning"
+
+    db.session.commit()
+
+
+def vision_result_payload(student_exam, proctor_state, status, details):
+    """JSON body shared by /api/proctor/analyze and async proctor_analysis emits"""
+    max_violations = getattr(student_exam.exam, 'max_violations', 3) or 3
+    return {
+        "status": status,
+        "warning_count": proctor_state.warning_count,
+        "total_violations": student_exam.total_violations or 0,
+        "message": details.get("message", ""),
+        "should_terminate": (student_exam.total_violations or 0) >= max_violations,
+        "debug": {
+            "yaw": details.get("yaw"),
+            "pitch": details.get("pitch"),
+            "roll": details.get("roll")
+        }
+    }
+
+
 
 
+def exam_detector_backend(student_exam):
+    """Face detector backend name configured on the attempt's exam"""
+    exam = student_exam.exam if student_exam else None
+    return getattr(exam, 'proctor_backend', None) or 'haar'
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -192,24 +323,19 @@ def handle_calibration_binary(data):
         
         print(f"📸 Received calibration frame: {len(frame_buffer)} bytes")
         
-        # Convert ArrayBuffer to numpy array
-        nparr = np.frombuffer(frame_buffer, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Update StudentExam
+        student_exam = StudentExam.query.get(student_exam_id)
+        
+        # Decode (reduced when much larger than the detector input) and
+        # detect faces with the exam's detector backend (Haar / OpenVINO)
+        faces = detect_and_record(frame_buffer, exam_detector_backend(student_exam))
         
-        if frame is None:
+        if faces is None:
             emit('calibration_result', {'success': False, 'message': 'Failed to decode frame'})
             return
         
-        # Use face detection cascade
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-        
         print(f"👤 Detected {len(faces)} face(s)")
         
-        # Update StudentExam
-        student_exam = StudentExam.query.get(student_exam_id)
-        
         if len(faces) == 0:
             # No face detected
             emit('calibration_result', {
@@ -245,7 +371,7 @@ def handle_calibration_binary(data):
 
 @socketio.on('frameBinary')
 def handle_frame_binary(data):
-    """Handle binary proctoring frame - CONTINUOUS MONITORING"""
+    """Queue binary proctoring frame - analysis runs on the proctoring worker pool"""
     try:
         student_exam_id = data.get('studentExamId')
         frame_buffer = data.get('frame')
@@ -253,104 +379,142 @@ def handle_frame_binary(data):
         if not frame_buffer or not student_exam_id:
             return
         
-        # Convert to numpy array
-        nparr = np.frombuffer(frame_buffer, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        PROCTOR_INSTANCES.bind_sid(request.sid, student_exam_id)
         
-        if frame is None:
-            return
+        job_pipeline = get_frame_pipeline()
+        if job_pipeline is not None:
+            metrics.begin_frame()
+            job_pipeline.submit(student_exam_id, bytes(frame_buffer), sid=request.sid)
+            metrics.mark("enqueue")
+            metrics.end_frame(total=None)
+        else:
+            # pool not started (e.g. scripts) - process inline
+            process_proctor_frame(
+                FrameJob(key=student_exam_id, frame_bytes=bytes(frame_buffer), sid=request.sid),
+                detect_and_record
+            )
+        
+    except Exception as e:
+        print(f"❌ Frame queueing error: {e}")
+        traceback.print_exc()
+
+
+def process_proctor_frame(job, run_cv):
+    """CONTINUOUS MONITORING - decode, detect and record one queued frame"""
+    try:
+        student_exam_id = job.key
+        
+        # Counters, detector backend and status come from memory; the
+        # StudentExam row is only loaded on first sight or termination
+        # (started on demand when register_routes did not, e.g. scripts)
+        counters = get_violation_counters() or init_violation_counters(current_app._get_current_object())
+        entry = counters.get(student_exam_id)
+        if entry is None:
+            student_exam = StudentExam.query.get(student_exam_id)
+            # late frame of a submitted / terminated attempt: its counters
+            # were released, seeding them again would never be undone
+            if not student_exam or student_exam.status != 'in_progress':
+                return
+            entry = counters.seed(
+                student_exam, backend=exam_detector_backend(student_exam), exam_id=student_exam.exam_id
+            )
         
-        # Detect faces
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        # Per-stage timings (sampled); decode + detection run in the CV pool,
+        # run_cv adds their measured decode / detect stages to this frame
+        metrics.begin_frame(entry.get('exam_id'))
+        metrics.observe("queue_wait", (time.time() - job.received_at) * 1000.0)
         
-        # Get StudentExam
-        student_exam = StudentExam.query.get(student_exam_id)
+        # Decode + detect faces with the exam's detector backend (Haar / OpenVINO)
+        faces = run_cv(job.frame_bytes, entry['backend'])
+        metrics.mark("cv")
         
-        if not student_exam:
+        if faces is None:
             return
         
-        # Initialize violation counts if None
-        if student_exam.no_face_count is None:
-            student_exam.no_face_count = 0
-        if student_exam.multiple_faces_count is None:
-            student_exam.multiple_faces_count = 0
-        if student_exam.total_violations is None:
-            student_exam.total_violations = 0
-        
         # Check for violations
         if len(faces) == 0:
             # No face detected
-            student_exam.no_face_count += 1
-            student_exam.total_violations += 1
+            entry = counters.incr(student_exam_id, no_face_count=1, total_violations=1)
             
-            # Log violation
-            violation = ExamViolation(
+            # Log violation (buffered)
+            record_event(
+                ExamViolation,
                 student_exam_id=student_exam_id,
                 violation_type='no_face',
                 message='No face detected in frame',
                 severity='medium',
                 timestamp=datetime.utcnow()
             )
-            db.session.add(violation)
-            db.session.commit()
+            metrics.mark("db_write")
             
-            emit('proctor_result', {
+            socketio.emit('proctor_result', {
                 'success': False,
                 'violation': 'no_face',
                 'message': 'No face detected',
-                'count': student_exam.no_face_count,
-                'total_violations': student_exam.total_violations
-            })
+                'count': entry['no_face_count'],
+                'total_violations': entry['total_violations']
+            }, room=job.sid)
             
         elif len(faces) > 1:
             # Multiple faces
-            student_exam.multiple_faces_count += 1
-            student_exam.total_violations += 1
+            entry = counters.incr(student_exam_id, multiple_faces_count=1, total_violations=1)
             
-            # Log violation
-            violation = ExamViolation(
+            # Log violation (buffered)
+            record_event(
+                ExamViolation,
                 student_exam_id=student_exam_id,
                 violation_type='multiple_faces',
                 message=f'Multiple faces detected ({len(faces)} faces)',
                 severity='high',
                 timestamp=datetime.utcnow()
             )
-            db.session.add(violation)
-            db.session.commit()
+            metrics.mark("db_write")
             
-            emit('proctor_result', {
+            socketio.emit('proctor_result', {
                 'success': False,
                 'violation': 'multiple_faces',
                 'message': 'Multiple faces detected',
-                'count': student_exam.multiple_faces_count,
-                'total_violations': student_exam.total_violations
-            })
+                'count': entry['multiple_faces_count'],
+                'total_violations': entry['total_violations']
+            }, room=job.sid)
             
         else:
             # Face detected - all good
-            emit('proctor_result', {
+            socketio.emit('proctor_result', {
                 'success': True,
                 'faces': 1
-            })
+            }, room=job.sid)
+        metrics.mark("emit")
+        
+        # record_event writes through the session when no sink is running
+        db.session.commit()
+        metrics.mark("db_write")
         
         # Check if total violations exceed threshold (15)
-        if student_exam.total_violations >= 15 and student_exam.status == 'in_progress':
-            # Auto-terminate exam
+        if entry['total_violations'] >= 15 and entry['active']:
+            student_exam = StudentExam.query.get(student_exam_id)
+            if not student_exam or student_exam.status != 'in_progress':
+                # finished elsewhere; its final counts are already written
+                counters.release_many([student_exam_id])
+                return
+            
+            # Auto-terminate exam with the final counters written synchronously
+            release_violation_counters(student_exam)
+            release_proctor_session(student_exam.id)
             student_exam.status = 'terminated'
             student_exam.submitted_at = datetime.utcnow()
             student_exam.proctoring_status = 'terminated'
             
-            # Log termination
-            violation = ExamViolation(
+            # Log termination, then flush so nothing buffered is lost
+            record_event(
+                ExamViolation,
                 student_exam_id=student_exam_id,
                 violation_type='auto_terminated',
                 message='Exam auto-terminated due to excessive violations',
                 severity='critical',
                 timestamp=datetime.utcnow()
             )
-            db.session.add(violation)
+            flush_events()
             db.session.commit()
             
             print(f"🚨 Exam terminated for StudentExam {student_exam_id} due to violations")
@@ -358,23 +522,68 @@ def handle_frame_binary(data):
             # Calculate score before termination
             calculate_student_score(student_exam_id)
         
-    except Exception as e:
-        print(f"❌ Frame processing error: {e}")
-        traceback.print_exc()
+    except Exception:
+        # roll back, then let the pipeline count and log the failed frame
+        db.session.rollback()
+        raise
+    finally:
+        metrics.end_frame()
 
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
+    socket_user_id()
     print("✅ Socket.IO client connected")
     
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    # state is persisted, a reconnecting student is simply rehydrated
+    PROCTOR_INSTANCES.release_sid(request.sid)
+    SOCKET_USERS.pop(request.sid, None)
     print("⚠️ Socket.IO client disconnected")
 
 
+@socketio.on('saveAnswers')
+def handle_save_answers(data):
+    """
+    Delta autosave over the proctoring connection: {studentExamId, seq,
+    answers}. Nothing waits on the write; once the batched writer commits
+    (or refuses) the save, 'answersSaved' {status: 'saved', seq} or
+    {status: 'error', seq, code, error} is emitted to this socket (the
+    client then retries over /api/save-answer).
+    """
+    sid = request.sid
+    seq = data.get('seq')
+
+    def answer(payload):
+        socketio.emit('answersSaved', dict(payload, seq=seq), to=sid)
+
+    def on_saved(future):
+        try:
+            answer(future.result())
+        except AutosaveError as e:
+            answer({'status': 'error', 'code': e.status, 'error': str(e)})
+        except Exception as e:
+            print(f"❌ saveAnswers error: {e}")
+            answer({'status': 'error', 'code': 500, 'error': 'save failed'})
+
+    user_id = socket_user_id()
+    if user_id is None:
+        return answer({'status': 'error', 'code': 401, 'error': 'not authenticated'})
+    writer = get_answer_writer()
+    if writer is None:
+        return answer({'status': 'error', 'code': 503, 'error': 'answer writer not running'})
+    try:
+        future = writer.submit(data.get('studentExamId'), user_id, data.get('answers', {}), seq)
+    except AutosaveError as e:
+        return answer({'status': 'error', 'code': e.status, 'error': str(e)})
+    # runs on the writer thread after its commit (or at once if already done)
+    future.add_done_callback(on_saved)
+
+
 def calculate_student_score(student_exam_id):
     """Calculate and update the score for a completed student exam"""
     try:
@@ -382,10 +591,10 @@ def calculate_student_score(student_exam_id):
         if not student_exam:
             return None
         
-        exam = student_exam.exam
-        questions = Question.query.filter_by(exam_id=exam.id).all()
+        # Set-based: answers are marked in bulk, unanswered get a "0" row
+        grade = grade_attempt(student_exam, SCORE_POLICY)
         
-        if not questions:
+        if not grade.total_questions:
             student_exam.score = 0
             student_exam.total_points = 0
             student_exam.percentage = 0
@@ -393,42 +602,10 @@ def calculate_student_score(student_exam_id):
             db.session.commit()
             return {'score': 0, 'total_points': 0}
         
-        student_answers = StudentAnswer.query.filter_by(student_exam_id=student_exam_id).all()
-        answer_dict = {ans.question_id: ans for ans in student_answers}
-        
-        earned_points = 0
-        total_points = 0
-        
-        for question in questions:
-            points = question.points or 1.0
-            total_points += points
-            
-            student_answer = answer_dict.get(question.id)
-            
-            if student_answer and student_answer.selected_answer:
-                is_correct = (student_answer.selected_answer.upper() == question.correct_answer.upper())
-                
-                if is_correct:
-                    earned_points += points
-                    student_answer.is_correct = True
-                    student_answer.points_earned = points
-                else:
-                    student_answer.is_correct = False
-                    student_answer.points_earned = 0
-            else:
-                if not student_answer:
-                    student_answer = StudentAnswer(
-                        student_exam_id=student_exam_id,
-                        question_id=question.id,
-                        selected_answer="0",
-                        is_correct=False,
-                        points_earned=0
-                    )
-                    db.session.add(student_answer)
-        
-        percentage = (earned_points / total_points * 100) if total_points > 0 else 0
-        passing_score = exam.passing_score or 50.0
-        passed = percentage >= passing_score
+        earned_points = grade.score
+        total_points = grade.total_points
+        percentage = grade.percentage
+        passed = grade.passed
         
         student_exam.score = round(earned_points, 2)
         student_exam.total_points = round(total_points, 2)
@@ -463,6 +640,21 @@ def register_routes(app):
     # ═══════════════════════════════════════════════════════════════════
     socketio.init_app(app)
     print("✅ Socket.IO bound to Flask app for binary proctoring")
+
+    # Write-behind sink for ExamViolation / ActivityLog rows
+    init_event_sink(app)
+
+    # In-memory violation counters, synced to StudentExam in batches
+    init_violation_counters(app)
+
+    # Off-request-thread worker pool for frameBinary analysis
+    init_frame_pipeline(app, process_proctor_frame)
+
+    # Scheduled bulk grading / submission of attempts past their deadline
+    init_exam_closeout(app, on_closed=on_attempts_closed)
+
+    # Batched writer for saveAnswers socket events
+    init_answer_writer(app)
     
     print("📝 Registering enhanced routes...")
 
@@ -829,6 +1021,9 @@ def register_routes(app):
             duration_minutes = int(request.form.get('duration_minutes'))
             passing_score = float(request.form.get('passing_score', 50.0))
             max_tab_switches = int(request.form.get('max_tab_switches', 3))
+            proctor_backend = request.form.get('proctor_backend', 'haar')
+            if proctor_backend not in ('haar', 'openvino'):
+                proctor_backend = 'haar'
             
             exam = Exam(
                 title=title,
@@ -836,6 +1031,7 @@ def register_routes(app):
                 duration_minutes=duration_minutes,
                 passing_score=passing_score,
                 max_tab_switches=max_tab_switches,
+                proctor_backend=proctor_backend,
                 creator_id=current_user.id
             )
             
@@ -867,6 +1063,7 @@ def register_routes(app):
             
             # Delete related questions, student exams, and logs
             Question.query.filter_by(exam_id=exam.id).delete()
+            invalidate_answer_key(exam.id)   # bulk delete bypasses the session events
             StudentExam.query.filter_by(exam_id=exam.id).delete()
             ActivityLog.query.filter(ActivityLog.student_exam_id.in_(
                 db.session.query(StudentExam.id).filter_by(exam_id=exam.id)
@@ -917,13 +1114,13 @@ def register_routes(app):
 
             # ---------- CSV ----------
             if ext == 'csv':
-                df = pd.read_csv(file, nrows=max_preview)
+                df = import_export.read_csv(file, nrows=max_preview)
                 df.columns = [c.strip().lower() for c in df.columns]
                 rows = df.to_dict(orient='records')
 
             # ---------- Excel ----------
             elif ext in ('xls', 'xlsx'):
-                df = pd.read_excel(file, nrows=max_preview)
+                df = import_export.read_excel(file, nrows=max_preview)
                 df.columns = [c.strip().lower() for c in df.columns]
                 rows = df.to_dict(orient='records')
 
@@ -938,7 +1135,7 @@ def register_routes(app):
                     return jsonify({"success": False, "error": "JSON must be an array of objects"}), 400
 
                 # convert only first N records to DataFrame (for consistency)
-                df = pd.DataFrame(data[:max_preview])
+                df = import_export.data_frame(data[:max_preview])
                 df.columns = [c.strip().lower() for c in df.columns]
                 rows = df.to_dict(orient='records')
 
@@ -996,9 +1193,9 @@ def register_routes(app):
 
             try:
                 if ext == 'csv':
-                    df = pd.read_csv(file)
+                    df = import_export.read_csv(file)
                 elif ext in ('xls', 'xlsx'):
-                    df = pd.read_excel(file)
+                    df = import_export.read_excel(file)
                 elif ext == 'json':
                     try:
                         data = json.load(file)
@@ -1008,7 +1205,7 @@ def register_routes(app):
                     if not isinstance(data, list):
                         flash('JSON must be an array of objects.', 'error')
                         return redirect(request.url)
-                    df = pd.DataFrame(data)
+                    df = import_export.data_frame(data)
                 else:
                     flash('Unsupported file type. Upload CSV, Excel, or JSON.', 'error')
                     return redirect(request.url)
@@ -1241,7 +1438,6 @@ def register_routes(app):
             student_exams=student_exams
         )
 
-    from fpdf import FPDF
     from flask import request, render_template, Response
     from datetime import datetime
 
@@ -1805,7 +2001,7 @@ def register_routes(app):
             dict: Scoring results with score, total_points, percentage, passed
         """
         try:
-            from models import StudentExam, StudentAnswer, Question
+            from models import StudentExam
             
             # Get student exam
             student_exam = StudentExam.query.get(student_exam_id)
@@ -1819,10 +2015,11 @@ def register_routes(app):
                 print(f"❌ Exam not found for StudentExam {student_exam_id}")
                 return None
             
-            # Get all questions for this exam
-            questions = Question.query.filter_by(exam_id=exam.id).all()
+            # Set-based grading: answers are marked in bulk and unanswered
+            # questions get a "0" row, without loading any ORM objects
+            grade = grade_attempt(student_exam, SCORE_POLICY)
             
-            if not questions:
+            if not grade.total_questions:
                 print(f"⚠️ No questions found for exam {exam.id}")
                 student_exam.score = 0
                 student_exam.total_points = 0
@@ -1836,60 +2033,11 @@ def register_routes(app):
                     'passed': False
                 }
             
-            # Get student's answers
-            student_answers = StudentAnswer.query.filter_by(
-                student_exam_id=student_exam_id
-            ).all()
-            
-            # Create answer lookup dict
-            answer_dict = {ans.question_id: ans for ans in student_answers}
-            
-            # Calculate score
-            earned_points = 0
-            total_points = 0
-            correct_count = 0
-            
-            for question in questions:
-                points = question.points or 1.0
-                total_points += points
-                
-                # Check if student answered this question
-                student_answer = answer_dict.get(question.id)
-                
-                if student_answer and student_answer.selected_answer:
-                    # Check if answer is correct
-                    is_correct = (student_answer.selected_answer.upper() == 
-                                question.correct_answer.upper())
-                    
-                    if is_correct:
-                        earned_points += points
-                        correct_count += 1
-                        student_answer.is_correct = True
-                        student_answer.points_earned = points
-                    else:
-                        student_answer.is_correct = False
-                        student_answer.points_earned = 0
-                else:
-                    # No answer provided - create a record with 0 points
-                    if not student_answer:
-                        student_answer = StudentAnswer(
-                            student_exam_id=student_exam_id,
-                            question_id=question.id,
-                            selected_answer="0",
-                            is_correct=False,
-                            points_earned=0
-                        )
-                        db.session.add(student_answer)
-                    else:
-                        student_answer.is_correct = False
-                        student_answer.points_earned = 0
-            
-            # Calculate percentage
-            percentage = (earned_points / total_points * 100) if total_points > 0 else 0
-            
-            # Determine if passed
-            passing_score = exam.passing_score or 50.0
-            passed = percentage >= passing_score
+            earned_points = grade.score
+            total_points = grade.total_points
+            correct_count = grade.correct_count
+            percentage = grade.percentage
+            passed = grade.passed
             
             # Update student exam record
             student_exam.score = round(earned_points, 2)
@@ -1909,7 +2057,7 @@ def register_routes(app):
             print(f"✅ Scored StudentExam {student_exam_id}:")
             print(f"   Score: {earned_points}/{total_points} ({percentage:.1f}%)")
             print(f"   Passed: {passed}")
-            print(f"   Correct Answers: {correct_count}/{len(questions)}")
+            print(f"   Correct Answers: {correct_count}/{grade.total_questions}")
             
             return {
                 'score': earned_points,
@@ -1917,7 +2065,7 @@ def register_routes(app):
                 'percentage': percentage,
                 'passed': passed,
                 'correct_count': correct_count,
-                'total_questions': len(questions)
+                'total_questions': grade.total_questions
             }
             
         except Exception as e:
@@ -1989,6 +2137,8 @@ def register_routes(app):
             # Auto-submit if time expired
             if time_remaining <= 0:
                 student_exam.submitted_at = datetime.utcnow()
+                release_violation_counters(student_exam)
+                release_proctor_session(student_exam.id)
                 calculate_student_score(student_exam.id)
                 db.session.commit()
                 flash('Exam time expired. Your answers have been submitted.', 'warning')
@@ -1998,8 +2148,10 @@ def register_routes(app):
         questions = Question.query.filter_by(exam_id=exam_id).all()
         
         existing_answers = {}
+        answers_seq = 0   # autosave resumes numbering after the last stored save
         for answer in StudentAnswer.query.filter_by(student_exam_id=student_exam.id).all():
             existing_answers[answer.question_id] = answer.selected_answer
+            answers_seq = max(answers_seq, answer.client_seq or 0)
         
         # Debug logging
         print("\n" + "="*70)
@@ -2019,44 +2171,30 @@ def register_routes(app):
             questions=questions,
             student_exam=student_exam,
             time_remaining=time_remaining,
-            existing_answers=existing_answers
+            existing_answers=existing_answers,
+            answers_seq=answers_seq
         )
 
     @app.route('/api/save-answer', methods=['POST'])
     @login_required
     def save_answer():
-
-        data = request.get_json()
+        """
+        Delta autosave: {student_exam_id, seq, answers: {question_id: choice}}
+        with only the answers changed since the last acknowledged save.
+        One upsert per call; answers older than the stored seq are ignored.
+        """
+        data = request.get_json(silent=True) or {}
         student_exam_id = data.get("student_exam_id")
-        answers = data.get("answers", {})
 
         if not student_exam_id:
             return jsonify({"error": "missing student_exam_id"}), 400
 
-        for qid, selected in answers.items():
-            qid = int(qid)
-
-            record = StudentAnswer.query.filter_by(
-                student_exam_id=student_exam_id,
-                question_id=qid
-            ).first()
-
-            if record is None:
-                # Create new answer row
-                record = StudentAnswer(
-                    student_exam_id=student_exam_id,
-                    question_id=qid,
-                    selected_answer=selected,
-                    answered_at=datetime.utcnow()
-                )
-                db.session.add(record)
-            else:
-                # Update existing row
-                record.selected_answer = selected
-                record.answered_at = datetime.utcnow()
-
-        db.session.commit()
-        return jsonify({"status": "saved"})
+        try:
+            ack = save_answers(student_exam_id, current_user.id, data.get("answers", {}), data.get("seq"))
+        except AutosaveError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), e.status
+        return jsonify(ack)
 
 
     @app.route('/api/update-tabcount/<int:student_exam_id>', methods=['POST'])
@@ -2090,14 +2228,14 @@ def register_routes(app):
         if student_exam.student_id != current_user.id:
             return jsonify({"error": "Unauthorized"}), 403
 
-        log = ActivityLog(
+        record_event(
+            ActivityLog,
             student_exam_id=student_exam.id,
             activity_type=activity_type,
             description=description,
-            severity=severity
+            severity=severity,
+            created_at=datetime.utcnow()
         )
-        db.session.add(log)
-        db.session.commit()
 
         return jsonify({"status": "logged"})
     def assign_shuffle(student_exam):
@@ -2178,15 +2316,15 @@ def register_routes(app):
         if not student_exam or student_exam.student_id != current_user.id:
             return jsonify({'success': False, 'error': 'Unauthorized'}), 403
         
-        activity_log = ActivityLog(
+        record_event(
+            ActivityLog,
             student_exam_id=student_exam_id,
             activity_type=activity_type,
             description=description,
-            severity=severity
+            severity=severity,
+            created_at=datetime.utcnow()
         )
         
-        db.session.add(activity_log)
-        
         if activity_type == 'tab_switch':
             student_exam.tab_switch_count += 1
         
@@ -2227,57 +2365,13 @@ def register_routes(app):
             flash('Exam record missing or deleted', 'error')
             return redirect(url_for('student_dashboard'))
 
-        # Load questions for this exam ONLY
-        questions = Question.query.filter_by(exam_id=exam.id).all()
-        total_questions = len(questions)
-
-        # Build quick lookup for existing StudentAnswer rows
-        existing_answers = {a.question_id: a for a in StudentAnswer.query.filter_by(student_exam_id=student_exam.id).all()}
-
-        total_points = 0.0
-        score = 0.0
-
-        for q in questions:
-            total_points += (q.points or 0.0)
-
-            ans = existing_answers.get(q.id)
-            if ans is None:
-                # create unanswered answer with "0"
-                ans = StudentAnswer(
-                    student_exam_id=student_exam.id,
-                    question_id=q.id,
-                    selected_answer="0",
-                    is_correct=False,
-                    points_earned=0.0,
-                    answered_at=datetime.utcnow()
-                )
-                db.session.add(ans)
-            else:
-                # normalize selected_answer to string
-                sel = (ans.selected_answer or "").strip()
-                if sel == "" or sel == "0":
-                    ans.selected_answer = "0"
-                    ans.is_correct = False
-                    ans.points_earned = 0.0
-                else:
-                    # check correctness (compare to q.correct_answer)
-                    if q.correct_answer and sel.upper() == q.correct_answer.upper():
-                        ans.is_correct = True
-                        ans.points_earned = q.points or 0.0
-                    else:
-                        ans.is_correct = False
-                        ans.points_earned = 0.0
-
-                # update answered_at if missing
-                if not ans.answered_at:
-                    ans.answered_at = datetime.utcnow()
-
-            # sum score
-            score += (ans.points_earned or 0.0)
-
-        # Avoid division by zero
-        percentage = (score / total_points * 100.0) if total_points > 0 else 0.0
-        passed = (percentage >= (exam.passing_score or 0.0))
+        # Grade in bulk: missing / blank answers become "0", is_correct and
+        # points_earned are written set-based (see services/grading.py)
+        grade = grade_attempt(student_exam, SUBMIT_POLICY)
+        score = grade.score
+        total_points = grade.total_points
+        percentage = grade.percentage
+        passed = grade.passed
 
         # Update student_exam
         student_exam.score = score
@@ -2287,6 +2381,8 @@ def register_routes(app):
         student_exam.submitted_at = datetime.utcnow()
         student_exam.status = 'submitted'
         student_exam.completed = True
+        release_violation_counters(student_exam)
+        release_proctor_session(student_exam.id)
 
         # time_taken_minutes: difference between submitted_at and started_at
         if student_exam.started_at:
@@ -2318,13 +2414,7 @@ def register_routes(app):
             flash('Exam not yet submitted', 'error')
             return redirect(url_for('take_exam', student_exam_id=student_exam_id))
         
-        answers_with_questions = []
-        for answer in student_exam.answers:
-            question = Question.query.get(answer.question_id)
-            answers_with_questions.append({
-                'question': question,
-                'answer': answer
-            })
+        answers_with_questions = answer_sheet(student_exam)
         
         return render_template('student/result.html',
                              student_exam=student_exam,
@@ -2454,12 +2544,12 @@ def register_routes(app):
             # ✅ Step 1: Read file
             if ext == 'csv':
                 try:
-                    df = pd.read_csv(file, encoding='utf-8', dtype=str)
+                    df = import_export.read_csv(file, encoding='utf-8', dtype=str)
                 except UnicodeDecodeError:
                     file.stream.seek(0)
-                    df = pd.read_csv(file, encoding='utf-8-sig', dtype=str)
+                    df = import_export.read_csv(file, encoding='utf-8-sig', dtype=str)
             elif ext in ('xlsx', 'xls'):
-                df = pd.read_excel(file, dtype=str)
+                df = import_export.read_excel(file, dtype=str)
             elif ext == 'json':
                 try:
                     data = json.load(file)
@@ -2471,7 +2561,7 @@ def register_routes(app):
                     flash('JSON must be an array of student objects.', 'error')
                     return redirect(url_for('faculty_student_list'))
 
-                df = pd.DataFrame(data, dtype=str)
+                df = import_export.data_frame(data, dtype=str)
 
             print(f"[DEBUG] Columns: {df.columns.tolist()}")
             print(f"[DEBUG] Total rows: {len(df)}")
@@ -2487,7 +2577,7 @@ def register_routes(app):
             errors = []
 
             def clean_string(value):
-                if pd.isna(value) or value == '':
+                if import_export.isna(value) or value == '':
                     return ''
                 return str(value).strip()
 
@@ -2849,13 +2939,7 @@ def register_routes(app):
             else:
                 return redirect(url_for('faculty_dashboard'))
         
-        answers_with_questions = []
-        for answer in student_exam.answers:
-            question = Question.query.get(answer.question_id)
-            answers_with_questions.append({
-                'question': question,
-                'answer': answer
-            })
+        answers_with_questions = answer_sheet(student_exam)
         
         # Get the actual student for the PDF (in case faculty is downloading)
         student = User.query.get(student_exam.student_id)
@@ -3153,6 +3237,7 @@ def register_routes(app):
             if student_exam_id:
                 student_room = f"student_exam_{student_exam_id}"
                 join_room(student_room)
+                PROCTOR_INSTANCES.bind_sid(request.sid, student_exam_id)
                 print(f"Socket {request.sid} joined room {student_room}")
 
         except Exception as e:
@@ -3178,27 +3263,30 @@ def register_routes(app):
         exam.is_active = False
         exam.status = "inactive"    # required for front-end exam block
 
-        # ---------- CLOSE ALL ACTIVE ATTEMPTS ----------
-        active_attempts = StudentExam.query.filter_by(
+        db.session.commit()
+
+        # ---------- GRADE + CLOSE ALL ACTIVE ATTEMPTS (chunked, set-based) ----------
+        active_ids = [se_id for (se_id,) in db.session.query(StudentExam.id).filter_by(
             exam_id=exam_id,
             status='in_progress'
-        ).all()
+        )]
+        closed_ids = close_attempts(exam, active_ids)
 
-        for attempt in active_attempts:
-            attempt.status = "submitted"
-            attempt.submitted_at = datetime.utcnow()
+        for se_id in closed_ids:
+            release_proctor_session(se_id)
 
             # log every forced submission
-            log = ActivityLog(
-                student_exam_id=attempt.id,
+            record_event(
+                ActivityLog,
+                student_exam_id=se_id,
                 activity_type="exam_force_ended",
                 description="Exam was force-ended by faculty",
                 severity="high",
                 created_at=datetime.utcnow()
             )
-            db.session.add(log)
 
-        # ---------- COMMIT CHANGES ----------
+        # ---------- PERSIST LOGS (incl. buffered violations) ----------
+        flush_events()
         db.session.commit()
 
         # ---------- REAL-TIME BROADCAST TO ALL STUDENTS ----------
@@ -3238,6 +3326,8 @@ def register_routes(app):
 
         attempt.status = "submitted"
         attempt.submitted_at = datetime.utcnow()
+        release_violation_counters(attempt)
+        release_proctor_session(attempt.id)
 
         log = ActivityLog(
             student_exam_id=attempt.id,
@@ -3247,6 +3337,7 @@ def register_routes(app):
             created_at=datetime.utcnow()
         )
         db.session.add(log)
+        flush_events()
         db.session.commit()
 
         # REAL-TIME SOCKET ALERT — ONLY THIS STUDENT
@@ -3351,6 +3442,7 @@ def register_routes(app):
 
         if student_exam_id:
             join_room(f"student_exam_{student_exam_id}")
+            PROCTOR_INSTANCES.bind_sid(request.sid, student_exam_id)
             print(f"Student joined room student_exam_{student_exam_id}")
 
 
@@ -3489,6 +3581,8 @@ def register_routes(app):
             student_exam.force_ended = True
             student_exam.status = 'force_ended'
             student_exam.submitted_at = datetime.utcnow()
+            release_violation_counters(student_exam)
+            release_proctor_session(student_exam.id)
             
             # Also mark the exam as force-ended (affects all students)
             exam = student_exam.exam
@@ -3540,33 +3634,33 @@ def register_routes(app):
             if not enable_proctoring:
                 return jsonify({"status": "ok", "message": "Proctoring disabled", "proctoring_enabled": False})
 
-            data = request.get_json()
-            frames_b64 = data.get("frames", [])
+            # JSON base64 "frames", a multipart batch (decoded part by part
+            # as the body streams in) or a single raw image/jpeg body
+            proctor_state, vision = get_proctor_instance(student_exam_id, exam)
+            frames = vision_service.request_frames(
+                request, "frames", max_frames=120, target_size=(vision.fd_w, vision.fd_h)
+            )
             
-            print(f"📸 Received {len(frames_b64)} frames")
+            # Frames are analysed while later ones are still being decoded;
+            # calibration stops reading once it has enough good frames
+            print("🔍 Performing calibration...")
+            ok, info = vision.calibrate(frames)
+            
+            print(f"📸 Received {frames.received} frames, decoded {frames.decoded}")
 
-            if len(frames_b64) < 5:
+            if frames.received < 5:
                 return jsonify({"status": "error", "message": "At least 5 frames required"}), 400
 
-            frames = []
-            for i, frame_b64 in enumerate(frames_b64):
-                img = decode_base64_image(frame_b64)
-                if img is not None:
-                    frames.append(img)
-
-            if len(frames) < 5:
+            if frames.decoded < 5:
                 return jsonify({"status": "error", "message": "Failed to decode frames"}), 400
-
-            print(f"✅ Decoded {len(frames)} frames")
-
-            proctor_state, vision = get_proctor_instance(student_exam_id, exam)
-            
-            print("🔍 Performing calibration...")
-            ok, info = vision.calibrate(frames)
             
             if not ok:
                 print(f"❌ Calibration failed: {info}")
-                return jsonify({"status": "error", "message": info}), 400
+                return jsonify({
+                    "status": "error",
+                    "message": info,
+                    "quality": vision.calibration_report
+                }), 400
 
             calibration = ExamCalibration.query.filter_by(student_exam_id=student_exam_id).first()
             if not calibration:
@@ -3576,7 +3670,14 @@ def register_routes(app):
             calibration.baseline_yaw = proctor_state.baseline_yaw
             calibration.baseline_pitch = proctor_state.baseline_pitch
             calibration.baseline_roll = proctor_state.baseline_roll
-            calibration.calibration_frames = len(frames)
+            calibration.baseline_cx = proctor_state.baseline_cx
+            calibration.baseline_cy = proctor_state.baseline_cy
+            calibration.baseline_w = proctor_state.baseline_w
+            calibration.baseline_h = proctor_state.baseline_h
+            calibration.calibration_frames = frames.decoded
+            # rehydrate_state counts verdicts from here on
+            calibration.calibrated_at = datetime.utcnow()
+            get_state_store().save(student_exam_id, proctor_state, force=True)
 
             student_exam.calibration_completed = True
             student_exam.proctoring_enabled = True
@@ -3591,7 +3692,8 @@ def register_routes(app):
                     "yaw": float(proctor_state.baseline_yaw),
                     "pitch": float(proctor_state.baseline_pitch),
                     "roll": float(proctor_state.baseline_roll)
-                }
+                },
+                "quality": vision.calibration_report
             })
 
         except Exception as e:
@@ -3624,65 +3726,78 @@ def register_routes(app):
             if not calibration_completed:
                 return jsonify({"status": "ERROR", "message": "Not calibrated"}), 400
 
-            data = request.get_json()
-            frame_b64 = data.get("frame")
+            # Per-stage timings (sampled): session, decode, vision stages, DB
+            metrics.begin_frame(exam.id)
+
+            # JSON base64 "frame", raw image/jpeg body or one multipart file
+            proctor_state, vision = get_proctor_instance(student_exam_id, exam)
+            metrics.mark("session")
+            frames, factors, received = vision_service.read_request_frames(
+                request, "frame", max_frames=1, target_size=(vision.fd_w, vision.fd_h)
+            )
             
-            if not frame_b64:
+            if not received:
                 return jsonify({"status": "ERROR", "message": "No frame"}), 400
 
-            frame = decode_base64_image(frame_b64)
-            if frame is None:
+            if not frames:
                 return jsonify({"status": "ERROR", "message": "Decode failed"}), 400
+            frame, factor = frames[0], factors[0]
+            data = request.get_json(silent=True) or {}
+
+            def to_source_coords(details):
+                # boxes come back in reduced-decode pixels
+                if details.get("box") is not None:
+                    details["box"] = vision_service.scale_box(details["box"], factor)
+
+            if data.get("async") or request.args.get("async"):
+                # Non-blocking: result is persisted and pushed over Socket.IO
+                # as 'proctor_analysis' (same body as the synchronous response)
+                app_obj = current_app._get_current_object()
+                exam_id = exam.id
+
+                # runs on the engine's result pool, not an inference thread
+                def on_result(status, details):
+                    metrics.begin_frame(exam_id)
+                    to_source_coords(details)
+                    get_state_store().save(student_exam_id, proctor_state)
+                    metrics.mark("state_save")
+                    with app_obj.app_context():
+                        try:
+                            se = StudentExam.query.get(student_exam_id)
+                            record_vision_result(se, status, details)
+                            metrics.mark("db_write")
+                            socketio.emit(
+                                'proctor_analysis',
+                                vision_result_payload(se, proctor_state, status, details),
+                                room=f"student_exam_{student_exam_id}"
+                            )
+                            metrics.mark("emit")
+                        except Exception as e:
+                            db.session.rollback()
+                            print(f"❌ Async analysis result error: {e}")
+                        finally:
+                            db.session.remove()
+                            metrics.end_frame(total=None)
+
+                vision.submit_frame(frame, on_result)
+                return jsonify({"status": "QUEUED", "message": "Frame queued for analysis"}), 202
 
-            proctor_state, vision = get_proctor_instance(student_exam_id, exam)
             status, details = vision.check_frame(frame)
+            to_source_coords(details)
+            get_state_store().save(student_exam_id, proctor_state)
+            metrics.mark("state_save")
+            record_vision_result(student_exam, status, details)
+            metrics.mark("db_write")
 
-            if status in ("WARNING", "TERMINATE", "NO_FACE"):
-                violation = ExamViolation(
-                    student_exam_id=student_exam_id,
-                    violation_type=status,
-                    severity="high" if status == "TERMINATE" else "medium",
-                    message=details.get("message", ""),
-                    yaw=details.get("yaw"),
-                    pitch=details.get("pitch"),
-                    roll=details.get("roll"),
-                    deviation_yaw=details.get("dyaw"),
-                    deviation_pitch=details.get("dpitch"),
-                    deviation_roll=details.get("droll"),
-                    faces_detected=details.get("faces_detected", 0)
-                )
-                db.session.add(violation)
-
-                current_violations = getattr(student_exam, 'total_violations', 0) or 0
-                student_exam.total_violations = current_violations + 1
-                
-                if status == "TERMINATE":
-                    student_exam.proctoring_status = "terminated"
-                elif student_exam.total_violations >= 3:
-                    student_exam.proctoring_status = "warning"
-                
-                db.session.commit()
-
-            max_violations = getattr(exam, 'max_violations', 3) or 3
-            
-            return jsonify({
-                "status": status,
-                "warning_count": proctor_state.warning_count,
-                "total_violations": student_exam.total_violations or 0,
-                "message": details.get("message", ""),
-                "should_terminate": (student_exam.total_violations or 0) >= max_violations,
-                "debug": {
-                    "yaw": details.get("yaw"),
-                    "pitch": details.get("pitch"),
-                    "roll": details.get("roll")
-                }
-            })
+            return jsonify(vision_result_payload(student_exam, proctor_state, status, details))
 
         except Exception as e:
             print(f"❌ Analysis error: {e}")
             import traceback
             traceback.print_exc()
             return jsonify({"status": "ERROR", "message": str(e)}), 500
+        finally:
+            metrics.end_frame()
 
 
     @app.route('/api/proctor/status/<int:student_exam_id>', methods=['GET'])
@@ -3724,6 +3839,53 @@ def register_routes(app):
             traceback.print_exc()
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/healthz/ready', methods=['GET'])
+    def healthz_ready():
+        """Readiness probe: 200 once the vision engine is compiled and warm"""
+        state = vision_service.readiness()
+        return jsonify(state), (200 if vision_service.is_ready() else 503)
+
+    @app.route('/api/proctor/metrics', methods=['GET'])
+    @login_required
+    def proctor_metrics():
+        """Proctoring hot-path counters (detector latency per backend, etc.)"""
+        if current_user.role not in ['faculty', 'admin']:
+            return jsonify({"error": "Unauthorized"}), 403
+        return jsonify(metrics.snapshot())
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Prometheus scrape target; protected by METRICS_TOKEN when it is set"""
+        token = os.getenv('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').replace('Bearer ', '', 1) or request.args.get('token')
+            if supplied != token:
+                return Response("unauthorized\n", status=401, mimetype='text/plain')
+        return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/api/proctor/metrics/sampling', methods=['POST'])
+    @login_required
+    def proctor_metrics_sampling():
+        """Give one exam its own stage-timing series: {"exam_id": 12, "rate": 0.5} (rate null removes)"""
+        if current_user.role not in ['faculty', 'admin']:
+            return jsonify({"error": "Unauthorized"}), 403
+        data = request.get_json(silent=True) or {}
+        if data.get('exam_id') is None:
+            return jsonify({"error": "exam_id required"}), 400
+        metrics.stage_sampling.set_exam(data['exam_id'], data.get('rate'))
+        return jsonify({"success": True, "exam_rates": dict(metrics.stage_sampling.exam_rates)})
+
+    @app.route('/api/admin/exam-closeout/run', methods=['POST'])
+    @login_required
+    def run_exam_closeout():
+        """Run the close-out job now; returns attempts graded and duration"""
+        if current_user.role != 'admin':
+            return jsonify({"error": "Unauthorized"}), 403
+        closeout = get_exam_closeout()
+        if closeout is None:
+            return jsonify({"error": "Close-out job not initialised"}), 503
+        return jsonify({"success": True, **closeout.run_once()})
+
     @app.route('/change-password', methods=['GET', 'POST'])
     @login_required
     def change_password():
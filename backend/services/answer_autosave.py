@@ -0,0 +1,420 @@
+"""
+Delta answer autosave
+- clients send only answers changed since their last acknowledged save,
+  tagged with an increasing per-attempt sequence number
+- one INSERT ... ON CONFLICT (student_exam_id, question_id) DO UPDATE per
+  save (per UPSERT_CHUNK rows); a row only moves forward (excluded.client_seq > client_seq), so
+  stale or out-of-order saves are ignored per question
+- dialects without ON CONFLICT ... WHERE fall back to a per-row path
+- AnswerSaveWriter: Socket.IO saves are coalesced per attempt and written
+  by one thread, one upsert + commit per flush for every pending attempt
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from backend.database import db
+from backend.services.answer_key import get_answer_key
+from backend.services.metrics import register_source
+
+# StudentAnswer.selected_answer is String(10)
+MAX_ANSWER_LENGTH = 10
+# rows per upsert statement: 5 parameters each, below SQLite's 999 limit
+UPSERT_CHUNK = 190
+
+
+class AutosaveStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.saves = 0
+        self.answers_received = 0
+        self.answers_written = 0
+        self.rejected = 0
+
+    def record(self, received: int, written: int):
+        with self._lock:
+            self.saves += 1
+            self.answers_received += received
+            self.answers_written += written
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "saves": self.saves,
+                "answers_received": self.answers_received,
+                "answers_written": self.answers_written,
+                "stale_ignored": self.answers_received - self.answers_written,
+                "rejected": self.rejected,
+            }
+
+
+autosave_stats = AutosaveStats()
+register_source("answer_autosave", autosave_stats.snapshot)
+
+
+class AutosaveError(Exception):
+    """Save refused; `status` is the HTTP status the route answers with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def clean_answers(exam_id: int, answers) -> Dict[int, str]:
+    """
+    {question_id: selected} restricted to the exam's questions (answer-key
+    cache, checked against the database version, so a question added by
+    another worker is accepted at once), values stripped and cut to the
+    column width.
+    """
+    if not isinstance(answers, dict):
+        raise AutosaveError("answers must be an object")
+    valid = set(get_answer_key(exam_id).question_ids)
+    cleaned = {}
+    for qid, selected in answers.items():
+        try:
+            qid = int(qid)
+        except (TypeError, ValueError):
+            continue
+        if qid not in valid:
+            continue
+        cleaned[qid] = ("" if selected is None else str(selected).strip())[:MAX_ANSWER_LENGTH]
+    return cleaned
+
+
+def _check(row, student_id):
+    if row is None:
+        raise AutosaveError("attempt not found", 404)
+    if row.student_id != student_id:
+        raise AutosaveError("Unauthorized", 403)
+    if row.status != 'in_progress':
+        raise AutosaveError("attempt already submitted", 409)
+    return row.exam_id
+
+
+def _attempt_rows(student_exam_ids) -> dict:
+    from models import StudentExam
+
+    return {
+        row.id: row for row in db.session.execute(
+            select(StudentExam.id, StudentExam.student_id, StudentExam.exam_id, StudentExam.status)
+            .where(StudentExam.id.in_(list(student_exam_ids)))
+        )
+    }
+
+
+def check_attempt(student_exam_id, student_id):
+    """exam_id of an in_progress attempt owned by student_id, else AutosaveError"""
+    return _check(_attempt_rows([student_exam_id]).get(student_exam_id), student_id)
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def upsert_rows(rows: List[dict], sequenced: bool = True) -> int:
+    """
+    Write StudentAnswer rows (student_exam_id, question_id, selected_answer,
+    answered_at, client_seq) of any number of attempts, one statement per
+    UPSERT_CHUNK rows; returns rows inserted or moved forward. sequenced=False overwrites
+    unconditionally and keeps the stored seq. The caller commits.
+    """
+    from models import StudentAnswer
+
+    if not rows:
+        return 0
+    insert = _upsert_statement(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _upsert_rows_orm(rows, sequenced)
+
+    table = StudentAnswer.__table__
+    written = 0
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(table).values(rows[i:i + UPSERT_CHUNK])
+        update = {"selected_answer": stmt.excluded.selected_answer, "answered_at": stmt.excluded.answered_at}
+        where = None
+        if sequenced:
+            update["client_seq"] = stmt.excluded.client_seq
+            where = stmt.excluded.client_seq > func.coalesce(table.c.client_seq, 0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_exam_id, table.c.question_id],
+            set_=update,
+            where=where,
+        )
+        written += db.session.execute(stmt).rowcount
+    return written
+
+
+def upsert_answers(student_exam_id: int, answers: Dict[int, str], seq: Optional[int],
+                   now: Optional[datetime] = None) -> int:
+    """One attempt's cleaned answers (see upsert_rows); seq=None for clients predating seq"""
+    now = now or datetime.utcnow()
+    return upsert_rows([
+        {"student_exam_id": student_exam_id, "question_id": qid, "selected_answer": selected,
+         "answered_at": now, "client_seq": seq or 0}
+        for qid, selected in answers.items()
+    ], sequenced=seq is not None)
+
+
+def _upsert_rows_orm(rows: List[dict], sequenced: bool) -> int:
+    from models import StudentAnswer
+
+    by_attempt = defaultdict(dict)
+    for row in rows:
+        by_attempt[row["student_exam_id"]][row["question_id"]] = row
+    written = 0
+    for student_exam_id, answers in by_attempt.items():
+        existing = {
+            a.question_id: a for a in StudentAnswer.query.filter(
+                StudentAnswer.student_exam_id == student_exam_id,
+                StudentAnswer.question_id.in_(list(answers)),
+            )
+        }
+        for qid, row in answers.items():
+            record = existing.get(qid)
+            if record is None:
+                db.session.add(StudentAnswer(**row))
+            elif not sequenced or row["client_seq"] > (record.client_seq or 0):
+                record.selected_answer = row["selected_answer"]
+                record.answered_at = row["answered_at"]
+                if sequenced:
+                    record.client_seq = row["client_seq"]
+            else:
+                continue
+            written += 1
+    return written
+
+
+def save_answers(student_exam_id, student_id, answers, seq=None) -> dict:
+    """Validate, upsert and commit one delta save; returns the ack payload"""
+    try:
+        student_exam_id = int(student_exam_id)
+        seq = None if seq is None else int(seq)
+    except (TypeError, ValueError):
+        autosave_stats.reject()
+        raise AutosaveError("student_exam_id / seq must be integers")
+    try:
+        exam_id = check_attempt(student_exam_id, student_id)
+        cleaned = clean_answers(exam_id, answers)
+    except AutosaveError:
+        autosave_stats.reject()
+        raise
+    written = upsert_answers(student_exam_id, cleaned, seq)
+    db.session.commit()
+    autosave_stats.record(len(cleaned), written)
+    return {"status": "saved", "seq": seq, "saved": written, "ignored": len(cleaned) - written}
+
+
+def last_seq(student_exam_id) -> int:
+    """Highest sequence number stored for an attempt (seeds the client)"""
+    from models import StudentAnswer
+
+    return int(db.session.execute(
+        select(func.coalesce(func.max(StudentAnswer.client_seq), 0))
+        .where(StudentAnswer.student_exam_id == student_exam_id)
+    ).scalar())
+
+
+# ---------- batched writer for Socket.IO saves ----------
+
+class _PendingAttempt:
+    __slots__ = ("student_id", "answers", "waiters", "events")
+
+    def __init__(self, student_id: int):
+        self.student_id = student_id
+        self.answers: Dict[int, Tuple[int, object]] = {}   # question_id -> (seq, raw answer)
+        self.waiters: List[Tuple[Future, int]] = []
+        self.events = 0
+
+
+class AnswerSaveWriter:
+    """
+    Coalesces saveAnswers events per attempt (per question the highest seq
+    wins) and writes every pending attempt with one upsert and one commit
+    per flush, every flush_interval_ms or once max_pending attempts wait.
+    Each save gets a Future resolved with its ack after the commit; callers
+    add done-callbacks rather than wait on it.
+    """
+
+    def __init__(self, app, flush_interval_ms: float = 200, max_pending: int = 500):
+        self.app = app
+        self.flush_interval = max(0.01, flush_interval_ms / 1000.0)
+        self.max_pending = max(1, max_pending)
+
+        self._pending: Dict[int, _PendingAttempt] = {}
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+        self.events = 0
+        self.flushes = 0
+        self.attempts_written = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.flush_ms_total = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="answer-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, student_exam_id, student_id: int, answers, seq) -> Future:
+        try:
+            student_exam_id = int(student_exam_id)
+            seq = int(seq)
+        except (TypeError, ValueError):
+            autosave_stats.reject()
+            raise AutosaveError("studentExamId / seq must be integers")
+        if not isinstance(answers, dict):
+            autosave_stats.reject()
+            raise AutosaveError("answers must be an object")
+
+        future: Future = Future()
+        with self._cond:
+            pending = self._pending.get(student_exam_id)
+            if pending is None:
+                pending = self._pending[student_exam_id] = _PendingAttempt(student_id)
+            elif pending.student_id != student_id:
+                autosave_stats.reject()
+                raise AutosaveError("Unauthorized", 403)
+            for qid, value in answers.items():
+                current = pending.answers.get(qid)
+                if current is None or seq > current[0]:
+                    pending.answers[qid] = (seq, value)
+            pending.waiters.append((future, seq))
+            pending.events += 1
+            self.events += 1
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify()
+        return future
+
+    def flush(self):
+        with self._write_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            with self.app.app_context():
+                self._write(batch)
+
+    def _write(self, batch: Dict[int, _PendingAttempt]):
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        rows, accepted = [], []
+        try:
+            attempts = _attempt_rows(batch)
+            for student_exam_id, pending in batch.items():
+                try:
+                    exam_id = _check(attempts.get(student_exam_id), pending.student_id)
+                    raw = {qid: value for qid, (_, value) in pending.answers.items()}
+                    cleaned = clean_answers(exam_id, raw)
+                except AutosaveError as e:
+                    autosave_stats.reject()
+                    for future, _ in pending.waiters:
+                        future.set_exception(e)
+                    continue
+                seqs = {}
+                for qid, (seq, _) in pending.answers.items():
+                    try:
+                        seqs[int(qid)] = seq
+                    except (TypeError, ValueError):
+                        pass
+                rows.extend(
+                    {"student_exam_id": student_exam_id, "question_id": qid, "selected_answer": selected,
+                     "answered_at": now, "client_seq": seqs[qid]}
+                    for qid, selected in cleaned.items()
+                )
+                accepted.append(pending)
+
+            written = upsert_rows(rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.errors += 1
+            print(f"❌ Answer writer flush error: {e}")
+            # clients keep the answers pending and retry (or fall back to HTTP)
+            for pending in accepted:
+                for future, _ in pending.waiters:
+                    if not future.done():
+                        future.set_exception(AutosaveError("save failed", 500))
+            return
+
+        self.flushes += 1
+        self.attempts_written += len(accepted)
+        self.rows_written += written
+        self.flush_ms_total += (time.perf_counter() - start) * 1000.0
+        autosave_stats.record(len(rows), written)
+        for pending in accepted:
+            for future, seq in pending.waiters:
+                future.set_result({"status": "saved", "seq": seq})
+
+    def close(self):
+        self._closed = True
+        with self._cond:
+            self._cond.notify()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_pending and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Answer writer error: {e}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending_attempts": pending,
+            "events": self.events,
+            "flushes": self.flushes,
+            "attempts_written": self.attempts_written,
+            "rows_written": self.rows_written,
+            "coalesced_events": self.events - self.attempts_written - pending,
+            "avg_flush_ms": round(self.flush_ms_total / self.flushes, 2) if self.flushes else 0.0,
+            "errors": self.errors,
+        }
+
+
+answer_writer: Optional[AnswerSaveWriter] = None
+
+
+def init_answer_writer(app) -> AnswerSaveWriter:
+    """Start the Socket.IO answer writer once, tuned from .env"""
+    global answer_writer
+    if answer_writer is None:
+        answer_writer = AnswerSaveWriter(
+            app,
+            flush_interval_ms=float(os.getenv("ANSWER_WRITER_FLUSH_MS", 200)),
+            max_pending=int(os.getenv("ANSWER_WRITER_MAX_ATTEMPTS", 500)),
+        )
+        atexit.register(answer_writer.close)
+        register_source("answer_writer", answer_writer.stats)
+    return answer_writer
+
+
+def get_answer_writer() -> Optional[AnswerSaveWriter]:
+    return answer_writer
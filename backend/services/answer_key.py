@@ -0,0 +1,207 @@
+"""
+Per-exam answer-key cache
+- compact key per exam: question ids, correct letters and points
+- versioned in the database: any flushed Question insert / update / delete
+  bumps Exam.questions_version (SQLAlchemy session events), and every read
+  checks the cached key against it with one primary-key lookup, so edits
+  made by another worker are seen on the next read
+- shared by grading, autosave, shuffle assignment and the result / PDF
+  views; hit / miss counters
+"""
+
+import math
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.services.metrics import register_source
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    exam_id: int
+    version: int
+    question_ids: array            # 'q', in order_number / id order
+    correct: Tuple[str, ...]       # Question.correct_answer per question
+    points: array                  # 'd', NaN where Question.points is NULL
+    _index: Dict[int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_index", {qid: i for i, qid in enumerate(self.question_ids)})
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def __contains__(self, question_id):
+        return question_id in self._index
+
+    def correct_answer(self, question_id) -> Optional[str]:
+        i = self._index.get(question_id)
+        return None if i is None else self.correct[i]
+
+    def question_points(self, question_id) -> Optional[float]:
+        """Question.points as stored (None when NULL)"""
+        i = self._index.get(question_id)
+        if i is None or math.isnan(self.points[i]):
+            return None
+        return self.points[i]
+
+    def effective_points(self, default: float):
+        """`question.points or default` for every question"""
+        return [p if p and not math.isnan(p) else default for p in self.points]
+
+    def total_points(self, default: float) -> float:
+        return float(sum(self.effective_points(default)))
+
+
+class AnswerKeyCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: Dict[int, AnswerKey] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def db_version(exam_id: int) -> int:
+        from models import Exam
+
+        return db.session.execute(
+            select(Exam.questions_version).where(Exam.id == exam_id)
+        ).scalar() or 0
+
+    def get(self, exam_id: int) -> AnswerKey:
+        exam_id = int(exam_id)
+        # version first, rows second: a key is never newer-labelled than its rows
+        version = self.db_version(exam_id)
+        key = self._keys.get(exam_id)
+        if key is not None and key.version == version:
+            with self._lock:
+                self.hits += 1
+            return key
+
+        key = self._load(exam_id, version)
+        with self._lock:
+            self.misses += 1
+            self._keys[exam_id] = key
+        return key
+
+    @staticmethod
+    def _load(exam_id: int, version: int) -> AnswerKey:
+        from models import Question
+
+        rows = db.session.execute(
+            select(Question.id, Question.correct_answer, Question.points)
+            .where(Question.exam_id == exam_id)
+            .order_by(Question.order_number, Question.id)
+        ).all()
+        return AnswerKey(
+            exam_id=exam_id,
+            version=version,
+            question_ids=array("q", (r[0] for r in rows)),
+            correct=tuple(r[1] for r in rows),
+            points=array("d", (float("nan") if r[2] is None else float(r[2]) for r in rows)),
+        )
+
+    def forget(self, exam_id):
+        with self._lock:
+            if self._keys.pop(int(exam_id), None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._keys),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+answer_keys = AnswerKeyCache()
+register_source("answer_key_cache", answer_keys.stats)
+
+
+def get_answer_key(exam_id) -> AnswerKey:
+    return answer_keys.get(exam_id)
+
+
+def _bump_versions(connection, exam_ids):
+    from models import Exam
+
+    table = Exam.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id.in_(sorted(exam_ids)))
+        .values(questions_version=func.coalesce(table.c.questions_version, 0) + 1)
+    )
+
+
+def invalidate_answer_key(exam_id):
+    """
+    For writes the session events cannot see (bulk query.delete / update):
+    bumps the exam's version in the current transaction; the caller commits.
+    """
+    _bump_versions(db.session.connection(), [int(exam_id)])
+    answer_keys.forget(exam_id)
+
+
+def answer_sheet(student_exam) -> List[dict]:
+    """
+    {'question', 'answer', 'correct_answer', 'points'} per answer of an
+    attempt for the result page / PDF: the Question rows (text, options)
+    come from one query, the correct letter and points from the answer key.
+    """
+    from models import Question
+
+    key = get_answer_key(student_exam.exam_id)
+    questions = {q.id: q for q in Question.query.filter_by(exam_id=student_exam.exam_id).all()}
+    return [
+        {
+            'question': questions.get(answer.question_id),
+            'answer': answer,
+            'correct_answer': key.correct_answer(answer.question_id),
+            'points': key.question_points(answer.question_id),
+        }
+        for answer in student_exam.answers
+    ]
+
+
+# ---------- versioning on flush ----------
+
+def _question_exam_ids(session) -> set:
+    from models import Question
+
+    return {
+        obj.exam_id for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Question) and obj.exam_id is not None
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed(session, flush_context):
+    # session.new / dirty / deleted still list what was just flushed, now
+    # with exam_id set for questions added through Exam.questions
+    exam_ids = _question_exam_ids(session)
+    if exam_ids:
+        # same transaction as the Question writes: both commit or neither
+        _bump_versions(session.connection(), exam_ids)
+        session.info.setdefault("answer_key_exams", set()).update(exam_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed(session):
+    for exam_id in session.info.pop("answer_key_exams", ()):
+        answer_keys.forget(exam_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("answer_key_exams", None)
@@ -0,0 +1,145 @@
+"""
+Write-behind sink for ExamViolation / ActivityLog rows
+- rows are buffered in memory and bulk inserted every N ms or M rows
+- flush() is synchronous (used on exam termination and shutdown)
+- writes use the sink's own session, never the caller's db.session
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from flask import has_app_context
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.services.metrics import register_source
+
+
+class EventSink:
+    """
+    Buffers insert-only rows and writes them with bulk_insert_mappings
+    (one executemany + one commit per model per flush) instead of one
+    add/commit per event.
+    """
+
+    def __init__(self, app, flush_interval_ms: float = 250, max_batch: int = 200):
+        self.app = app
+        self.flush_interval = max(0.01, flush_interval_ms / 1000.0)
+        self.max_batch = max(1, max_batch)
+
+        self._buffer: List[Tuple[type, dict]] = []
+        self._cond = threading.Condition()
+        # serialises writers so a sync flush waits for an in-progress one
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def add(self, model, **values):
+        with self._cond:
+            self._buffer.append((model, values))
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+
+    def flush(self):
+        """Write everything buffered so far before returning."""
+        with self._write_lock:
+            with self._cond:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            if has_app_context():
+                self._write(rows)
+            else:
+                with self.app.app_context():
+                    self._write(rows)
+
+    def close(self):
+        self._closed = True
+        with self._cond:
+            self._cond.notify()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._buffer) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Event sink flush error: {e}")
+
+    def _write(self, rows: List[Tuple[type, dict]]):
+        grouped = defaultdict(list)
+        for model, values in rows:
+            grouped[model].append(values)
+        try:
+            # a private session: committing (or rolling back) the request's
+            # db.session here would take its unrelated pending changes along
+            with Session(db.engine) as session, session.begin():
+                for model, mappings in grouped.items():
+                    session.bulk_insert_mappings(model, mappings)
+            self.rows_written += len(rows)
+            self.flushes += 1
+        except Exception:
+            self.errors += 1
+            # keep the rows for the next flush rather than losing them
+            with self._cond:
+                self._buffer[:0] = rows
+            raise
+
+    def stats(self) -> dict:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
+
+
+event_sink: Optional[EventSink] = None
+
+
+def init_event_sink(app) -> EventSink:
+    """Start the shared sink once, tuned from .env"""
+    global event_sink
+    if event_sink is None:
+        event_sink = EventSink(
+            app,
+            flush_interval_ms=float(os.getenv("EVENT_SINK_FLUSH_MS", 250)),
+            max_batch=int(os.getenv("EVENT_SINK_MAX_ROWS", 200)),
+        )
+        atexit.register(event_sink.close)
+        register_source("event_sink", event_sink.stats)
+        print("✅ Buffered violation/event writer started")
+    return event_sink
+
+
+def record_event(model, **values):
+    """Queue an insert-only row; writes immediately when no sink is running."""
+    if event_sink is not None:
+        event_sink.add(model, **values)
+    else:
+        db.session.add(model(**values))
+
+
+def flush_events():
+    """Synchronously persist buffered rows (exam termination / submit)."""
+    if event_sink is not None:
+        event_sink.flush()
@@ -0,0 +1,186 @@
+"""
+Bulk exam close-out
+- a background job finds in_progress StudentExam rows past their deadline
+  (started_at + duration_minutes, or Exam.end_time when that is earlier)
+- grades them per exam with one set-based pass (services/grading.py) and
+  writes the results in chunked transactions
+- on_closed(exam, ids, whole_exam) lets the routes release live sessions,
+  log and broadcast once per room
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from backend.database import db
+from backend.services.grading import SUBMIT_POLICY, apply_grades, grade_attempts
+from backend.services.metrics import register_source
+from backend.services.violation_counters import get_violation_counters
+
+# exam duration when duration_minutes is empty, as in take_exam
+DEFAULT_DURATION_MINUTES = 60
+
+
+def attempt_deadline(started_at, duration_minutes, end_time) -> Optional[datetime]:
+    deadlines = []
+    if started_at is not None:
+        deadlines.append(started_at + timedelta(minutes=duration_minutes or DEFAULT_DURATION_MINUTES))
+    if end_time is not None:
+        deadlines.append(end_time)
+    return min(deadlines) if deadlines else None
+
+
+def close_attempts(exam, student_exam_ids: List[int], submitted_at: Optional[datetime] = None,
+                   chunk_size: int = 200) -> List[int]:
+    """
+    Grade (SUBMIT_POLICY) and submit attempts of one exam, one transaction
+    per chunk. Attempts no longer in_progress when their chunk runs (the
+    student submitted meanwhile) are skipped. Returns the ids closed.
+    """
+    from models import StudentExam
+
+    submitted_at = submitted_at or datetime.utcnow()
+    counters = get_violation_counters()
+    closed: List[int] = []
+    ids = sorted(set(student_exam_ids))
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        try:
+            live = list(db.session.scalars(
+                select(StudentExam.id).where(StudentExam.id.in_(chunk), StudentExam.status == 'in_progress')
+            ))
+            if not live:
+                continue
+            grades = grade_attempts(exam, live, SUBMIT_POLICY)
+            final_counts = counters.final_counts(live) if counters is not None else None
+            apply_grades(grades, status='submitted', submitted_at=submitted_at, extra=final_counts)
+            db.session.commit()
+            # only now: a rolled-back chunk keeps its live counters
+            if counters is not None:
+                counters.release_many(live)
+            closed.extend(live)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Close-out error (exam {exam.id}, {len(chunk)} attempts): {e}")
+    return closed
+
+
+class ExamCloseout:
+    def __init__(self, app, on_closed: Optional[Callable] = None, interval: float = 30.0,
+                 grace: float = 30.0, chunk_size: int = 200):
+        self.app = app
+        self.on_closed = on_closed
+        self.interval = interval
+        self.grace = timedelta(seconds=grace)
+        self.chunk_size = chunk_size
+        self.runs = 0
+        self.attempts_graded = 0
+        self.last_report: dict = {}
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, name="exam-closeout", daemon=True)
+            self._thread.start()
+
+    def overdue(self, now: datetime) -> Dict[int, List[int]]:
+        """exam_id -> in_progress attempt ids whose deadline (+ grace) has passed"""
+        from models import Exam, StudentExam
+
+        rows = db.session.execute(
+            select(StudentExam.id, StudentExam.exam_id, StudentExam.started_at,
+                   Exam.duration_minutes, Exam.end_time)
+            .join(Exam, Exam.id == StudentExam.exam_id)
+            .where(StudentExam.status == 'in_progress')
+        )
+        due = defaultdict(list)
+        for se_id, exam_id, started_at, duration, end_time in rows:
+            deadline = attempt_deadline(started_at, duration, end_time)
+            if deadline is not None and deadline + self.grace <= now:
+                due[exam_id].append(se_id)
+        return due
+
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        """Close every overdue attempt; returns the run report"""
+        from models import Exam
+
+        with self._run_lock, self.app.app_context():
+            start = time.perf_counter()
+            now = now or datetime.utcnow()
+            graded, exams = 0, 0
+            for exam_id, ids in self.overdue(now).items():
+                exam = db.session.get(Exam, exam_id)
+                if exam is None:
+                    continue
+                closed = close_attempts(exam, ids, submitted_at=now, chunk_size=self.chunk_size)
+                if not closed:
+                    continue
+                graded += len(closed)
+                exams += 1
+                whole_exam = exam.end_time is not None and exam.end_time + self.grace <= now
+                if self.on_closed is not None:
+                    try:
+                        self.on_closed(exam, closed, whole_exam)
+                    except Exception as e:
+                        print(f"⚠️ Close-out callback error (exam {exam_id}): {e}")
+
+            report = {
+                "attempts": graded,
+                "exams": exams,
+                "duration_ms": round((time.perf_counter() - start) * 1000.0, 1),
+                "at": now.isoformat(),
+            }
+            self.runs += 1
+            self.attempts_graded += graded
+            self.last_report = report
+            if graded:
+                print(f"🧹 Close-out: graded {graded} attempts across {exams} exams in {report['duration_ms']} ms")
+            return report
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Close-out run failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "attempts_graded": self.attempts_graded,
+            "interval_s": self.interval,
+            "last_run": dict(self.last_report),
+        }
+
+
+exam_closeout: Optional[ExamCloseout] = None
+
+
+def init_exam_closeout(app, on_closed: Optional[Callable] = None) -> ExamCloseout:
+    """Start the close-out job once; EXAM_CLOSEOUT_SECONDS=0 leaves it manual"""
+    global exam_closeout
+    if exam_closeout is None:
+        exam_closeout = ExamCloseout(
+            app,
+            on_closed=on_closed,
+            interval=float(os.getenv("EXAM_CLOSEOUT_SECONDS", 30)),
+            grace=float(os.getenv("EXAM_CLOSEOUT_GRACE_SECONDS", 30)),
+            chunk_size=int(os.getenv("EXAM_CLOSEOUT_CHUNK", 200)),
+        )
+        atexit.register(exam_closeout.close)
+        register_source("exam_closeout", exam_closeout.stats)
+    return exam_closeout
+
+
+def get_exam_closeout() -> Optional[ExamCloseout]:
+    return exam_closeout
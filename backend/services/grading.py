@@ -0,0 +1,249 @@
+"""
+Set-based grading engine
+- scores one attempt or every attempt of an exam with a handful of SQL
+  statements instead of loading Question / StudentAnswer ORM objects
+- unanswered questions get a "0" StudentAnswer row, as before
+- question ids / total points come from the shared answer-key cache,
+  checked against Exam.questions_version on every call
+- is_correct / points_earned are written in bulk; StudentExam totals are
+  returned (or written in bulk by apply_grades)
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, case, func, insert, literal, or_, select, true, update
+
+from backend.database import db
+from backend.services.answer_key import get_answer_key
+from models import Question, StudentAnswer, StudentExam
+
+# ids per statement, below SQLite's bound-parameter limit
+GRADING_CHUNK = 400
+
+
+@dataclass(frozen=True)
+class GradingPolicy:
+    """
+    The grading rules the routes have always applied:
+      default_points  - points for a question whose points are NULL or 0
+      normalize       - compare stripped answers; blank answers are stored
+                        as "0" and a missing answered_at is filled in
+      passing_default - pass mark when the exam has none (percent)
+    """
+    default_points: float
+    normalize: bool
+    passing_default: float
+
+
+# submit_exam: `q.points or 0.0`, stripped comparison, blanks -> "0"
+SUBMIT_POLICY = GradingPolicy(default_points=0.0, normalize=True, passing_default=0.0)
+# calculate_student_score: `q.points or 1.0`, raw comparison, pass mark 50
+SCORE_POLICY = GradingPolicy(default_points=1.0, normalize=False, passing_default=50.0)
+
+
+@dataclass
+class AttemptGrade:
+    student_exam_id: int
+    score: float
+    total_points: float
+    correct_count: int
+    total_questions: int
+    percentage: float
+    passed: bool
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(ids), GRADING_CHUNK):
+        yield ids[i:i + GRADING_CHUNK]
+
+
+def _points_expr(column, policy: GradingPolicy):
+    """`question.points or policy.default_points` in SQL"""
+    return case(
+        (or_(column.is_(None), column == 0), literal(policy.default_points)),
+        else_=column,
+    )
+
+
+def _selected_expr(policy: GradingPolicy):
+    sel = StudentAnswer.selected_answer
+    return func.trim(sel) if policy.normalize else sel
+
+
+def _insert_unanswered(ids: List[int], question_ids: List[int], now: datetime):
+    """A "0" StudentAnswer for every question an attempt has no row for"""
+    sa = StudentAnswer.__table__
+    existing = set(db.session.execute(
+        select(sa.c.student_exam_id, sa.c.question_id).where(sa.c.student_exam_id.in_(ids))
+    ).all())
+    rows = [
+        {"student_exam_id": se_id, "question_id": qid, "selected_answer": "0",
+         "is_correct": False, "points_earned": 0.0, "answered_at": now}
+        for se_id in ids for qid in question_ids
+        if (se_id, qid) not in existing
+    ]
+    if rows:
+        db.session.execute(insert(sa), rows)
+
+
+def _mark_answers(exam_id: int, ids: List[int], policy: GradingPolicy, now: datetime):
+    """Bulk is_correct / points_earned for the attempts' answers to this exam"""
+    exam_questions = select(Question.id).where(Question.exam_id == exam_id)
+    scope = and_(StudentAnswer.student_exam_id.in_(ids), StudentAnswer.question_id.in_(exam_questions))
+    sync = {"synchronize_session": False}
+
+    if policy.normalize:
+        raw = StudentAnswer.selected_answer
+        db.session.execute(
+            update(StudentAnswer)
+            .where(scope, or_(raw.is_(None), func.trim(raw).in_(("", "0"))))
+            .values(selected_answer="0")
+            .execution_options(**sync)
+        )
+        db.session.execute(
+            update(StudentAnswer)
+            .where(scope, StudentAnswer.answered_at.is_(None))
+            .values(answered_at=now)
+            .execution_options(**sync)
+        )
+
+    sel = _selected_expr(policy)
+    correct_answer = (
+        select(Question.correct_answer).where(Question.id == StudentAnswer.question_id).scalar_subquery()
+    )
+    points = (
+        select(_points_expr(Question.points, policy)).where(Question.id == StudentAnswer.question_id).scalar_subquery()
+    )
+    is_correct = and_(
+        sel.isnot(None),
+        sel != "",
+        (sel != "0") if policy.normalize else true(),
+        func.upper(sel) == func.upper(correct_answer),
+    )
+    db.session.execute(
+        update(StudentAnswer)
+        .where(scope)
+        .values(
+            is_correct=case((is_correct, True), else_=False),
+            points_earned=case((is_correct, points), else_=0.0),
+        )
+        .execution_options(**sync)
+    )
+
+
+def _totals(exam_id: int, ids: List[int]) -> Dict[int, tuple]:
+    """student_exam_id -> (score, correct_count); one row per question counts"""
+    sa = StudentAnswer.__table__
+    per_question = (
+        select(
+            sa.c.student_exam_id,
+            func.max(sa.c.points_earned).label("points"),
+            func.max(case((sa.c.is_correct == true(), 1), else_=0)).label("correct"),
+        )
+        .where(
+            sa.c.student_exam_id.in_(ids),
+            sa.c.question_id.in_(select(Question.id).where(Question.exam_id == exam_id)),
+        )
+        .group_by(sa.c.student_exam_id, sa.c.question_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(
+            per_question.c.student_exam_id,
+            func.coalesce(func.sum(per_question.c.points), 0.0),
+            func.coalesce(func.sum(per_question.c.correct), 0),
+        ).group_by(per_question.c.student_exam_id)
+    )
+    return {se_id: (float(score), int(correct)) for se_id, score, correct in rows}
+
+
+def grade_attempts(exam, student_exam_ids: Optional[Iterable[int]] = None,
+                   policy: GradingPolicy = SCORE_POLICY) -> Dict[int, AttemptGrade]:
+    """
+    Grade attempts of one exam (all of them when student_exam_ids is None).
+    Answers are updated in the current transaction; the caller commits.
+    """
+    of_exam = select(StudentExam.id).where(StudentExam.exam_id == exam.id)
+    if student_exam_ids is None:
+        ids = list(db.session.scalars(of_exam))
+    else:
+        wanted = sorted({int(i) for i in student_exam_ids})
+        ids = [se_id for chunk in _chunks(wanted)
+               for se_id in db.session.scalars(of_exam.where(StudentExam.id.in_(chunk)))]
+    if not ids:
+        return {}
+
+    key = get_answer_key(exam.id)
+    question_ids = list(key.question_ids)
+    total_questions = len(question_ids)
+    total_points = key.total_points(policy.default_points)
+    passing = exam.passing_score or policy.passing_default
+
+    now = datetime.utcnow()
+    totals: Dict[int, tuple] = {}
+    for chunk in _chunks(ids):
+        if total_questions:
+            _insert_unanswered(chunk, question_ids, now)
+            _mark_answers(exam.id, chunk, policy, now)
+        totals.update(_totals(exam.id, chunk))
+
+    grades = {}
+    for se_id in ids:
+        score, correct = totals.get(se_id, (0.0, 0))
+        percentage = (score / total_points * 100.0) if total_points > 0 else 0.0
+        grades[se_id] = AttemptGrade(
+            student_exam_id=se_id,
+            score=score,
+            total_points=total_points,
+            correct_count=correct,
+            total_questions=total_questions,
+            percentage=percentage,
+            passed=percentage >= passing,
+        )
+    return grades
+
+
+def grade_attempt(student_exam, policy: GradingPolicy = SCORE_POLICY) -> AttemptGrade:
+    """Grade a single attempt (see grade_attempts)"""
+    return grade_attempts(student_exam.exam, [student_exam.id], policy)[student_exam.id]
+
+
+def apply_grades(grades: Dict[int, AttemptGrade], status: str = 'completed', submitted_at: Optional[datetime] = None,
+                 extra: Optional[Dict[int, dict]] = None):
+    """
+    Bulk-write score / total_points / percentage / passed (rounded to 2
+    places, as calculate_student_score does), status and, with
+    submitted_at, time_taken_minutes onto StudentExam rows. `extra` adds
+    per-attempt columns (e.g. final violation counters). The caller
+    commits.
+    """
+    if not grades:
+        return
+    started = {}
+    if submitted_at is not None:
+        for chunk in _chunks(list(grades)):
+            started.update(db.session.execute(
+                select(StudentExam.id, StudentExam.started_at).where(StudentExam.id.in_(chunk))
+            ).all())
+
+    mappings = []
+    for se_id, grade in grades.items():
+        row = {
+            "id": se_id,
+            "score": round(grade.score, 2),
+            "total_points": round(grade.total_points, 2),
+            "percentage": round(grade.percentage, 2),
+            "passed": grade.passed,
+            "status": status,
+            "completed": True,
+        }
+        if submitted_at is not None:
+            row["submitted_at"] = submitted_at
+            if started.get(se_id):
+                row["time_taken_minutes"] = int((submitted_at - started[se_id]).total_seconds() / 60)
+        if extra and se_id in extra:
+            row.update(extra[se_id])
+        mappings.append(row)
+    db.session.bulk_update_mappings(StudentExam, mappings)
@@ -0,0 +1,25 @@
+"""
+Import / export facade for the routes
+- pandas (and openpyxl / xlrd behind read_excel) is imported on the first
+  upload, not when the app starts
+"""
+
+
+def read_csv(file, **kwargs):
+    import pandas as pd
+    return pd.read_csv(file, **kwargs)
+
+
+def read_excel(file, **kwargs):
+    import pandas as pd
+    return pd.read_excel(file, **kwargs)
+
+
+def data_frame(data, **kwargs):
+    import pandas as pd
+    return pd.DataFrame(data, **kwargs)
+
+
+def isna(value) -> bool:
+    import pandas as pd
+    return pd.isna(value)
@@ -0,0 +1,367 @@
+"""
+Lightweight in-process metrics for the proctoring hot path
+Latency counters and gauges, readable through /api/proctor/metrics
+Per-stage frame timings (histograms, sampleable per exam) and a
+Prometheus text rendering of everything for /metrics
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+
+
+class LatencyStats:
+    """Thread-safe count / total / max latency counter (milliseconds)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.last_ms = ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "last_ms": round(self.last_ms, 3),
+            }
+
+
+# name -> callable returning a dict of values
+_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def register_source(name: str, fn: Callable[[], dict]):
+    """Expose a group of metrics under `name` (re-registering replaces it)"""
+    _sources[name] = fn
+
+
+def snapshot() -> dict:
+    data = {}
+    for name, fn in list(_sources.items()):
+        try:
+            data[name] = fn()
+        except Exception as e:
+            data[name] = {"error": str(e)}
+    return data
+
+
+# ==============================================================
+# PER-STAGE FRAME TIMINGS
+# ==============================================================
+
+STAGE_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds), Prometheus-style"""
+
+    def __init__(self, buckets=STAGE_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def record(self, ms: float):
+        i = bisect_left(self.buckets, ms)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum_ms += ms
+
+    def cumulative(self):
+        """[(upper bound ms or None for +Inf, cumulative count)], count, sum_ms"""
+        with self._lock:
+            counts, count, sum_ms = list(self.counts), self.count, self.sum_ms
+        out, running = [], 0
+        for bound, n in zip(self.buckets + (None,), counts):
+            running += n
+            out.append((bound, running))
+        return out, count, sum_ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (coarse)"""
+        buckets, count, _ = self.cumulative()
+        if not count:
+            return 0.0
+        rank = q * count
+        for bound, running in buckets:
+            if running >= rank:
+                return float(bound if bound is not None else self.buckets[-1])
+        return float(self.buckets[-1])
+
+    def snapshot(self) -> dict:
+        _, count, sum_ms = self.cumulative()
+        return {
+            "count": count,
+            "avg_ms": round(sum_ms / count, 3) if count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+        }
+
+
+class StageSampling:
+    """
+    Which frames get per-stage timings:
+      PROCTOR_STAGE_TIMING=0 turns the layer off (one attribute check per frame)
+      PROCTOR_STAGE_SAMPLE_RATE - fraction of frames timed (default 1.0)
+      PROCTOR_STAGE_EXAMS="12,15:0.25" - exams with their own series and rate
+    Exams without their own rate are aggregated under exam="all".
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("PROCTOR_STAGE_TIMING", "1").lower() not in ("0", "false", "no")
+        self.default_rate = float(os.getenv("PROCTOR_STAGE_SAMPLE_RATE", 1.0))
+        self.exam_rates: Dict[str, float] = {}
+        for item in filter(None, (p.strip() for p in os.getenv("PROCTOR_STAGE_EXAMS", "").split(","))):
+            exam_id, _, rate = item.partition(":")
+            self.exam_rates[exam_id] = float(rate) if rate else 1.0
+
+    def set_exam(self, exam_id, rate: Optional[float]):
+        """Give an exam its own series at `rate` (None returns it to "all")"""
+        if rate is None:
+            self.exam_rates.pop(str(exam_id), None)
+        else:
+            self.exam_rates[str(exam_id)] = max(0.0, min(1.0, float(rate)))
+
+    def label_for(self, exam_id) -> Optional[str]:
+        """Series label for a frame of exam_id, or None when it is not sampled"""
+        key = str(exam_id) if exam_id is not None else None
+        if key in self.exam_rates:
+            label, rate = key, self.exam_rates[key]
+        else:
+            label, rate = "all", self.default_rate
+        if rate >= 1.0 or (rate > 0.0 and random.random() < rate):
+            return label
+        return None
+
+
+stage_sampling = StageSampling()
+_stage_histograms: Dict[Tuple[str, str], Histogram] = {}
+_stage_lock = threading.Lock()
+_frame_local = threading.local()
+
+
+def _stage_histogram(stage: str, exam: str) -> Histogram:
+    key = (stage, exam)
+    hist = _stage_histograms.get(key)
+    if hist is None:
+        with _stage_lock:
+            hist = _stage_histograms.setdefault(key, Histogram())
+    return hist
+
+
+class FrameTimer:
+    """Stage durations of one frame; mark() closes the stage since the last mark"""
+
+    __slots__ = ("exam", "start", "last", "stages")
+
+    def __init__(self, exam: str):
+        self.exam = exam
+        self.start = self.last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last) * 1000.0
+        self.last = now
+
+    def observe(self, stage: str, ms: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def finish(self, total: Optional[str]):
+        for stage, ms in self.stages.items():
+            _stage_histogram(stage, self.exam).record(ms)
+        if total:
+            _stage_histogram(total, self.exam).record((time.perf_counter() - self.start) * 1000.0)
+
+
+def begin_frame(exam_id=None) -> bool:
+    """Start timing the current thread's frame; False when not sampled"""
+    if not stage_sampling.enabled:
+        return False
+    label = stage_sampling.label_for(exam_id)
+    _frame_local.timer = FrameTimer(label) if label is not None else None
+    return label is not None
+
+
+def mark(stage: str):
+    """Close `stage` for the frame being timed on this thread (no-op otherwise)"""
+    timer = getattr(_frame_local, "timer", None)
+    if timer is not None:
+        timer.mark(stage)
+
+
+def observe(stage: str, ms: float):
+    """Add a duration measured elsewhere (e.g. queue wait) to the current frame"""
+    timer = getattr(_frame_local, "timer", None)
+    if timer is not None:
+        timer.observe(stage, ms)
+
+
+def end_frame(total: Optional[str] = "total"):
+    """Record the frame's stages (and its end-to-end time under `total`)"""
+    timer = getattr(_frame_local, "timer", None)
+    if timer is not None:
+        _frame_local.timer = None
+        timer.finish(total)
+
+
+def stage_snapshot() -> dict:
+    with _stage_lock:
+        items = list(_stage_histograms.items())
+    data: Dict[str, dict] = {}
+    for (stage, exam), hist in sorted(items):
+        data.setdefault(exam, {})[stage] = hist.snapshot()
+    return {
+        "enabled": stage_sampling.enabled,
+        "sample_rate": stage_sampling.default_rate,
+        "exam_rates": dict(stage_sampling.exam_rates),
+        "by_exam": data,
+    }
+
+
+register_source("stages", stage_snapshot)
+
+
+# ==============================================================
+# CV TIMINGS (recorded in the web process)
+# ==============================================================
+# Decode and detection may run in CV worker processes whose counters
+# never reach this process; they return their timings instead and the
+# caller records them here with record_cv_timings.
+
+class DecodeStats:
+    """Per-frame decode latency plus decoded buffer sizes (bytes)"""
+
+    def __init__(self):
+        self.latency = LatencyStats()
+        self._lock = threading.Lock()
+        self.reduced = {1: 0, 2: 0, 4: 0}
+        self.peak_bytes = 0
+        self.decoded_bytes = 0
+        self.full_bytes = 0
+
+    def record(self, ms: float, factor: int, decoded_bytes: int, full_bytes: int):
+        self.latency.record(ms)
+        with self._lock:
+            self.reduced[factor] = self.reduced.get(factor, 0) + 1
+            self.decoded_bytes += decoded_bytes
+            self.full_bytes += full_bytes
+            if decoded_bytes > self.peak_bytes:
+                self.peak_bytes = decoded_bytes
+
+    def snapshot(self) -> dict:
+        data = self.latency.snapshot()
+        with self._lock:
+            count = data["count"] or 1
+            data.update({
+                "by_factor": {str(k): v for k, v in self.reduced.items()},
+                "peak_frame_kb": round(self.peak_bytes / 1024.0, 1),
+                "avg_frame_kb": round(self.decoded_bytes / count / 1024.0, 1),
+                "avg_full_frame_kb": round(self.full_bytes / count / 1024.0, 1),
+            })
+        return data
+
+
+decode_stats = DecodeStats()
+_detector_latency: Dict[str, LatencyStats] = {}
+
+
+def detector_latency(backend: str) -> LatencyStats:
+    """Latency counter of one face detector backend ('haar' / 'openvino')"""
+    stats = _detector_latency.get(backend)
+    if stats is None:
+        with _stage_lock:
+            stats = _detector_latency.setdefault(backend, LatencyStats())
+    return stats
+
+
+def detector_stats() -> dict:
+    return {name: stats.snapshot() for name, stats in sorted(_detector_latency.items())}
+
+
+def record_cv_timings(timings: Optional[dict]):
+    """
+    Record what detect_frame_bytes measured (possibly in another process):
+    decode stats, detector latency and the frame's decode / detect stages
+    """
+    if not timings:
+        return
+    if timings.get("decoded_bytes") is not None:
+        decode_stats.record(timings["decode_ms"], timings["factor"],
+                            timings["decoded_bytes"], timings["full_bytes"])
+    if "decode_ms" in timings:
+        observe("decode", timings["decode_ms"])
+    if "detect_ms" in timings:
+        detector_latency(timings["backend"]).record(timings["detect_ms"])
+        observe("detect", timings["detect_ms"])
+
+
+register_source("frame_decode", decode_stats.snapshot)
+register_source("detectors", detector_stats)
+
+
+# ==============================================================
+# PROMETHEUS TEXT FORMAT
+# ==============================================================
+
+_PROM_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _prom_name(*parts) -> str:
+    return _PROM_NAME.sub("_", "_".join(str(p) for p in parts if p != "")).lower()
+
+
+def _flatten(prefix: str, value, out: list):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(_prom_name(prefix, k), v, out)
+
+
+def prometheus_text() -> str:
+    """Stage histograms plus every numeric value of the registered sources as gauges"""
+    lines = [
+        "# HELP proctor_stage_duration_seconds Time spent per proctoring frame stage",
+        "# TYPE proctor_stage_duration_seconds histogram",
+    ]
+    with _stage_lock:
+        items = sorted(_stage_histograms.items())
+    for (stage, exam), hist in items:
+        labels = f'stage="{stage}",exam="{exam}"'
+        buckets, count, sum_ms = hist.cumulative()
+        for bound, running in buckets:
+            le = "+Inf" if bound is None else repr(bound / 1000.0)
+            lines.append(f'proctor_stage_duration_seconds_bucket{{{labels},le="{le}"}} {running}')
+        lines.append(f"proctor_stage_duration_seconds_sum{{{labels}}} {sum_ms / 1000.0:.6f}")
+        lines.append(f"proctor_stage_duration_seconds_count{{{labels}}} {count}")
+
+    for name, values in snapshot().items():
+        if name == "stages":
+            continue
+        gauges: list = []
+        _flatten(_prom_name("proctor", name), values, gauges)
+        for metric, value in gauges:
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
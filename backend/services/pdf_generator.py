@@ -342,7 +342,6 @@ def create_summary_table(answers_with_questions, styles):
     
     # Question rows
     for idx, item in enumerate(answers_with_questions, 1):
-        question = item['question']
         answer = item['answer']
         
         result_icon = '✓' if answer.is_correct else '✗'
@@ -352,9 +351,9 @@ def create_summary_table(answers_with_questions, styles):
         summary_data.append([
             str(idx),
             your_answer,
-            question.correct_answer,
+            item['correct_answer'],
             Paragraph(result_color, styles['Normal']),
-            f"{answer.points_earned:.1f}/{question.points:.1f}"
+            f"{answer.points_earned:.1f}/{item['points']:.1f}"
         ])
     
     summary_table = Table(
@@ -412,7 +411,7 @@ def create_detailed_questions(answers_with_questions, styles):
         header_data = [[
             Paragraph(f"<b>Question {idx}</b>", styles['Normal']),
             Paragraph(f"<b>{'✓ Correct' if is_correct else '✗ Incorrect'}</b>", styles['Normal']),
-            Paragraph(f"<b>{answer.points_earned:.1f}/{question.points:.1f} points</b>", styles['Normal'])
+            Paragraph(f"<b>{answer.points_earned:.1f}/{item['points']:.1f} points</b>", styles['Normal'])
         ]]
         
         header_table = Table(header_data, colWidths=[3.3*inch, 1.8*inch, 1.4*inch])
@@ -445,7 +444,7 @@ def create_detailed_questions(answers_with_questions, styles):
         for label, option_text in zip(option_labels, option_values):
             if option_text:  # Only show non-empty options
                 # Determine styling based on correct answer and student's answer
-                is_correct_option = (label == question.correct_answer)
+                is_correct_option = (label == item['correct_answer'])
                 is_student_answer = (label == answer.selected_answer)
                 
                 if is_correct_option and is_student_answer:
@@ -475,7 +474,7 @@ def create_detailed_questions(answers_with_questions, styles):
         
         answer_info_data = [[
             Paragraph(f"<b>Your Answer:</b> {answer.selected_answer or 'Not Answered'}", styles['Normal']),
-            Paragraph(f"<b>Correct Answer:</b> {question.correct_answer}", styles['Normal'])
+            Paragraph(f"<b>Correct Answer:</b> {item['correct_answer']}", styles['Normal'])
         ]]
         
         answer_info_table = Table(answer_info_data, colWidths=[3.3*inch, 3.2*inch])
@@ -758,7 +757,8 @@ def generate_result_pdf(student_exam, exam, student, answers_with_questions):
         student_exam: StudentExam object
         exam: Exam object
         student: User object (student)
-        answers_with_questions: List of dicts with 'question' and 'answer' keys
+        answers_with_questions: List of dicts with 'question', 'answer', 'correct_answer'
+            and 'points' keys (answer_key.answer_sheet)
     
     Returns:
         BytesIO buffer containing the PDF
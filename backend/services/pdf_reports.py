@@ -0,0 +1,14 @@
+"""
+PDF facade for the routes
+- reportlab is imported on the first download, not when the app starts
+"""
+
+
+def generate_result_pdf(*args, **kwargs):
+    from backend.services.pdf_generator import generate_result_pdf as _generate
+    return _generate(*args, **kwargs)
+
+
+def generate_batch_report_pdf(*args, **kwargs):
+    from backend.services.pdf_generator import generate_batch_report_pdf as _generate
+    return _generate(*args, **kwargs)
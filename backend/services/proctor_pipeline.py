@@ -0,0 +1,201 @@
+"""
+Off-request-thread proctoring pipeline for Socket.IO frameBinary events
+- handlers only enqueue; a bounded pool does decode, detection and DB work
+- latest-frame-wins mailbox per student with stale / overflow dropping
+- CV runs in worker processes (PROCTOR_CV_WORKERS), I/O in threads
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from backend.services.metrics import record_cv_timings, register_source
+
+
+@dataclass
+class FrameJob:
+    key: int                 # student_exam_id
+    frame_bytes: bytes
+    sid: Optional[str] = None
+    received_at: float = field(default_factory=time.time)
+
+
+def detect_frame_bytes(frame_bytes: bytes, backend: str):
+    """
+    Decode a JPEG frame and find its face boxes in source-frame pixels.
+    Returns (faces, timings); faces is None when decoding fails. Runs
+    inside CV worker processes, so imports stay local and nothing is
+    recorded here - pass timings to metrics.record_cv_timings.
+    """
+    from backend.services.proctor_vision.detectors import get_detector
+    from backend.utils.frame_io import measure_decode_frame, scale_box
+
+    detector = get_detector(backend)
+    frame, factor, timings = measure_decode_frame(frame_bytes, detector.input_size)
+    if frame is None:
+        return None, timings
+    boxes, timings["detect_ms"] = detector.measured_detect(frame)
+    timings["backend"] = detector.name
+    return [scale_box(box, factor) for box in boxes], timings
+
+
+def detect_and_record(frame_bytes: bytes, backend: str):
+    """detect_frame_bytes in this process with its timings recorded, returns faces"""
+    faces, timings = detect_frame_bytes(frame_bytes, backend)
+    record_cv_timings(timings)
+    return faces
+
+
+class FramePipeline:
+    """
+    Bounded worker pool fed by handle_frame_binary.
+
+    Only the newest frame per student is kept: a new frame replaces one
+    that is still waiting (superseded). When more than max_pending
+    students are waiting, the oldest waiting frame is dropped (overflow),
+    and frames older than max_age seconds are skipped (stale).
+
+    handler(job, run_cv) is called on an I/O thread inside an app context;
+    run_cv(frame_bytes, backend) returns boxes from the CV pool and
+    records the worker's decode / detection timings in this process.
+    """
+
+    def __init__(
+        self,
+        app,
+        handler: Callable,
+        cv_workers: int = 2,
+        io_workers: int = 4,
+        max_pending: int = 500,
+        max_age: float = 6.0,
+    ):
+        self.app = app
+        self.handler = handler
+        self.max_pending = max_pending
+        self.max_age = max_age
+
+        self._pending: "OrderedDict[int, FrameJob]" = OrderedDict()
+        self._active = set()
+        self._cond = threading.Condition()
+
+        self.cv_pool = None
+        if cv_workers > 0:
+            # spawn: forking a process that already runs threads is unsafe
+            self.cv_pool = ProcessPoolExecutor(
+                max_workers=cv_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        self.in_flight = 0
+        self.processed = 0
+        self.errors = 0
+        self.dropped = {"superseded": 0, "overflow": 0, "stale": 0}
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"proctor-io-{i}", daemon=True)
+            for i in range(max(1, io_workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ---------- producer side (Socket.IO handler) ----------
+
+    def submit(self, key: int, frame_bytes: bytes, sid: Optional[str] = None):
+        job = FrameJob(key=key, frame_bytes=frame_bytes, sid=sid)
+        with self._cond:
+            if key in self._pending:
+                # replace in place so the student keeps its queue position
+                self.dropped["superseded"] += 1
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped["overflow"] += 1
+            self._pending[key] = job
+            self._cond.notify()
+
+    # ---------- consumer side ----------
+
+    def run_cv(self, frame_bytes: bytes, backend: str):
+        if self.cv_pool is None:
+            return detect_and_record(frame_bytes, backend)
+        # worker-process counters never reach /metrics: record here
+        faces, timings = self.cv_pool.submit(detect_frame_bytes, frame_bytes, backend).result()
+        record_cv_timings(timings)
+        return faces
+
+    def _pop_ready(self) -> Optional[FrameJob]:
+        # one frame per student at a time keeps its counters consistent
+        for key in self._pending:
+            if key not in self._active:
+                return self._pending.pop(key)
+        return None
+
+    def _next_job(self) -> FrameJob:
+        with self._cond:
+            while True:
+                job = self._pop_ready()
+                if job is None:
+                    self._cond.wait()
+                    continue
+                if time.time() - job.received_at > self.max_age:
+                    self.dropped["stale"] += 1
+                    continue
+                self._active.add(job.key)
+                self.in_flight += 1
+                return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            try:
+                with self.app.app_context():
+                    self.handler(job, self.run_cv)
+                self.processed += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Proctoring worker error: {e}")
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self._active.discard(job.key)
+                    self.in_flight -= 1
+                    self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "in_flight": self.in_flight,
+                "processed": self.processed,
+                "errors": self.errors,
+                "dropped": dict(self.dropped),
+            }
+
+
+frame_pipeline: Optional[FramePipeline] = None
+
+
+def init_frame_pipeline(app, handler: Callable) -> FramePipeline:
+    """Start the shared pipeline once, sized from .env"""
+    global frame_pipeline
+    if frame_pipeline is None:
+        frame_pipeline = FramePipeline(
+            app,
+            handler,
+            cv_workers=int(os.getenv("PROCTOR_CV_WORKERS", 2)),
+            io_workers=int(os.getenv("PROCTOR_IO_WORKERS", 4)),
+            max_pending=int(os.getenv("PROCTOR_MAX_QUEUE", 500)),
+            max_age=float(os.getenv("PROCTOR_FRAME_MAX_AGE", 6.0)),
+        )
+        register_source("frame_pipeline", frame_pipeline.stats)
+        print("✅ Proctoring worker pool started")
+    return frame_pipeline
+
+
+def get_frame_pipeline() -> Optional[FramePipeline]:
+    return frame_pipeline
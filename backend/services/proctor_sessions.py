@@ -0,0 +1,181 @@
+"""
+Bounded registry of live OpenVINO proctoring sessions
+- LRU order with an idle TTL and a hard cap on live sessions
+- explicit release on submit / terminate / Socket.IO disconnect
+- live-session and approximate memory-per-session gauges
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from backend.services.metrics import register_source
+
+
+def session_bytes(entry) -> int:
+    """
+    Approximate memory held by one (ProctorState, OpenVINOProctor) entry:
+    the Python objects plus the numpy buffers a session keeps (tracker
+    template, motion-gate thumbnail). Compiled models are shared and not
+    counted.
+    """
+    state, vision = entry
+    total = sys.getsizeof(state) + sys.getsizeof(state.__dict__)
+    total += sys.getsizeof(vision) + sys.getsizeof(vision.__dict__)
+    for holder, attr in (
+        (getattr(vision, "tracker", None), "_template"),
+        (getattr(vision, "gate", None), "_ref_thumb"),
+    ):
+        buf = getattr(holder, attr, None) if holder is not None else None
+        total += getattr(buf, "nbytes", 0)   # numpy buffer; no numpy import here
+    return total
+
+
+class SessionRegistry:
+    """
+    student_exam_id -> (ProctorState, OpenVINOProctor), least recently
+    used first. Sessions idle for longer than idle_ttl seconds, or beyond
+    max_sessions, are evicted; their ProctorState is already persisted by
+    the state store, so a later request simply rehydrates them.
+    """
+
+    def __init__(self, max_sessions: int = 2000, idle_ttl: float = 1800.0, sweep_interval: float = 60.0):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+
+        self._sessions: "OrderedDict[int, list]" = OrderedDict()   # key -> [entry, last_used]
+        self._sids: Dict[str, Set[int]] = {}
+        self._lock = threading.RLock()
+        self.evicted = {"idle": 0, "capacity": 0, "finished": 0, "disconnect": 0}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- lookup ----------
+
+    def get(self, key):
+        with self._lock:
+            item = self._sessions.get(key)
+            if item is None:
+                return None
+            item[1] = time.monotonic()
+            self._sessions.move_to_end(key)
+            return item[0]
+
+    def put(self, key, entry):
+        """Insert unless another thread got there first; returns the live entry."""
+        with self._lock:
+            existing = self.get(key)
+            if existing is not None:
+                return existing
+            self._sessions[key] = [entry, time.monotonic()]
+            while len(self._sessions) > self.max_sessions:
+                oldest = next(iter(self._sessions))
+                self._drop(oldest, "capacity")
+            return entry
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._sessions
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    # ---------- lifecycle ----------
+
+    def bind_sid(self, sid: Optional[str], key):
+        """Remember which Socket.IO connection drives a session."""
+        if sid is None or key is None:
+            return
+        try:
+            key = int(key)   # Socket.IO payloads may carry the id as a string
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._sids.setdefault(sid, set()).add(key)
+
+    def release(self, key, reason: str = "finished"):
+        with self._lock:
+            if key in self._sessions:
+                self._drop(key, reason)
+            for keys in self._sids.values():
+                keys.discard(key)
+
+    def release_sid(self, sid: Optional[str]):
+        """Disconnect: release sessions no other live connection is bound to."""
+        with self._lock:
+            keys = self._sids.pop(sid, set())
+            still_bound = set().union(*self._sids.values()) if self._sids else set()
+            for key in keys - still_bound:
+                if key in self._sessions:
+                    self._drop(key, "disconnect")
+
+    def sweep(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            while self._sessions:
+                key, (_, last_used) = next(iter(self._sessions.items()))
+                if last_used > cutoff:
+                    break
+                self._drop(key, "idle")
+
+    def _drop(self, key, reason: str):
+        self._sessions.pop(key, None)
+        self.evicted[reason] = self.evicted.get(reason, 0) + 1
+
+    def start_sweeper(self):
+        """Start the idle-session sweep thread (once; called at app start-up)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="proctor-session-sweep", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"❌ Proctor session sweep error: {e}")
+
+    # ---------- gauges ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [item[0] for item in self._sessions.values()]
+            connections = len(self._sids)
+        sizes = [session_bytes(e) for e in entries]
+        return {
+            "live_sessions": len(entries),
+            "connections": connections,
+            "bytes_per_session": int(sum(sizes) / len(sizes)) if sizes else 0,
+            "total_kb": round(sum(sizes) / 1024.0, 1),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_s": self.idle_ttl,
+            "evicted": dict(self.evicted),
+        }
+
+
+session_registry: Optional[SessionRegistry] = None
+
+
+def init_session_registry() -> SessionRegistry:
+    """Registry sized from .env (PROCTOR_MAX_SESSIONS, PROCTOR_SESSION_TTL); no thread yet"""
+    global session_registry
+    if session_registry is None:
+        session_registry = SessionRegistry(
+            max_sessions=int(os.getenv("PROCTOR_MAX_SESSIONS", 2000)),
+            idle_ttl=float(os.getenv("PROCTOR_SESSION_TTL", 1800)),
+        )
+        register_source("proctor_sessions", session_registry.stats)
+    return session_registry
+
+
+def start_session_sweeper():
+    """Start evicting idle sessions; called from create_app like start_warm_up"""
+    init_session_registry().start_sweeper()
@@ -0,0 +1,304 @@
+"""
+Session-state store for OpenVINO proctoring
+- ProctorState is serialized to compact JSON when a verdict changes it
+  (warnings, termination, baseline, deviation start / end) and at least
+  every PROCTOR_STATE_SAVE_EVERY analysed frames otherwise
+- backends: in-process dict or a shared SQLite file (room for Redis etc.)
+- every write bumps a per-session version; cached state is only reloaded
+  when another worker wrote a newer one
+- on first access a session is rehydrated from the store, or rebuilt from
+  ExamCalibration + recorded violations when the store has nothing
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, fields
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from backend.services.metrics import register_source
+
+if TYPE_CHECKING:   # openvino_vision pulls in OpenCV / OpenVINO; load it on first use
+    from backend.services.proctor_vision.openvino_vision import ProctorState
+
+
+def serialize_state(state: "ProctorState") -> str:
+    """Compact JSON of every ProctorState field (None values dropped)"""
+    data = {k: v for k, v in asdict(state).items() if v is not None}
+    return json.dumps(data, separators=(",", ":"))
+
+
+def state_signature(state: "ProctorState") -> tuple:
+    """
+    The fields a verdict changes; per-frame timers (last_face_time, the
+    running deviation_start_time) are left out so they alone never force
+    a write
+    """
+    return (
+        state.warning_count, state.terminated, state.deviation_start_time is not None,
+        state.last_warning_time, state.max_warnings,
+        state.baseline_yaw, state.baseline_pitch, state.baseline_roll,
+        state.baseline_cx, state.baseline_cy, state.baseline_w, state.baseline_h,
+    )
+
+
+def deserialize_state(payload: str) -> "ProctorState":
+    from backend.services.proctor_vision.openvino_vision import ProctorState
+
+    data = json.loads(payload)
+    known = {f.name for f in fields(ProctorState)}
+    return ProctorState(**{k: v for k, v in data.items() if k in known})
+
+
+class MemoryStateBackend:
+    """Per-process dict; state survives nothing but costs nothing"""
+
+    shared = False
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """(payload, version) or None"""
+        with self._lock:
+            return self._data.get(key)
+
+    def version(self, key: str) -> Optional[int]:
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item else None
+
+    def put(self, key: str, payload: str) -> int:
+        """Store payload, returns its new version"""
+        with self._lock:
+            version = self._data[key][1] + 1 if key in self._data else 1
+            self._data[key] = (payload, version)
+            return version
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteStateBackend:
+    """
+    Single-table SQLite file (WAL mode) shared by every worker process on
+    the host. One connection per thread.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS proctor_state ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(proctor_state)")]
+        if "version" not in columns:   # state file from before versioning
+            conn.execute("ALTER TABLE proctor_state ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        row = self._conn().execute(
+            "SELECT payload, version FROM proctor_state WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def version(self, key: str) -> Optional[int]:
+        row = self._conn().execute(
+            "SELECT version FROM proctor_state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, payload: str) -> int:
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO proctor_state (key, payload, updated_at, version) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, "
+            "updated_at = excluded.updated_at, version = proctor_state.version + 1",
+            (key, payload, time.time()),
+        )
+        version = conn.execute("SELECT version FROM proctor_state WHERE key = ?", (key,)).fetchone()[0]
+        conn.commit()
+        return version
+
+    def delete(self, key: str):
+        conn = self._conn()
+        conn.execute("DELETE FROM proctor_state WHERE key = ?", (key,))
+        conn.commit()
+
+
+STATE_BACKENDS = {
+    "memory": lambda: MemoryStateBackend(),
+    "sqlite": lambda: SQLiteStateBackend(os.getenv("PROCTOR_STATE_PATH", "proctor_state.db")),
+}
+
+
+class ProctorStateStore:
+    """
+    ProctorState per student_exam_id on top of a pluggable backend. save()
+    is called for every analysed frame but only writes when the state's
+    signature changed or save_every frames went by unwritten.
+    """
+
+    def __init__(self, backend, save_every: int = 10):
+        self.backend = backend
+        self.save_every = max(1, save_every)
+        # version of each session this process last wrote or read
+        self._seen: Dict[str, int] = {}
+        # signature last written / read, and saves skipped since
+        self._written: Dict[str, Tuple[tuple, int]] = {}
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _key(student_exam_id) -> str:
+        return f"proctor:{student_exam_id}"
+
+    def load(self, student_exam_id) -> Optional["ProctorState"]:
+        key = self._key(student_exam_id)
+        with self._lock:
+            item = self.backend.get(key)
+            if not item:
+                return None
+            self._seen[key] = item[1]
+            state = deserialize_state(item[0])
+            self._written[key] = (state_signature(state), 0)
+        return state
+
+    def save(self, student_exam_id, state: "ProctorState", force: bool = False):
+        """Write the state if a verdict changed it, every save_every calls, or when forced"""
+        key = self._key(student_exam_id)
+        signature = state_signature(state)
+        with self._lock:
+            written, skipped = self._written.get(key, (None, 0))
+            if not force and signature == written and skipped + 1 < self.save_every:
+                self._written[key] = (written, skipped + 1)
+                self.coalesced += 1
+                return
+            self._seen[key] = self.backend.put(key, serialize_state(state))
+            self._written[key] = (signature, 0)
+            self.writes += 1
+
+    def delete(self, student_exam_id):
+        key = self._key(student_exam_id)
+        with self._lock:
+            self.backend.delete(key)
+            self._seen.pop(key, None)
+            self._written.pop(key, None)
+
+    def refresh(self, student_exam_id, state: "ProctorState"):
+        """
+        Pull changes another worker made to a shared backend into the
+        cached state object (updated in place, OpenVINOProctor holds it).
+        Only a version this process has not written or read is applied,
+        so in-flight updates are never rolled back to our own last save.
+        """
+        if not self.backend.shared:
+            return
+        key = self._key(student_exam_id)
+        with self._lock:
+            version = self.backend.version(key)
+            if version is None or version == self._seen.get(key):
+                return
+            item = self.backend.get(key)
+            if not item:
+                return
+            self._seen[key] = item[1]
+            fresh = deserialize_state(item[0])
+            self._written[key] = (state_signature(fresh), 0)
+        state.__dict__.update(fresh.__dict__)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._written),
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "save_every": self.save_every,
+            }
+
+
+# ProctorState fields persisted on ExamCalibration
+BASELINE_FIELDS = (
+    "baseline_yaw", "baseline_pitch", "baseline_roll",
+    "baseline_cx", "baseline_cy", "baseline_w", "baseline_h",
+)
+
+
+def rehydrate_state(student_exam_id, max_warnings: int) -> "ProctorState":
+    """
+    Rebuild a session's state from the main database: calibration baseline
+    from ExamCalibration, warnings / termination from the ExamViolation
+    rows logged since that calibration (calibrating resets both).
+    """
+    from models import ExamCalibration, ExamViolation, StudentExam
+    from backend.services.event_sink import flush_events
+    from backend.services.proctor_vision.openvino_vision import ProctorState
+
+    # verdicts may still sit in the event sink buffer
+    flush_events()
+
+    state = ProctorState(session_id=f"exam-{student_exam_id}", max_warnings=max_warnings)
+
+    calibration = ExamCalibration.query.filter_by(student_exam_id=student_exam_id).first()
+    if calibration is not None:
+        for name in BASELINE_FIELDS:
+            setattr(state, name, getattr(calibration, name, None))
+
+    verdicts = ExamViolation.query.filter(
+        ExamViolation.student_exam_id == student_exam_id,
+        ExamViolation.violation_type.in_(("WARNING", "TERMINATE")),
+    )
+    if calibration is not None and calibration.calibrated_at is not None:
+        verdicts = verdicts.filter(ExamViolation.timestamp >= calibration.calibrated_at)
+    verdicts = verdicts.with_entities(ExamViolation.violation_type).all()
+    state.warning_count = len(verdicts)
+
+    student_exam = StudentExam.query.get(student_exam_id)
+    state.terminated = (
+        any(v.violation_type == "TERMINATE" for v in verdicts)
+        or getattr(student_exam, "proctoring_status", None) == "terminated"
+    )
+    return state
+
+
+_store: Optional[ProctorStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> ProctorStateStore:
+    """
+    Shared store, backend chosen by PROCTOR_STATE_BACKEND (sqlite / memory),
+    unchanged states written every PROCTOR_STATE_SAVE_EVERY frames
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                name = os.getenv("PROCTOR_STATE_BACKEND", "sqlite").lower()
+                try:
+                    backend = STATE_BACKENDS.get(name, STATE_BACKENDS["memory"])()
+                except Exception as e:
+                    print(f"⚠️ Proctor state backend '{name}' unavailable, using memory: {e}")
+                    backend = MemoryStateBackend()
+                _store = ProctorStateStore(backend, save_every=int(os.getenv("PROCTOR_STATE_SAVE_EVERY", 10)))
+                register_source("proctor_state", _store.stats)
+    return _store
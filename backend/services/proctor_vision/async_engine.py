@@ -0,0 +1,161 @@
+# proctor_vision/async_engine.py
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from openvino.runtime import AsyncInferQueue
+
+from .engines import dispatch_result
+from .model_registry import CompiledModels
+from .openvino_vision import FrameAnalysis, boxes_from_detections, largest_box
+
+
+@dataclass
+class _AsyncJob:
+    proctor: object          # OpenVINOProctor owning the session state
+    frame: np.ndarray
+    future: Future
+    callback: Optional[Callable] = None
+    analysis: Optional[FrameAnalysis] = None
+    evaluate: bool = True    # False: resolve with the FrameAnalysis itself
+
+
+class AsyncInferencePipeline:
+    """
+    Non-blocking inference engine built on OpenVINO AsyncInferQueue.
+
+    submit() preprocesses on the caller's thread and returns at once;
+    face detection and head pose run as chained async requests on
+    throughput-tuned models, so decode, preprocessing and inference of
+    different frames overlap. The head-pose request is started from a
+    submit thread: start_async blocks while every request is busy, which
+    must not happen on an OpenVINO callback thread. The final callback evaluates the result
+    against the session's ProctorState; submit() callbacks then run on
+    the result pool (engines.py).
+    """
+
+    def __init__(self, models: CompiledModels, num_streams: str = "AUTO", jobs: int = 0):
+        self.models = models.throughput(num_streams)
+
+        # jobs=0 lets OpenVINO pick OPTIMAL_NUMBER_OF_INFER_REQUESTS
+        self.fd_queue = AsyncInferQueue(self.models.fd_compiled, jobs)
+        self.hp_queue = AsyncInferQueue(self.models.hp_compiled, jobs)
+        self.fd_queue.set_callback(self._on_fd_done)
+        self.hp_queue.set_callback(self._on_hp_done)
+
+        # fd callback -> head-pose start_async hand-off (FIFO, may block)
+        self._hp_submit = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proctor-hp-submit")
+
+        # evaluate() mutates ProctorState, callbacks arrive on several threads
+        self._eval_lock = threading.Lock()
+
+    def submit(self, proctor, frame: np.ndarray, callback: Optional[Callable] = None) -> Future:
+        """Start async inference, the Future resolves to (status, details)."""
+        return self._start(_AsyncJob(proctor, frame, Future(), callback))
+
+    def analyze(self, proctor, frame: np.ndarray) -> Future:
+        """Inference only, the Future resolves to a FrameAnalysis."""
+        return self._start(_AsyncJob(proctor, frame, Future(), evaluate=False))
+
+    def _start(self, job: _AsyncJob) -> Future:
+        job.future.set_running_or_notify_cancel()
+        try:
+            self.fd_queue.start_async({0: job.proctor._preprocess_for_fd(job.frame)}, job)
+        except Exception as e:
+            job.future.set_exception(e)
+        return job.future
+
+    def wait_all(self):
+        self.fd_queue.wait_all()
+        # every hand-off queued by the fd callbacks has started its request
+        self._hp_submit.submit(lambda: None).result()
+        self.hp_queue.wait_all()
+
+    # ---------- callbacks (OpenVINO worker threads) ----------
+
+    def _on_fd_done(self, request, job: _AsyncJob):
+        try:
+            h, w = job.frame.shape[:2]
+            detections = request.get_output_tensor(0).data[0, 0]
+            boxes = boxes_from_detections(detections, w, h)
+            box = largest_box(boxes)
+            job.analysis = FrameAnalysis(boxes=boxes, box=box)
+
+            if box is not None:
+                x1, y1, x2, y2 = box
+                face = job.frame[y1:y2, x1:x2]
+                if face.size != 0:
+                    self._hp_submit.submit(self._start_head_pose, face, job)
+                    return
+
+            self._finish(job)
+        except Exception as e:
+            self._fail(job, e)
+
+    def _start_head_pose(self, face: np.ndarray, job: _AsyncJob):
+        """Submit thread: preprocess and wait for an idle head-pose request"""
+        try:
+            tensor = job.proctor._preprocess_for_head_pose(face)
+            self.hp_queue.start_async({0: tensor}, job)
+        except Exception as e:
+            self._fail(job, e)
+
+    def _on_hp_done(self, request, job: _AsyncJob):
+        try:
+            yaw_i, pitch_i, roll_i = self.models.hp_output_order
+            job.analysis.pose = (
+                float(request.get_output_tensor(yaw_i).data.flatten()[0]),
+                float(request.get_output_tensor(pitch_i).data.flatten()[0]),
+                float(request.get_output_tensor(roll_i).data.flatten()[0]),
+            )
+            self._finish(job)
+        except Exception as e:
+            self._fail(job, e)
+
+    def _finish(self, job: _AsyncJob):
+        if not job.evaluate:
+            job.future.set_result(job.analysis)
+            return
+        with self._eval_lock:
+            result = job.proctor.evaluate(job.analysis)
+        job.future.set_result(result)
+        if job.callback is not None:
+            # leave the AsyncInferQueue callback thread to inference
+            dispatch_result(job.callback, *result)
+
+    def _fail(self, job: _AsyncJob, error: Exception):
+        print(f"❌ Async proctoring inference error: {error}")
+        if not job.future.done():
+            job.future.set_exception(error)
+
+
+_pipeline: Optional[AsyncInferencePipeline] = None
+_pipeline_lock = threading.Lock()
+# set when building the pipeline failed once: fall back for the process
+_pipeline_unavailable = False
+
+
+def get_async_pipeline(models: CompiledModels) -> Optional[AsyncInferencePipeline]:
+    """
+    Shared pipeline configured from .env (PROCTOR_NUM_STREAMS, default AUTO).
+    Returns None when the device cannot build the throughput models.
+    """
+    global _pipeline, _pipeline_unavailable
+    if _pipeline is None and not _pipeline_unavailable:
+        with _pipeline_lock:
+            if _pipeline is None and not _pipeline_unavailable:
+                try:
+                    _pipeline = AsyncInferencePipeline(
+                        models, num_streams=os.getenv("PROCTOR_NUM_STREAMS", "AUTO")
+                    )
+                    print(f"✅ Async proctoring inference enabled "
+                          f"({_pipeline.models.optimal_requests()} requests)")
+                except Exception as e:
+                    print(f"⚠️ Async inference unavailable, using per-frame inference: {e}")
+                    _pipeline_unavailable = True
+                    return None
+    return _pipeline
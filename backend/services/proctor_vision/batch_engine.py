@@ -0,0 +1,201 @@
+# proctor_vision/batch_engine.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+from .engines import dispatch_result
+from .model_registry import CompiledModels
+from .openvino_vision import FrameAnalysis, boxes_from_detections, largest_box
+
+
+@dataclass
+class _Job:
+    proctor: object          # OpenVINOProctor owning the session state
+    frame: np.ndarray
+    future: Future
+    callback: Optional[Callable] = None
+    evaluate: bool = True    # False: resolve with the FrameAnalysis itself
+
+
+class BatchInferenceScheduler:
+    """
+    Central inference scheduler shared by all proctoring sessions.
+
+    Frames submitted from many student_exam_ids are gathered into one
+    face-detection batch (up to max_batch_size frames, waiting at most
+    max_wait_ms for the batch to fill). The largest face of every frame
+    then goes through a single head-pose batch, and each result is fed
+    back to its session's OpenVINOProctor.evaluate. submit() callbacks
+    run on the result pool (engines.py), never on the scheduler thread.
+    """
+
+    def __init__(
+        self,
+        models: CompiledModels,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        conf_thresh: float = 0.6,
+    ):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.conf_thresh = conf_thresh
+        self.models = models.batched(self.max_batch_size)
+
+        # simple counters for tuning batch size / wait time
+        self.batches = 0
+        self.frames = 0
+
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="proctor-batch-infer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, proctor, frame: np.ndarray, callback: Optional[Callable] = None) -> Future:
+        """Queue a frame, the Future resolves to (status, details)."""
+        future: Future = Future()
+        self._queue.put(_Job(proctor, frame, future, callback))
+        return future
+
+    def analyze(self, proctor, frame: np.ndarray) -> Future:
+        """Queue a frame for inference only, the Future resolves to a FrameAnalysis."""
+        future: Future = Future()
+        self._queue.put(_Job(proctor, frame, future, evaluate=False))
+        return future
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.frames / self.batches if self.batches else 0.0
+
+    # ---------- scheduler thread ----------
+
+    def _collect(self) -> List[_Job]:
+        jobs = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(jobs) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        fd_request = self.models.fd_compiled.create_infer_request()
+        hp_request = self.models.hp_compiled.create_infer_request()
+
+        while True:
+            # drop jobs whose caller cancelled them (e.g. calibration stopped early)
+            jobs = [job for job in self._collect() if job.future.set_running_or_notify_cancel()]
+            if not jobs:
+                continue
+            try:
+                analyses = self._infer_batch(jobs, fd_request, hp_request)
+            except Exception as e:
+                for job in jobs:
+                    job.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.frames += len(jobs)
+
+            for job, analysis in zip(jobs, analyses):
+                try:
+                    if not job.evaluate:
+                        job.future.set_result(analysis)
+                        continue
+                    result = job.proctor.evaluate(analysis)
+                    job.future.set_result(result)
+                    if job.callback is not None:
+                        # I/O-bound callbacks must not hold up the next batch
+                        dispatch_result(job.callback, *result)
+                except Exception as e:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                    print(f"❌ Batched proctoring result error: {e}")
+
+    def _infer_batch(self, jobs: List[_Job], fd_request, hp_request) -> List[FrameAnalysis]:
+        m = self.models
+
+        # --- one face-detection batch for all frames ---
+        fd_batch = m.input_batch([cv2.resize(job.frame, (m.fd_w, m.fd_h)) for job in jobs])
+        fd_request.infer({0: fd_batch})
+        detections = fd_request.get_output_tensor(0).data[0, 0]
+
+        # rows are tagged with the batch index in column 0
+        image_ids = detections[:, 0].astype(np.int64)
+
+        analyses: List[FrameAnalysis] = []
+        crops: List[np.ndarray] = []
+        crop_owner: List[int] = []
+
+        for i, job in enumerate(jobs):
+            h, w = job.frame.shape[:2]
+            boxes = boxes_from_detections(
+                detections[image_ids == i], w, h, self.conf_thresh
+            )
+            box = largest_box(boxes)
+            analyses.append(FrameAnalysis(boxes=boxes, box=box))
+
+            if box is not None:
+                x1, y1, x2, y2 = box
+                face = job.frame[y1:y2, x1:x2]
+                if face.size != 0:
+                    crops.append(cv2.resize(face, (m.hp_w, m.hp_h)))
+                    crop_owner.append(i)
+
+        # --- one head-pose batch for every detected main face ---
+        if crops:
+            hp_request.infer({0: m.input_batch(crops)})
+            yaw_i, pitch_i, roll_i = m.hp_output_order
+            yaws = hp_request.get_output_tensor(yaw_i).data.reshape(len(crops), -1)[:, 0]
+            pitches = hp_request.get_output_tensor(pitch_i).data.reshape(len(crops), -1)[:, 0]
+            rolls = hp_request.get_output_tensor(roll_i).data.reshape(len(crops), -1)[:, 0]
+            for k, owner in enumerate(crop_owner):
+                analyses[owner].pose = (float(yaws[k]), float(pitches[k]), float(rolls[k]))
+
+        return analyses
+
+
+_scheduler: Optional[BatchInferenceScheduler] = None
+_scheduler_lock = threading.Lock()
+# set when building the scheduler failed once: fall back for the process
+_scheduler_unavailable = False
+
+
+def get_batch_scheduler(models: CompiledModels) -> Optional[BatchInferenceScheduler]:
+    """
+    Shared scheduler configured from .env (PROCTOR_BATCH_SIZE,
+    PROCTOR_BATCH_WAIT_MS). Returns None when batching is disabled
+    (batch size <= 1) or the device cannot compile a dynamic batch.
+    """
+    global _scheduler, _scheduler_unavailable
+    max_batch = int(os.getenv("PROCTOR_BATCH_SIZE", 8))
+    if max_batch <= 1 or _scheduler_unavailable:
+        return None
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None and not _scheduler_unavailable:
+                try:
+                    _scheduler = BatchInferenceScheduler(
+                        models,
+                        max_batch_size=max_batch,
+                        max_wait_ms=float(os.getenv("PROCTOR_BATCH_WAIT_MS", 15)),
+                    )
+                    print(f"✅ Batched proctoring inference enabled (batch={max_batch})")
+                except Exception as e:
+                    print(f"⚠️ Batched inference unavailable, using per-frame inference: {e}")
+                    _scheduler_unavailable = True
+                    return None
+    return _scheduler
@@ -0,0 +1,138 @@
+# proctor_vision/detectors.py
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.services.metrics import LatencyStats, detector_latency
+
+# (x1, y1, x2, y2), as openvino_vision.Box
+Box = Tuple[int, int, int, int]
+
+
+class DetectorBackend:
+    """
+    Face detector used by the Socket.IO proctoring handlers.
+    detect() returns every face as (x1, y1, x2, y2); call it through
+    timed_detect() so the per-backend latency counters stay accurate,
+    or measured_detect() in CV worker processes (the caller records).
+    """
+
+    name = "base"
+    # (W, H) the detector works at; larger JPEGs may be decoded reduced
+    input_size = None
+
+    @property
+    def stats(self) -> LatencyStats:
+        return detector_latency(self.name)
+
+    def detect(self, frame_bgr: np.ndarray) -> List[Box]:
+        raise NotImplementedError
+
+    def measured_detect(self, frame_bgr: np.ndarray) -> Tuple[List[Box], float]:
+        """(faces, detection ms) without recording the latency"""
+        start = time.perf_counter()
+        faces = self.detect(frame_bgr)
+        return faces, (time.perf_counter() - start) * 1000.0
+
+    def timed_detect(self, frame_bgr: np.ndarray) -> List[Box]:
+        start = time.perf_counter()
+        try:
+            return self.detect(frame_bgr)
+        finally:
+            self.stats.record((time.perf_counter() - start) * 1000.0)
+
+
+class HaarDetector(DetectorBackend):
+    """OpenCV Haar cascade, one parsed classifier per thread"""
+
+    name = "haar"
+    cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+
+    def __init__(self):
+        # CascadeClassifier.detectMultiScale is not safe to share across threads
+        self._local = threading.local()
+
+    def _cascade(self) -> cv2.CascadeClassifier:
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(self.cascade_path)
+            self._local.cascade = cascade
+        return cascade
+
+    def detect(self, frame_bgr: np.ndarray) -> List[Box]:
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        faces = self._cascade().detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+        )
+        return [(int(x), int(y), int(x + w), int(y + h)) for (x, y, w, h) in faces]
+
+
+class OpenVINODetector(DetectorBackend):
+    """
+    face-detection-adas-0001 through the shared compiled model.
+    Detection is synchronous (no submit_frame / shared engine): a CV
+    worker process handles one frame at a time, so a batch or async
+    queue would only add its wait. The analyze route uses the engines.
+    """
+
+    name = "openvino"
+
+    def __init__(self):
+        # imported here: the Haar backend must not require OpenVINO
+        from .model_registry import default_model_config, get_model_registry
+        from .openvino_vision import OpenVINOProctor, ProctorState
+
+        model_dir, device = default_model_config()
+        # stateless helper: only its detection path is used
+        self._proctor = OpenVINOProctor(
+            ProctorState(session_id="detector"),
+            models=get_model_registry().get(model_dir, device),
+        )
+        self.input_size = (self._proctor.fd_w, self._proctor.fd_h)
+
+    def detect(self, frame_bgr: np.ndarray) -> List[Box]:
+        return self._proctor._detect_faces(frame_bgr)
+
+
+DETECTOR_BACKENDS = {
+    HaarDetector.name: HaarDetector,
+    OpenVINODetector.name: OpenVINODetector,
+}
+DEFAULT_BACKEND = HaarDetector.name
+
+_instances: Dict[str, DetectorBackend] = {}
+_unavailable = set()
+_lock = threading.Lock()
+
+
+def get_detector(name: Optional[str] = None) -> DetectorBackend:
+    """
+    Shared detector backend by name ('haar' / 'openvino'). Unknown names,
+    or an OpenVINO backend whose models fail to load, fall back to Haar.
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in DETECTOR_BACKENDS or name in _unavailable:
+        name = DEFAULT_BACKEND
+
+    detector = _instances.get(name)
+    if detector is not None:
+        return detector
+
+    with _lock:
+        detector = _instances.get(name)
+        if detector is None:
+            try:
+                detector = DETECTOR_BACKENDS[name]()
+                _instances[name] = detector
+            except Exception as e:
+                if name == DEFAULT_BACKEND:
+                    raise
+                print(f"⚠️ Detector backend '{name}' unavailable, using {DEFAULT_BACKEND}: {e}")
+                _unavailable.add(name)
+
+    return detector or get_detector(DEFAULT_BACKEND)
+
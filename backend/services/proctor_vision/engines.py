@@ -0,0 +1,59 @@
+# proctor_vision/engines.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .model_registry import CompiledModels
+
+
+def get_inference_engine(models: CompiledModels):
+    """
+    Shared inference engine selected by PROCTOR_INFERENCE_MODE:
+      batch - BatchInferenceScheduler (default)
+      async - AsyncInferencePipeline (AsyncInferQueue, THROUGHPUT hint)
+      sync  - none, every OpenVINOProctor infers on the calling thread
+    """
+    mode = os.getenv("PROCTOR_INFERENCE_MODE", "batch").lower()
+
+    if mode == "async":
+        from .async_engine import get_async_pipeline
+        return get_async_pipeline(models)
+
+    if mode == "batch":
+        from .batch_engine import get_batch_scheduler
+        return get_batch_scheduler(models)
+
+    return None
+
+
+_result_pool: Optional[ThreadPoolExecutor] = None
+_result_pool_lock = threading.Lock()
+
+
+def get_result_pool() -> ThreadPoolExecutor:
+    """
+    Threads running engine result callbacks (PROCTOR_RESULT_WORKERS):
+    state saves, DB writes and Socket.IO emits never block inference
+    """
+    global _result_pool
+    if _result_pool is None:
+        with _result_pool_lock:
+            if _result_pool is None:
+                _result_pool = ThreadPoolExecutor(
+                    max_workers=max(1, int(os.getenv("PROCTOR_RESULT_WORKERS", 4))),
+                    thread_name_prefix="proctor-result",
+                )
+    return _result_pool
+
+
+def dispatch_result(callback: Callable, status: str, details: dict):
+    """Run callback(status, details) on the result pool, off the inference thread"""
+    def run():
+        try:
+            callback(status, details)
+        except Exception as e:
+            print(f"❌ Proctoring result callback error: {e}")
+
+    get_result_pool().submit(run)
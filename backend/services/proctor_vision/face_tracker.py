@@ -0,0 +1,173 @@
+# proctor_vision/face_tracker.py
+
+import os
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from backend.services.metrics import register_source
+
+from .openvino_vision import Box
+
+# process-wide totals across every session's tracker
+_totals = {"tracked": 0, "detected": 0, "lost": 0, "outside_motion": 0}
+_totals_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _totals_lock:
+        _totals[key] += 1
+
+
+class FaceTracker:
+    """
+    Template-match tracker used between full face detections.
+
+    After a full detection that found exactly one face, the face crop is
+    kept as a grayscale template. On the next frames it is searched for in
+    a window around the last box (cv2.matchTemplate, normalised
+    correlation); the best score is the tracking confidence. Tracking
+    gives up, and full-frame detection runs instead, when:
+      - detect_every frames have passed since the last detection
+      - the score drops below min_score, or by more than score_drop
+        from the previous tracked frame
+      - the last detection found zero or several faces
+      - more than outside_motion of the frame away from the face changed
+        since the last detection (a second face walking in)
+    so no-face verdicts come from the detector and a new face forces a
+    detection on the frame it appears in.
+    """
+
+    # grayscale thumbnail for the outside-the-face motion check
+    THUMB_SIZE = (64, 48)
+    # grey-level change that counts a thumbnail pixel as moved
+    PIXEL_DELTA = 25
+
+    def __init__(self, detect_every: int = 5, min_score: float = 0.7, search_margin: float = 0.5,
+                 score_drop: float = 0.1, outside_motion: float = 0.03):
+        self.detect_every = max(1, detect_every)
+        self.min_score = min_score
+        self.search_margin = search_margin
+        self.score_drop = score_drop
+        self.outside_motion = outside_motion
+
+        self._template: Optional[np.ndarray] = None
+        self._box: Optional[Box] = None
+        self._ref_thumb: Optional[np.ndarray] = None
+        self._ref_box: Optional[Box] = None
+        self._since_detect = 0
+        self.last_score = 0.0
+
+    @staticmethod
+    def _gray(frame_bgr: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+
+    def _thumb(self, frame_bgr: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame_bgr, self.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        return self._gray(small)
+
+    def _outside_changed(self, frame_bgr: np.ndarray, box: Box) -> float:
+        """Share of thumbnail pixels away from both face boxes that moved"""
+        h, w = frame_bgr.shape[:2]
+        tw, th = self.THUMB_SIZE
+        sx, sy = tw / w, th / h
+        mask = np.ones((th, tw), dtype=bool)
+        for x1, y1, x2, y2 in (self._ref_box, box):
+            mx, my = (x2 - x1) * self.search_margin, (y2 - y1) * self.search_margin
+            mask[max(0, int((y1 - my) * sy)):int(np.ceil((y2 + my) * sy)),
+                 max(0, int((x1 - mx) * sx)):int(np.ceil((x2 + mx) * sx))] = False
+        outside = int(mask.sum())
+        if not outside:
+            return 0.0
+        moved = cv2.absdiff(self._thumb(frame_bgr), self._ref_thumb) > self.PIXEL_DELTA
+        return float(np.count_nonzero(moved & mask)) / outside
+
+    def update(self, frame_bgr: np.ndarray, boxes: List[Box]):
+        """Feed the result of a full detection."""
+        _count("detected")
+        self._since_detect = 0
+        if len(boxes) != 1:
+            self.reset()
+            return
+        x1, y1, x2, y2 = boxes[0]
+        template = self._gray(frame_bgr)[y1:y2, x1:x2]
+        if template.size == 0:
+            self.reset()
+            return
+        self._template = template
+        self._box = boxes[0]
+        self._ref_thumb = self._thumb(frame_bgr)
+        self._ref_box = boxes[0]
+        self.last_score = 0.0
+
+    def track(self, frame_bgr: np.ndarray) -> Optional[Box]:
+        """Box of the tracked face, or None when a full detection is due."""
+        if self._template is None or self._since_detect + 1 >= self.detect_every:
+            return None
+
+        h, w = frame_bgr.shape[:2]
+        x1, y1, x2, y2 = self._box
+        th, tw = self._template.shape
+        mx, my = int(tw * self.search_margin), int(th * self.search_margin)
+        sx1, sy1 = max(0, x1 - mx), max(0, y1 - my)
+        sx2, sy2 = min(w, x2 + mx), min(h, y2 + my)
+        if sx2 - sx1 < tw or sy2 - sy1 < th:
+            self._lost()
+            return None
+
+        window = self._gray(frame_bgr[sy1:sy2, sx1:sx2])
+        scores = cv2.matchTemplate(window, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (bx, by) = cv2.minMaxLoc(scores)
+        previous, self.last_score = self.last_score, float(score)
+        if score < self.min_score or (previous and score < previous - self.score_drop):
+            self._lost()
+            return None
+
+        box = (sx1 + bx, sy1 + by, sx1 + bx + tw, sy1 + by + th)
+        if self.outside_motion > 0 and self._outside_changed(frame_bgr, box) > self.outside_motion:
+            _count("outside_motion")
+            self.reset()
+            return None
+
+        self._since_detect += 1
+        self._box = box
+        _count("tracked")
+        return self._box
+
+    def _lost(self):
+        _count("lost")
+        self.reset()
+
+    def reset(self):
+        self._template = None
+        self._box = None
+        self._ref_thumb = None
+        self._ref_box = None
+        self._since_detect = 0
+        self.last_score = 0.0
+
+
+def face_tracker_from_env() -> Optional[FaceTracker]:
+    """
+    New per-session tracker configured from .env, or None when disabled
+    (PROCTOR_DETECT_EVERY <= 1 means full detection on every frame).
+    """
+    detect_every = int(os.getenv("PROCTOR_DETECT_EVERY", 5))
+    if detect_every <= 1:
+        return None
+    return FaceTracker(
+        detect_every=detect_every,
+        min_score=float(os.getenv("PROCTOR_TRACK_MIN_SCORE", 0.7)),
+        score_drop=float(os.getenv("PROCTOR_TRACK_SCORE_DROP", 0.1)),
+        outside_motion=float(os.getenv("PROCTOR_TRACK_OUTSIDE_MOTION", 0.03)),
+    )
+
+
+def tracker_totals() -> dict:
+    with _totals_lock:
+        return dict(_totals)
+
+
+register_source("face_tracker", tracker_totals)
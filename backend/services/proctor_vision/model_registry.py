@@ -0,0 +1,290 @@
+# proctor_vision/model_registry.py
+
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+from openvino.preprocess import PrePostProcessor, ResizeAlgorithm
+from openvino.runtime import Core, Dimension, Layout, PartialShape, Type
+
+
+FD_MODEL_NAME = "face-detection-adas-0001"
+HP_MODEL_NAME = "head-pose-estimation-adas-0001"
+
+
+def embed_u8_preprocessing(model):
+    """
+    Bake input preprocessing into the model graph: the input becomes a u8
+    NHWC tensor of any height / width (a decoded BGR frame or face crop
+    with a batch axis), converted to f32, resized and laid out as NCHW
+    inside the plugin instead of in Python.
+    """
+    ppp = PrePostProcessor(model)
+    ppp.input().tensor() \
+        .set_element_type(Type.u8) \
+        .set_layout(Layout("NHWC")) \
+        .set_spatial_dynamic_shape()
+    ppp.input().preprocess() \
+        .convert_element_type(Type.f32) \
+        .resize(ResizeAlgorithm.RESIZE_LINEAR)
+    ppp.input().model().set_layout(Layout("NCHW"))
+    return ppp.build()
+
+
+def embed_u8_layout(model):
+    """
+    Batch variant of embed_u8_preprocessing: the input becomes a u8 NHWC
+    batch of frames already resized to the network size (they have to
+    match to be stacked), converted to f32 and laid out as NCHW inside
+    the plugin.
+    """
+    ppp = PrePostProcessor(model)
+    ppp.input().tensor() \
+        .set_element_type(Type.u8) \
+        .set_layout(Layout("NHWC"))
+    ppp.input().preprocess() \
+        .convert_element_type(Type.f32)
+    ppp.input().model().set_layout(Layout("NCHW"))
+    return ppp.build()
+
+
+class CompiledModels:
+    """
+    One compiled face-detection + head-pose pair, shared by every session.
+
+    Compiled models are thread-safe, infer requests are not, so each
+    worker thread lazily gets its own pair of infer requests.
+
+    With embedded_preprocess the networks take raw u8 BGR images (see
+    embed_u8_preprocessing); otherwise they take the original 1x3xHxW f32
+    tensor prepared by OpenVINOProctor._preprocess_for_*.
+    """
+
+    def __init__(self, core: Core, model_dir: str, device: str, embedded_preprocess: bool = True):
+        self.core = core
+        self.model_dir = model_dir
+        self.device = device
+        self.embedded_preprocess = embedded_preprocess
+
+        fd_model = core.read_model(f"{model_dir}/{FD_MODEL_NAME}.xml")
+        _, _, self.fd_h, self.fd_w = fd_model.input(0).shape  # 1,3,H,W
+        self.fd_compiled = core.compile_model(self._prepare(fd_model), device)
+        self.fd_input = self.fd_compiled.input(0)
+        self.fd_output = self.fd_compiled.output(0)
+
+        hp_model = core.read_model(f"{model_dir}/{HP_MODEL_NAME}.xml")
+        _, _, self.hp_h, self.hp_w = hp_model.input(0).shape
+        self.hp_compiled = core.compile_model(self._prepare(hp_model), device)
+        self.hp_input = self.hp_compiled.input(0)
+
+        # Resolve yaw / pitch / roll output indices once instead of per call
+        self.hp_output_order = self._resolve_hp_outputs()
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._variants: Dict[tuple, object] = {}
+
+    def _prepare(self, model):
+        return embed_u8_preprocessing(model) if self.embedded_preprocess else model
+
+    def _resolve_hp_outputs(self) -> Tuple[int, int, int]:
+        indices = {}
+        for i, out in enumerate(self.hp_compiled.outputs):
+            name = out.get_any_name()
+            if "angle_y" in name:
+                indices["yaw"] = i
+            elif "angle_p" in name:
+                indices["pitch"] = i
+            elif "angle_r" in name:
+                indices["roll"] = i
+
+        # Fallback: if names not matched, just take first 3 outputs
+        if len(indices) < 3:
+            return 0, 1, 2
+        return indices["yaw"], indices["pitch"], indices["roll"]
+
+    # ---------- per-thread infer requests ----------
+
+    def fd_request(self):
+        req = getattr(self._local, "fd_request", None)
+        if req is None:
+            req = self.fd_compiled.create_infer_request()
+            self._local.fd_request = req
+        return req
+
+    def hp_request(self):
+        req = getattr(self._local, "hp_request", None)
+        if req is None:
+            req = self.hp_compiled.create_infer_request()
+            self._local.hp_request = req
+        return req
+
+    def infer_fd(self, input_tensor: np.ndarray) -> np.ndarray:
+        """Run face detection, returns the raw [1, 1, N, 7] SSD output."""
+        req = self.fd_request()
+        req.infer({0: input_tensor})
+        # copy: the output buffer is reused by the next infer on this thread
+        return req.get_output_tensor(0).data.copy()
+
+    def infer_hp(self, input_tensor: np.ndarray) -> Tuple[float, float, float]:
+        """Run head pose estimation, returns (yaw, pitch, roll) in degrees."""
+        req = self.hp_request()
+        req.infer({0: input_tensor})
+        yaw_i, pitch_i, roll_i = self.hp_output_order
+        return (
+            float(req.get_output_tensor(yaw_i).data.flatten()[0]),
+            float(req.get_output_tensor(pitch_i).data.flatten()[0]),
+            float(req.get_output_tensor(roll_i).data.flatten()[0]),
+        )
+
+    def _variant(self, key: tuple, factory):
+        models = self._variants.get(key)
+        if models is None:
+            with self._lock:
+                models = self._variants.get(key)
+                if models is None:
+                    models = factory()
+                    self._variants[key] = models
+        return models
+
+    def batched(self, max_batch: int) -> "BatchedModels":
+        """Variant of both networks with a dynamic batch dim of 1..max_batch."""
+        return self._variant(("batch", max_batch), lambda: BatchedModels(self, max_batch))
+
+    def throughput(self, num_streams: str = "AUTO") -> "ThroughputModels":
+        """Variant of both networks compiled with the THROUGHPUT hint."""
+        return self._variant(("tput", num_streams), lambda: ThroughputModels(self, num_streams))
+
+
+class BatchedModels:
+    """
+    Face detection + head pose compiled with a bounded dynamic batch, used
+    by the BatchInferenceScheduler. Outputs keep the single-frame layout:
+    detections come back as [1, 1, B*N, 7] tagged with image_id.
+    Frames of different sizes are resized to one shape in Python before
+    they can be stacked; with embedded_preprocess the batch stays u8 NHWC
+    and the f32 conversion / NCHW layout run in the plugin
+    (embed_u8_layout), otherwise it is f32 NCHW.
+    """
+
+    def __init__(self, base: CompiledModels, max_batch: int):
+        self.max_batch = max_batch
+        self.embedded_preprocess = base.embedded_preprocess
+        self.fd_h, self.fd_w = base.fd_h, base.fd_w
+        self.hp_h, self.hp_w = base.hp_h, base.hp_w
+        self.hp_output_order = base.hp_output_order
+
+        batch = Dimension(1, max_batch)
+
+        fd_model = base.core.read_model(f"{base.model_dir}/{FD_MODEL_NAME}.xml")
+        fd_model.reshape({fd_model.input(0): PartialShape([batch, 3, base.fd_h, base.fd_w])})
+        self.fd_compiled = base.core.compile_model(self._prepare(fd_model), base.device)
+
+        hp_model = base.core.read_model(f"{base.model_dir}/{HP_MODEL_NAME}.xml")
+        hp_model.reshape({hp_model.input(0): PartialShape([batch, 3, base.hp_h, base.hp_w])})
+        self.hp_compiled = base.core.compile_model(self._prepare(hp_model), base.device)
+
+    def _prepare(self, model):
+        return embed_u8_layout(model) if self.embedded_preprocess else model
+
+    def input_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """Stack same-size u8 BGR images into the networks' input batch"""
+        batch = np.stack(images)
+        if self.embedded_preprocess:
+            return batch
+        return batch.transpose(0, 3, 1, 2).astype(np.float32)
+
+
+class ThroughputModels:
+    """
+    Face detection + head pose compiled with PERFORMANCE_HINT=THROUGHPUT
+    and a configurable number of streams, for use with AsyncInferQueue.
+    Inputs match the base models, since OpenVINOProctor prepares them.
+    """
+
+    def __init__(self, base: CompiledModels, num_streams: str = "AUTO"):
+        self.num_streams = num_streams
+        self.hp_output_order = base.hp_output_order
+        config = {"PERFORMANCE_HINT": "THROUGHPUT", "NUM_STREAMS": str(num_streams)}
+
+        self.fd_compiled = base.core.compile_model(
+            base._prepare(base.core.read_model(f"{base.model_dir}/{FD_MODEL_NAME}.xml")), base.device, config
+        )
+        self.hp_compiled = base.core.compile_model(
+            base._prepare(base.core.read_model(f"{base.model_dir}/{HP_MODEL_NAME}.xml")), base.device, config
+        )
+
+    def optimal_requests(self) -> int:
+        return int(self.fd_compiled.get_property("OPTIMAL_NUMBER_OF_INFER_REQUESTS"))
+
+
+class ModelRegistry:
+    """
+    Process-wide registry: each (model_dir, device) pair is read and
+    compiled exactly once, no matter how many sessions use it.
+    """
+
+    def __init__(self):
+        self._core = None
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple[str, str, bool], CompiledModels] = {}
+
+    @property
+    def core(self) -> Core:
+        if self._core is None:
+            with self._lock:
+                if self._core is None:
+                    core = Core()
+                    cache_dir = model_cache_dir()
+                    if cache_dir:
+                        # compiled blobs are reused by later boots / workers
+                        os.makedirs(cache_dir, exist_ok=True)
+                        core.set_property({"CACHE_DIR": cache_dir})
+                    self._core = core
+        return self._core
+
+    def get(self, model_dir: str = "models", device: str = "CPU", embedded_preprocess=None) -> CompiledModels:
+        if embedded_preprocess is None:
+            embedded_preprocess = embedded_preprocess_default()
+        key = (os.path.abspath(model_dir), device, embedded_preprocess)
+        models = self._models.get(key)
+        if models is not None:
+            return models
+
+        core = self.core
+        with self._lock:
+            # another thread may have compiled it while we waited
+            models = self._models.get(key)
+            if models is None:
+                models = CompiledModels(core, model_dir, device, embedded_preprocess)
+                self._models[key] = models
+        return models
+
+    def loaded(self):
+        return list(self._models.keys())
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    return _registry
+
+
+def default_model_config() -> Tuple[str, str]:
+    """(model_dir, device) used by the web app, overridable from .env"""
+    return (
+        os.getenv("OPENVINO_MODEL_DIR", "models"),
+        os.getenv("OPENVINO_DEVICE", "CPU"),
+    )
+
+
+def embedded_preprocess_default() -> bool:
+    """OPENVINO_EMBED_PREPROCESS=0 keeps the Python resize / transpose path"""
+    return os.getenv("OPENVINO_EMBED_PREPROCESS", "1").lower() not in ("0", "false", "no")
+
+
+def model_cache_dir() -> str:
+    """OpenVINO CACHE_DIR for compiled models (OPENVINO_CACHE_DIR, empty disables)"""
+    return os.getenv("OPENVINO_CACHE_DIR", "model_cache")
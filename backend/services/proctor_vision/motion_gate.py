@@ -0,0 +1,125 @@
+# proctor_vision/motion_gate.py
+
+import os
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from backend.services.metrics import register_source
+
+# process-wide totals across every session's gate
+_totals = {"analysed": 0, "skipped": 0}
+_totals_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _totals_lock:
+        _totals[key] += 1
+
+
+class MotionGate:
+    """
+    Cheap per-session pre-stage in front of full face analysis.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last fully analysed frame. When the mean absolute
+    difference stays under motion_threshold, the previous FrameAnalysis
+    can be reused instead of running detection + head pose.
+
+    Adaptive sampling: the number of frames that may be skipped in a row
+    grows by one after every NORMAL full analysis (up to max_skip) and
+    drops to zero on any other verdict or while a deviation is being
+    timed, so suspicious sessions are analysed on every frame.
+    """
+
+    def __init__(
+        self,
+        motion_threshold: float = 6.0,
+        max_skip: int = 4,
+        thumb_size=(32, 24),
+    ):
+        self.motion_threshold = motion_threshold
+        self.max_skip = max(0, max_skip)
+        self.thumb_size = thumb_size
+
+        self._lock = threading.Lock()
+        self._ref_thumb: Optional[np.ndarray] = None
+        self._skip_budget = 0
+        self._skipped_in_row = 0
+
+        self.analysed = 0
+        self.skipped = 0
+
+    def thumbnail(self, frame_bgr: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+
+    def motion(self, thumb: np.ndarray) -> float:
+        """Mean absolute grey-level change against the reference thumbnail."""
+        if self._ref_thumb is None or self._ref_thumb.shape != thumb.shape:
+            return float("inf")
+        return float(cv2.absdiff(thumb, self._ref_thumb).mean())
+
+    def should_skip(self, thumb: np.ndarray) -> bool:
+        """True when the last verdict may be reused for this frame."""
+        with self._lock:
+            skip = (
+                self._skipped_in_row < self._skip_budget
+                and self.motion(thumb) < self.motion_threshold
+            )
+            if skip:
+                self._skipped_in_row += 1
+                self.skipped += 1
+        if skip:
+            _count("skipped")
+        return skip
+
+    def observe(self, thumb: np.ndarray, status: str, deviating: bool = False):
+        """Record the outcome of a full analysis and adapt the skip budget."""
+        with self._lock:
+            self._ref_thumb = thumb
+            self._skipped_in_row = 0
+            self.analysed += 1
+            if status == "NORMAL" and not deviating:
+                self._skip_budget = min(self.max_skip, self._skip_budget + 1)
+            else:
+                self._skip_budget = 0
+        _count("analysed")
+
+    def reset(self):
+        with self._lock:
+            self._ref_thumb = None
+            self._skip_budget = 0
+            self._skipped_in_row = 0
+
+    def stats(self) -> dict:
+        total = self.analysed + self.skipped
+        return {
+            "analysed": self.analysed,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+            "skip_budget": self._skip_budget,
+        }
+
+
+def motion_gate_from_env() -> Optional[MotionGate]:
+    """
+    New per-session gate configured from .env, or None when disabled
+    (PROCTOR_MOTION_THRESHOLD=0 or PROCTOR_MAX_SKIP=0).
+    """
+    threshold = float(os.getenv("PROCTOR_MOTION_THRESHOLD", 6.0))
+    max_skip = int(os.getenv("PROCTOR_MAX_SKIP", 4))
+    if threshold <= 0 or max_skip <= 0:
+        return None
+    return MotionGate(motion_threshold=threshold, max_skip=max_skip)
+
+
+def gate_totals() -> dict:
+    with _totals_lock:
+        total = _totals["analysed"] + _totals["skipped"]
+        return dict(_totals, skip_ratio=round(_totals["skipped"] / total, 3) if total else 0.0)
+
+
+register_source("motion_gate", gate_totals)
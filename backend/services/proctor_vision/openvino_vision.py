@@ -1,12 +1,19 @@
 # proctor_vision/openvino_vision.py
 
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from typing import Dict, Iterable, Optional, Tuple, List
 
 import cv2
 import numpy as np
-from openvino.runtime import Core
+
+from backend.services.metrics import mark as mark_stage
+
+from .model_registry import CompiledModels, get_model_registry
+from .motion_gate import MotionGate
 
 
 @dataclass
@@ -34,6 +41,84 @@ class ProctorState:
     last_warning_time: float = field(default_factory=lambda: 0.0)
 
 
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class FrameAnalysis:
+    """
+    Inference result for one frame: every face box, the main (largest)
+    face and its head pose. Produced by OpenVINOProctor.analyze or by a
+    shared inference engine, consumed by OpenVINOProctor.evaluate.
+    """
+    boxes: List[Box]
+    box: Optional[Box] = None
+    pose: Optional[Tuple[float, float, float]] = None
+
+
+def largest_box(boxes) -> Optional[Box]:
+    """Largest box by area from a list of boxes or a (K, 4) boxes array."""
+    if len(boxes) == 0:
+        return None
+    if isinstance(boxes, np.ndarray):
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        return tuple(boxes[int(np.argmax(areas))].tolist())
+    return max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+
+
+def boxes_array_from_detections(
+    detections: np.ndarray, w: int, h: int, conf_thresh: float = 0.6
+) -> np.ndarray:
+    """
+    Convert SSD rows [image_id, label, conf, xmin, ymin, xmax, ymax]
+    (normalised coords) into a (K, 4) int array of pixel boxes
+    (x1, y1, x2, y2), filtered by confidence and minimum area.
+    """
+    # compare in float64 so the threshold matches float(conf) exactly
+    det = detections[detections[:, 2].astype(np.float64) >= conf_thresh]
+
+    # float32 scaling + truncation towards zero, same as int(det * w)
+    scale = np.array([w, h, w, h], dtype=det.dtype)
+    boxes = (det[:, 3:7] * scale).astype(np.int64)
+
+    # clamp
+    np.maximum(boxes[:, :2], 0, out=boxes[:, :2])
+    np.minimum(boxes[:, 2], w - 1, out=boxes[:, 2])
+    np.minimum(boxes[:, 3], h - 1, out=boxes[:, 3])
+
+    # Skip extremely small faces
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return boxes[areas >= 0.02 * w * h]
+
+
+def boxes_from_detections(
+    detections: np.ndarray, w: int, h: int, conf_thresh: float = 0.6
+) -> List[Box]:
+    """List-of-tuples form of boxes_array_from_detections."""
+    return [tuple(b) for b in boxes_array_from_detections(detections, w, h, conf_thresh).tolist()]
+
+
+_calibration_pool: Optional[ThreadPoolExecutor] = None
+_calibration_pool_lock = threading.Lock()
+
+
+def get_calibration_pool() -> Optional[ThreadPoolExecutor]:
+    """
+    Threads used to analyse calibration frames when no shared engine is
+    running (PROCTOR_CALIBRATION_WORKERS, <= 1 analyses inline). Each
+    thread gets its own infer requests from CompiledModels.
+    """
+    global _calibration_pool
+    workers = int(os.getenv("PROCTOR_CALIBRATION_WORKERS", min(4, os.cpu_count() or 1)))
+    if workers <= 1:
+        return None
+    if _calibration_pool is None:
+        with _calibration_pool_lock:
+            if _calibration_pool is None:
+                _calibration_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proctor-calibrate")
+    return _calibration_pool
+
+
 class OpenVINOProctor:
     """
     Uses OpenVINO face detection + head pose estimation to:
@@ -47,26 +132,40 @@ class OpenVINOProctor:
         state: ProctorState,
         model_dir: str = "models",
         device: str = "CPU",
+        models: Optional[CompiledModels] = None,
+        engine=None,
+        gate: Optional[MotionGate] = None,
+        tracker=None,
     ):
         self.state = state
-        self.core = Core()
 
-        # --- Load models ---
-        fd_model_path = f"{model_dir}/face-detection-adas-0001.xml"
-        hp_model_path = f"{model_dir}/head-pose-estimation-adas-0001.xml"
+        # --- Shared models (compiled once per process, not per session) ---
+        registry = get_model_registry()
+        self.core = registry.core
+        self.models = models or registry.get(model_dir, device)
 
         # Face detection model
-        fd_model = self.core.read_model(fd_model_path)
-        self.fd_compiled = self.core.compile_model(fd_model, device)
-        self.fd_input = self.fd_compiled.input(0)
-        self.fd_output = self.fd_compiled.output(0)
-        _, _, self.fd_h, self.fd_w = self.fd_input.shape  # 1,3,H,W
+        self.fd_compiled = self.models.fd_compiled
+        self.fd_input = self.models.fd_input
+        self.fd_output = self.models.fd_output
+        self.fd_h, self.fd_w = self.models.fd_h, self.models.fd_w
 
         # Head pose model
-        hp_model = self.core.read_model(hp_model_path)
-        self.hp_compiled = self.core.compile_model(hp_model, device)
-        self.hp_input = self.hp_compiled.input(0)
-        _, _, self.hp_h, self.hp_w = self.hp_input.shape
+        self.hp_compiled = self.models.hp_compiled
+        self.hp_input = self.models.hp_input
+        self.hp_h, self.hp_w = self.models.hp_h, self.models.hp_w
+
+        # Optional shared inference engine: BatchInferenceScheduler
+        # (batch_engine.py) or AsyncInferencePipeline (async_engine.py)
+        self.engine = engine
+
+        # Optional motion gate: static frames reuse the last FrameAnalysis
+        self.gate = gate
+        self.last_analysis: Optional[FrameAnalysis] = None
+
+        # Optional FaceTracker (face_tracker.py): between full detections
+        # the face is tracked and head pose runs on the tracked box
+        self.tracker = tracker
 
         # ---------- thresholds (tunable) ----------
 
@@ -93,11 +192,15 @@ class OpenVINOProctor:
 
         # frames with good detection needed for calibration
         self.min_calibration_frames = 20
+        self.calibration_report: List[dict] = []
 
     # ---------- Helpers ----------
 
     def _preprocess_for_fd(self, frame_bgr: np.ndarray) -> np.ndarray:
         """Resize and transpose frame for face detection model."""
+        if self.models.embedded_preprocess:
+            # resize / layout / f32 happen inside the model: pass the u8 buffer
+            return np.ascontiguousarray(frame_bgr)[np.newaxis]
         img = cv2.resize(frame_bgr, (self.fd_w, self.fd_h))
         img = img.transpose(2, 0, 1)  # HWC -> CHW
         img = img[np.newaxis, :, :, :].astype(np.float32)
@@ -109,48 +212,31 @@ class OpenVINOProctor:
         """
         Detect all faces. Returns list of boxes (x1, y1, x2, y2).
         """
+        return [tuple(b) for b in self._detect_face_boxes(frame_bgr, conf_thresh).tolist()]
+
+    def _detect_face_boxes(self, frame_bgr: np.ndarray, conf_thresh: float = 0.6) -> np.ndarray:
+        """Array form of _detect_faces: (K, 4) int boxes."""
         h, w, _ = frame_bgr.shape
         input_tensor = self._preprocess_for_fd(frame_bgr)
-        result = self.fd_compiled([input_tensor])[self.fd_output]
+        mark_stage("resize")
+        result = self.models.infer_fd(input_tensor)
+        mark_stage("face_detection")
 
         # result shape: [1, 1, N, 7] => [image_id, label, conf, xmin, ymin, xmax, ymax]
-        detections = result[0, 0, :, :]
-        boxes: List[Tuple[int, int, int, int]] = []
-
-        for det in detections:
-            conf = float(det[2])
-            if conf < conf_thresh:
-                continue
-
-            xmin = int(det[3] * w)
-            ymin = int(det[4] * h)
-            xmax = int(det[5] * w)
-            ymax = int(det[6] * h)
-
-            # clamp
-            xmin = max(0, xmin)
-            ymin = max(0, ymin)
-            xmax = min(w - 1, xmax)
-            ymax = min(h - 1, ymax)
-
-            # Skip extremely small faces
-            if (xmax - xmin) * (ymax - ymin) < 0.02 * w * h:
-                continue
-
-            boxes.append((xmin, ymin, xmax, ymax))
-
+        boxes = boxes_array_from_detections(result[0, 0, :, :], w, h, conf_thresh)
+        mark_stage("postprocess")
         return boxes
 
     def _detect_face(self, frame_bgr: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """
         Backwards-compatible helper: returns the largest face or None.
         """
-        boxes = self._detect_faces(frame_bgr)
-        if not boxes:
-            return None
-        return max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        return largest_box(self._detect_faces(frame_bgr))
 
     def _preprocess_for_head_pose(self, face_bgr: np.ndarray) -> np.ndarray:
+        if self.models.embedded_preprocess:
+            # a face crop is a strided view; one compact u8 copy, no float
+            return np.ascontiguousarray(face_bgr)[np.newaxis]
         img = cv2.resize(face_bgr, (self.hp_w, self.hp_h))
         img = img.transpose(2, 0, 1)
         img = img[np.newaxis, :, :, :].astype(np.float32)
@@ -161,34 +247,20 @@ class OpenVINOProctor:
         Returns yaw, pitch, roll in degrees using head-pose-estimation-adas-0001.
         """
         input_tensor = self._preprocess_for_head_pose(face_bgr)
-        outputs = self.hp_compiled([input_tensor])
-
-        yaw = None
-        pitch = None
-        roll = None
-
-        for out in self.hp_compiled.outputs:
-            name = out.get_any_name()
-            val = float(outputs[out].flatten()[0])
-            if "angle_y" in name:
-                yaw = val
-            elif "angle_p" in name:
-                pitch = val
-            elif "angle_r" in name:
-                roll = val
-
-        # Fallback: if names not matched, just take first 3 outputs
-        if yaw is None or pitch is None or roll is None:
-            vals = [float(outputs[o].flatten()[0]) for o in self.hp_compiled.outputs]
-            yaw, pitch, roll = vals[:3]
-
-        return yaw, pitch, roll
+        pose = self.models.infer_hp(input_tensor)
+        mark_stage("head_pose")
+        return pose
 
     # ---------- Public API ----------
 
-    def calibrate(self, frames: List[np.ndarray]):
+    def calibrate(self, frames: Iterable[np.ndarray]):
         """
         Use multiple frames to compute baseline head pose + face position.
+
+        Frames are analysed concurrently (shared engine, or the calibration
+        thread pool in sync mode) as they arrive from the iterable, and
+        analysis stops once min_calibration_frames usable frames are in.
+        Per-frame quality is left in self.calibration_report.
         """
         yaw_list = []
         pitch_list = []
@@ -197,30 +269,61 @@ class OpenVINOProctor:
         centers_y = []
         widths = []
         heights = []
-
-        for frame in frames:
-            box = self._detect_face(frame)
+        report = []
+        pending: Dict[Future, Tuple[int, int]] = {}
+
+        def collect(future: Future):
+            index, frame_area = pending.pop(future)
+            analysis = future.result()
+            box, pose = analysis.box, analysis.pose
+            entry = {"frame": index, "faces": len(analysis.boxes), "used": False}
+            report.append(entry)
             if box is None:
-                continue
-            x1, y1, x2, y2 = box
-            face = frame[y1:y2, x1:x2]
-            if face.size == 0:
-                continue
+                entry["reason"] = "no_face"
+                return
+            if pose is None:
+                entry["reason"] = "invalid_crop"
+                return
 
-            yaw, pitch, roll = self._estimate_head_pose(face)
+            x1, y1, x2, y2 = box
+            yaw, pitch, roll = pose
+            entry.update({
+                "used": True,
+                "reason": "ok",
+                "face_area": round((x2 - x1) * (y2 - y1) / float(frame_area), 3),
+                "pose": [round(yaw, 2), round(pitch, 2), round(roll, 2)],
+            })
             yaw_list.append(yaw)
             pitch_list.append(pitch)
             roll_list.append(roll)
 
-            cx = (x1 + x2) / 2.0
-            cy = (y1 + y2) / 2.0
-            w = x2 - x1
-            h = y2 - y1
-
-            centers_x.append(cx)
-            centers_y.append(cy)
-            widths.append(w)
-            heights.append(h)
+            centers_x.append((x1 + x2) / 2.0)
+            centers_y.append((y1 + y2) / 2.0)
+            widths.append(x2 - x1)
+            heights.append(y2 - y1)
+
+        def enough() -> bool:
+            return len(yaw_list) >= self.min_calibration_frames
+
+        try:
+            for index, frame in enumerate(frames):
+                pending[self._submit_calibration_frame(frame)] = (index, frame.shape[0] * frame.shape[1])
+                for future in [f for f in pending if f.done()]:
+                    collect(future)
+                if enough():
+                    break
+
+            while pending and not enough():
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+        finally:
+            # early stop: frames still queued are not needed any more
+            for future, (index, _) in list(pending.items()):
+                future.cancel()
+                report.append({"frame": index, "used": False, "reason": "not_needed"})
+
+        self.calibration_report = sorted(report, key=lambda e: e["frame"])
 
         if len(yaw_list) < self.min_calibration_frames:
             return (
@@ -244,23 +347,199 @@ class OpenVINOProctor:
         self.state.deviation_start_time = None
         self.state.last_warning_time = 0.0
 
+        self.last_analysis = None
+        if self.gate is not None:
+            self.gate.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+
         return True, "Calibration successful"
 
+    def _precheck(self):
+        if self.state.terminated:
+            return "TERMINATE", {"message": "Exam already terminated."}
+
+        if self.state.baseline_yaw is None:
+            return "ERROR", {"message": "Not calibrated yet"}
+
+        return None
+
+    def analyze(self, frame: np.ndarray) -> FrameAnalysis:
+        """
+        Inference half of check_frame: detect faces and estimate the
+        head pose of the largest one. Does not touch ProctorState.
+        """
+        tracked = self._tracked_analysis(frame)
+        if tracked is not None:
+            return tracked
+
+        analysis = self._analyze_full(frame)
+        if self.tracker is not None:
+            self.tracker.update(frame, analysis.boxes)
+        return analysis
+
+    def _analyze_full(self, frame: np.ndarray) -> FrameAnalysis:
+        """Full-frame detection + head pose, no per-session state at all."""
+        boxes_array = self._detect_face_boxes(frame)
+        box = largest_box(boxes_array)
+        pose = None
+        if box is not None:
+            x1, y1, x2, y2 = box
+            face = frame[y1:y2, x1:x2]
+            if face.size != 0:
+                pose = self._estimate_head_pose(face)
+        return FrameAnalysis(boxes=[tuple(b) for b in boxes_array.tolist()], box=box, pose=pose)
+
+    def _submit_calibration_frame(self, frame: np.ndarray) -> Future:
+        """Future resolving to the frame's FrameAnalysis"""
+        if self.engine is not None and hasattr(self.engine, "analyze"):
+            return self.engine.analyze(self, frame)
+
+        pool = get_calibration_pool()
+        if pool is not None:
+            return pool.submit(self._analyze_full, frame)
+
+        future: Future = Future()
+        try:
+            future.set_result(self._analyze_full(frame))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _tracked_analysis(self, frame: np.ndarray) -> Optional[FrameAnalysis]:
+        """
+        Track-then-detect: head pose on the tracked face box, or None when
+        the tracker asks for a full-frame detection (which it also does
+        when the frame moved away from the face, so a second face is
+        reported on the frame it appears in).
+        """
+        if self.tracker is None:
+            return None
+        box = self.tracker.track(frame)
+        mark_stage("tracking")
+        if box is None:
+            return None
+        x1, y1, x2, y2 = box
+        face = frame[y1:y2, x1:x2]
+        if face.size == 0:
+            self.tracker.reset()
+            return None
+        return FrameAnalysis(boxes=[box], box=box, pose=self._estimate_head_pose(face))
+
+    def _engine_detected(self, frame: np.ndarray):
+        """Feed a full detection done by the shared engine to the tracker."""
+        if self.tracker is not None and self.last_analysis is not None:
+            self.tracker.update(frame, self.last_analysis.boxes)
+
     def check_frame(self, frame: np.ndarray):
         """
         Check a single frame:
         - Returns (status, details)
         - status: NORMAL / WARNING / TERMINATE / NO_FACE / ERROR
         """
+        precheck = self._precheck()
+        if precheck is not None:
+            return precheck
+
+        thumb = self._gate_thumbnail(frame)
+        skip = thumb is not None and self.gate.should_skip(thumb)
+        mark_stage("motion_gate")
+        if skip:
+            result = self._reuse_last_analysis()
+            mark_stage("evaluate")
+            return result
+
+        tracked = self._tracked_analysis(frame) if self.engine is not None else None
+        if tracked is not None:
+            # head pose on the tracked box is cheap enough to run inline
+            result = self.evaluate(tracked)
+        elif self.engine is not None:
+            # inference runs on the shared engine, which also calls evaluate()
+            result = self.engine.submit(self, frame).result()
+            mark_stage("engine")
+            self._engine_detected(frame)
+        else:
+            result = self.evaluate(self.analyze(frame))
+        mark_stage("evaluate")
+
+        self._gate_observe(thumb, result[0])
+        return result
+
+    def submit_frame(self, frame: np.ndarray, callback=None) -> Future:
+        """
+        Non-blocking variant of check_frame. Returns a Future resolving to
+        (status, details); callback(status, details) is also invoked when
+        set. Without a shared engine the frame is checked inline.
+        """
+        precheck = self._precheck()
+        thumb = self._gate_thumbnail(frame) if precheck is None else None
+        skip = thumb is not None and self.gate.should_skip(thumb)
+        tracked = None
+        if precheck is None and not skip and self.engine is not None:
+            tracked = self._tracked_analysis(frame)
+
+        if precheck is not None or skip or tracked is not None or self.engine is None:
+            future: Future = Future()
+            try:
+                if precheck is not None:
+                    result = precheck
+                elif skip:
+                    result = self._reuse_last_analysis()
+                else:
+                    result = self.evaluate(tracked or self.analyze(frame))
+                    self._gate_observe(thumb, result[0])
+                future.set_result(result)
+                if callback is not None:
+                    callback(*result)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        def on_result(status, details):
+            self._engine_detected(frame)
+            self._gate_observe(thumb, status)
+            if callback is not None:
+                callback(status, details)
+
+        return self.engine.submit(self, frame, on_result)
+
+    # ---------- Motion gate ----------
+
+    def _gate_thumbnail(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        if self.gate is None:
+            return None
+        return self.gate.thumbnail(frame)
+
+    def _gate_observe(self, thumb: Optional[np.ndarray], status: str):
+        if thumb is not None:
+            deviating = self.state.deviation_start_time is not None
+            self.gate.observe(thumb, status, deviating)
+
+    def _reuse_last_analysis(self):
+        """
+        Skipped frame: re-run evaluate on the previous inference result so
+        the time-based rules (no-face timeout, deviation duration) still
+        advance. A non-NORMAL verdict forces full analysis on the next frame.
+        """
+        result = self.evaluate(self.last_analysis)
+        if result[0] != "NORMAL":
+            self.gate.reset()
+        return result
+
+    def evaluate(self, analysis: FrameAnalysis):
+        """
+        Decision half of check_frame: apply the warning / deviation
+        state machine to an already computed FrameAnalysis.
+        """
         now = time.time()
-        if self.state.terminated:
-            return "TERMINATE", {"message": "Exam already terminated."}
+        precheck = self._precheck()
+        if precheck is not None:
+            return precheck
 
-        if self.state.baseline_yaw is None:
-            return "ERROR", {"message": "Not calibrated yet"}
+        self.last_analysis = analysis
 
         # --- multi-face detection ---
-        boxes = self._detect_faces(frame)
+        boxes = analysis.boxes
         if not boxes:
             if now - self.state.last_face_time > self.no_face_timeout:
                 status, details = self._issue_warning(
@@ -277,22 +556,21 @@ class OpenVINOProctor:
         self.state.last_face_time = now
 
         faces_detected = len(boxes)
-        # choose main (largest) face for pose
-        box = max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        # main (largest) face for pose
+        box = analysis.box
         x1, y1, x2, y2 = box
-        face = frame[y1:y2, x1:x2]
-        if face.size == 0:
+        if analysis.pose is None:
             return "NO_FACE", {
                 "message": "Face region invalid",
                 "faces_detected": faces_detected,
             }
+        yaw, pitch, roll = analysis.pose
 
         # If more than one face, immediate warning via same pipeline
         if faces_detected > 1:
             status, details = self._issue_warning(
                 "Multiple faces detected in frame"
             )
-            yaw, pitch, roll = self._estimate_head_pose(face)
             dyaw = abs(yaw - self.state.baseline_yaw)
             dpitch = abs(pitch - self.state.baseline_pitch)
             droll = abs(roll - self.state.baseline_roll)
@@ -311,8 +589,6 @@ class OpenVINOProctor:
             return status, details
 
         # --- normal single-face path ---
-        yaw, pitch, roll = self._estimate_head_pose(face)
-
         dyaw = abs(yaw - self.state.baseline_yaw)
         dpitch = abs(pitch - self.state.baseline_pitch)
         droll = abs(roll - self.state.baseline_roll)
@@ -0,0 +1,57 @@
+# proctor_vision/warmup.py
+
+import time
+
+import numpy as np
+
+from .engines import get_inference_engine
+from .model_registry import default_model_config, get_model_registry
+from .openvino_vision import OpenVINOProctor, ProctorState
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000.0, 1)
+
+
+def warm_up_models(iterations: int = 3, frame_size=(640, 480)) -> dict:
+    """
+    Compile the shared face-detection / head-pose pair (read from the
+    OpenVINO CACHE_DIR when a previous boot left blobs there), build the
+    configured inference engine, and run a few inferences on synthetic
+    inputs so the first student does not pay for plugin start-up and
+    first-inference allocations. Returns per-step timings in ms.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    model_dir, device = default_model_config()
+    models = get_model_registry().get(model_dir, device)
+    timings["compile_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    engine = get_inference_engine(models)   # batched / THROUGHPUT variants compile here
+    timings["engine_ms"] = _ms(start)
+
+    proctor = OpenVINOProctor(ProctorState(session_id="warmup"), models=models)
+    w, h = frame_size
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+    face = np.ascontiguousarray(frame[h // 4:h // 4 + 2 * models.hp_h, w // 4:w // 4 + 2 * models.hp_w])
+
+    fd_tensor = proctor._preprocess_for_fd(frame)
+    hp_tensor = proctor._preprocess_for_head_pose(face)
+    samples = []
+    for _ in range(max(1, iterations)):
+        start = time.perf_counter()
+        models.infer_fd(fd_tensor)
+        models.infer_hp(hp_tensor)
+        samples.append(_ms(start))
+    timings["first_infer_ms"] = samples[0]
+    timings["steady_infer_ms"] = samples[-1]
+
+    if engine is not None and hasattr(engine, "analyze"):
+        start = time.perf_counter()
+        engine.analyze(proctor, frame).result(timeout=60)
+        timings["engine_infer_ms"] = _ms(start)
+
+    return timings
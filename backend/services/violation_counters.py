@@ -0,0 +1,183 @@
+"""
+In-memory proctoring violation counters with periodic StudentExam sync
+- per-session no_face / multiple_faces / total counters served from memory
+- dirty sessions are written back to StudentExam in batches
+- sync_to() writes a session's totals onto its ORM row (terminate / submit)
+"""
+
+import atexit
+import os
+import threading
+from typing import Dict, Optional
+
+from backend.database import db
+from backend.services.metrics import register_source
+
+COUNTER_FIELDS = ("no_face_count", "multiple_faces_count", "total_violations")
+
+
+class LocalCounterBackend:
+    """
+    In-process counter backend. Stand-in for a shared store (e.g. a Redis
+    hash per session with HINCRBY) so several workers could share counts;
+    any replacement only needs these five methods.
+    """
+
+    def __init__(self):
+        self._data: Dict[int, dict] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[dict]:
+        with self._lock:
+            values = self._data.get(key)
+            return dict(values) if values is not None else None
+
+    def seed(self, key, values: dict) -> dict:
+        """Insert values unless the key already exists, return current values."""
+        with self._lock:
+            current = self._data.setdefault(key, dict(values))
+            return dict(current)
+
+    def incr(self, key, deltas: dict) -> dict:
+        with self._lock:
+            values = self._data[key]
+            for field, n in deltas.items():
+                values[field] = (values.get(field) or 0) + n
+            self._dirty.add(key)
+            return dict(values)
+
+    def pop_dirty(self, key=None) -> Dict[int, dict]:
+        with self._lock:
+            keys = [key] if key is not None else list(self._dirty)
+            out = {}
+            for k in keys:
+                if k in self._dirty and k in self._data:
+                    self._dirty.discard(k)
+                    out[k] = dict(self._data[k])
+            return out
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._dirty.discard(key)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ViolationCounterStore:
+    """
+    Counters per student_exam_id. Besides the three StudentExam counters
+    each entry caches 'active' (status == in_progress) and the exam's
+    detector 'backend' so the frame path needs no StudentExam query.
+    """
+
+    def __init__(self, app, backend=None, sync_interval: float = 5.0):
+        self.app = app
+        self.backend = backend or LocalCounterBackend()
+        self.sync_interval = sync_interval
+        self.rows_synced = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="violation-sync", daemon=True)
+        self._thread.start()
+
+    def get(self, student_exam_id) -> Optional[dict]:
+        return self.backend.get(student_exam_id)
+
+    def seed(self, student_exam, **meta) -> dict:
+        """Load a session's counters from its StudentExam row (first access)."""
+        values = {field: getattr(student_exam, field, 0) or 0 for field in COUNTER_FIELDS}
+        values["active"] = student_exam.status == 'in_progress'
+        values.update(meta)
+        return self.backend.seed(student_exam.id, values)
+
+    def incr(self, student_exam_id, **deltas) -> dict:
+        return self.backend.incr(student_exam_id, deltas)
+
+    def sync_to(self, student_exam):
+        """Copy in-memory totals onto the ORM row; the caller commits."""
+        values = self.backend.get(student_exam.id)
+        self.backend.pop_dirty(student_exam.id)
+        if values is None:
+            return
+        for field in COUNTER_FIELDS:
+            setattr(student_exam, field, values[field])
+
+    def release(self, student_exam):
+        """Final synchronous write (submit / terminate), then forget the session."""
+        self.sync_to(student_exam)
+        self.backend.delete(student_exam.id)
+
+    def final_counts(self, student_exam_ids) -> Dict[int, dict]:
+        """id -> current counters for a bulk write; nothing is released."""
+        out = {}
+        for key in student_exam_ids:
+            values = self.backend.get(key)
+            if values is not None:
+                out[key] = {field: values[field] for field in COUNTER_FIELDS}
+        return out
+
+    def release_many(self, student_exam_ids):
+        """Forget sessions whose final_counts() the caller has committed."""
+        for key in student_exam_ids:
+            self.backend.pop_dirty(key)
+            self.backend.delete(key)
+
+    def flush(self):
+        """Batch-write every dirty session to StudentExam."""
+        from models import StudentExam
+
+        dirty = self.backend.pop_dirty()
+        if not dirty:
+            return
+        mappings = [
+            dict({"id": key}, **{field: values[field] for field in COUNTER_FIELDS})
+            for key, values in dirty.items()
+        ]
+        with self.app.app_context():
+            try:
+                db.session.bulk_update_mappings(StudentExam, mappings)
+                db.session.commit()
+                self.rows_synced += len(mappings)
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Violation counter sync error: {e}")
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.sync_interval):
+            self.flush()
+
+    def stats(self) -> dict:
+        return {"sessions": len(self.backend), "rows_synced": self.rows_synced}
+
+
+violation_counters: Optional[ViolationCounterStore] = None
+
+
+def init_violation_counters(app, backend=None) -> ViolationCounterStore:
+    global violation_counters
+    if violation_counters is None:
+        violation_counters = ViolationCounterStore(
+            app,
+            backend=backend,
+            sync_interval=float(os.getenv("VIOLATION_SYNC_SECONDS", 5)),
+        )
+        atexit.register(violation_counters.close)
+        register_source("violation_counters", violation_counters.stats)
+    return violation_counters
+
+
+def get_violation_counters() -> Optional[ViolationCounterStore]:
+    return violation_counters
+
+
+def release_violation_counters(student_exam):
+    """Write a session's in-memory counters onto its row before the final commit."""
+    if violation_counters is not None:
+        violation_counters.release(student_exam)
@@ -0,0 +1,106 @@
+"""
+Vision facade for the routes
+- OpenCV, NumPy and OpenVINO are imported on first use, not when the
+  app (or a CLI / migration that only needs the models) starts
+- one place that wires a proctoring session together
+- optional start-up warm-up and the readiness state behind /healthz/ready
+"""
+
+import os
+import threading
+import time
+
+from backend.services.metrics import register_source
+
+_readiness = {"status": "cold", "error": None, "timings": {}, "since": None}
+_readiness_lock = threading.Lock()
+
+
+def new_proctor(proctor_state):
+    """OpenVINOProctor on the shared compiled models, engine / gate / tracker from .env"""
+    from backend.services.proctor_vision.engines import get_inference_engine
+    from backend.services.proctor_vision.face_tracker import face_tracker_from_env
+    from backend.services.proctor_vision.model_registry import default_model_config, get_model_registry
+    from backend.services.proctor_vision.motion_gate import motion_gate_from_env
+    from backend.services.proctor_vision.openvino_vision import OpenVINOProctor
+
+    model_dir, device = default_model_config()  # Models folder in project root
+    models = get_model_registry().get(model_dir, device)
+    return OpenVINOProctor(
+        proctor_state,
+        models=models,
+        engine=get_inference_engine(models),        # None in sync mode
+        gate=motion_gate_from_env(),                # None when disabled
+        tracker=face_tracker_from_env()             # None when disabled
+    )
+
+
+def request_frames(req, json_field: str, max_frames: int = 0, target_size=None):
+    """Lazily decoded frames of a request (see frame_io.RequestFrames)"""
+    from backend.utils.frame_io import RequestFrames
+    return RequestFrames(req, json_field, max_frames=max_frames, target_size=target_size)
+
+
+def read_request_frames(req, json_field: str, max_frames: int = 0, target_size=None):
+    """(frames, factors, received) for a request, decoded at once"""
+    from backend.utils.frame_io import read_request_frames as _read
+    return _read(req, json_field, max_frames=max_frames, target_size=target_size)
+
+
+def scale_box(box, factor: int, size=None):
+    from backend.utils.frame_io import scale_box as _scale_box
+    return _scale_box(box, factor, size)
+
+
+# ---------- warm-up / readiness ----------
+
+def _set_readiness(status: str, **extra):
+    with _readiness_lock:
+        _readiness.update(status=status, since=time.time(), **extra)
+
+
+def readiness() -> dict:
+    """cold / warming / ready / failed, or lazy when warm-up is off"""
+    with _readiness_lock:
+        return {**_readiness, "timings": dict(_readiness["timings"])}
+
+
+def is_ready() -> bool:
+    return readiness()["status"] in ("ready", "lazy")
+
+
+def _run_warm_up(iterations: int):
+    _set_readiness("warming")
+    start = time.perf_counter()
+    try:
+        from backend.services.proctor_vision.warmup import warm_up_models
+        timings = warm_up_models(iterations)
+    except Exception as e:
+        _set_readiness("failed", error=str(e))
+        print(f"❌ Vision warm-up failed: {e}")
+        return
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+    _set_readiness("ready", error=None, timings=timings)
+    print(f"✅ Vision engine warm in {timings['total_ms']:.0f} ms")
+
+
+def start_warm_up():
+    """
+    Compile and warm the shared models at start-up (PROCTOR_WARMUP):
+      background - in a daemon thread, the app serves meanwhile (default)
+      blocking   - before create_app returns
+      off        - nothing; the first student compiles the models
+    """
+    mode = os.getenv("PROCTOR_WARMUP", "background").lower()
+    iterations = int(os.getenv("PROCTOR_WARMUP_ITERATIONS", 3))
+
+    if mode in ("off", "0", "false", "no"):
+        _set_readiness("lazy")
+        return
+    if mode == "blocking":
+        _run_warm_up(iterations)
+        return
+    threading.Thread(target=_run_warm_up, args=(iterations,), name="vision-warmup", daemon=True).start()
+
+
+register_source("vision_warmup", readiness)
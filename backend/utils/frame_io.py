@@ -0,0 +1,239 @@
+"""
+Frame transport helpers for the proctoring API and Socket.IO handlers
+- accepts JSON base64 data URLs, raw image/jpeg bodies and multipart batches
+- reduced-resolution JPEG decode when the source is much larger than the
+  model input (boxes are mapped back with scale_box)
+- decode time and decoded-buffer size are tracked per frame
+"""
+
+import base64
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from backend.services.metrics import decode_stats, mark as mark_stage
+
+RAW_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp", "application/octet-stream")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+REDUCED_DECODE_FLAGS = {
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+# SOFn markers carrying the frame size (DHT / JPG / DAC share the range)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def reduced_decode_enabled() -> bool:
+    return os.getenv("FRAME_REDUCED_DECODE", "1").lower() not in ("0", "false", "no")
+
+
+def jpeg_dimensions(data) -> Optional[Tuple[int, int]]:
+    """(width, height) from the JPEG SOF header without decoding, or None"""
+    n = len(data)
+    if n < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:            # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:   # no length field
+            i += 2
+            continue
+        if marker == 0xDA:            # start of scan: no SOF seen
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    return None
+
+
+def reduction_factor(size: Optional[Tuple[int, int]], target_size: Optional[Tuple[int, int]]) -> int:
+    """Largest of 4 / 2 that keeps the decoded image at least target_size"""
+    if not size or not target_size:
+        return 1
+    w, h = size
+    tw, th = target_size
+    for factor in (4, 2):
+        if w // factor >= tw and h // factor >= th:
+            return factor
+    return 1
+
+
+def scale_box(box, factor: int, size: Optional[Tuple[int, int]] = None):
+    """Map (x1, y1, x2, y2) from a reduced decode back to source pixels"""
+    if factor == 1:
+        return tuple(box)
+    scaled = [int(v) * factor for v in box]
+    if size:
+        w, h = size
+        scaled[2] = min(w - 1, scaled[2])
+        scaled[3] = min(h - 1, scaled[3])
+    return tuple(scaled)
+
+
+def measure_decode_frame(data, target_size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], int, dict]:
+    """
+    decode_frame without recording anything, returns (image, factor,
+    timings) for metrics.record_cv_timings - usable in CV worker processes
+    """
+    if not data:
+        return None, 1, {}
+
+    start = time.perf_counter()
+    size = jpeg_dimensions(data)
+    factor = reduction_factor(size, target_size) if reduced_decode_enabled() else 1
+    flags = REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR)
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    timings = {"decode_ms": (time.perf_counter() - start) * 1000.0}
+    if img is None:
+        return None, 1, timings
+
+    timings.update({
+        "factor": factor,
+        "decoded_bytes": img.nbytes,
+        "full_bytes": size[0] * size[1] * 3 if size else img.nbytes,
+    })
+    return img, factor, timings
+
+
+def decode_frame(data, target_size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Decode an encoded frame, returns (image, factor). With target_size
+    (model input W, H) a large JPEG is decoded at 1/2 or 1/4 resolution;
+    multiply boxes found in the image by factor (scale_box) to get source
+    coordinates.
+    """
+    img, factor, timings = measure_decode_frame(data, target_size)
+    if not timings:
+        return None, 1
+
+    mark_stage("decode")
+    if img is not None:
+        decode_stats.record(timings["decode_ms"], factor, timings["decoded_bytes"], timings["full_bytes"])
+    return img, factor
+
+
+def decode_image_bytes(data) -> Optional[np.ndarray]:
+    """imdecode straight from a bytes-like buffer (np.frombuffer, no copy)"""
+    return decode_frame(data)[0]
+
+
+def decode_base64_image(data_url: str, target_size: Optional[Tuple[int, int]] = None):
+    """Convert base64 image to OpenCV format, returns (image, factor)"""
+    try:
+        if "," in data_url:
+            _, encoded = data_url.split(",", 1)
+        else:
+            encoded = data_url
+        return decode_frame(base64.b64decode(encoded), target_size)
+    except Exception as e:
+        print(f"Error decoding image: {e}")
+        return None, 1
+
+
+def iter_multipart_files(stream, boundary: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (field name, bytes) for every file part of a multipart body as
+    soon as the part is complete, reading the request stream in chunks.
+    Only one part is held in memory at a time; plain form fields are skipped.
+    """
+    decoder = MultipartDecoder(boundary.encode("latin-1"))
+    name, buf, is_file = None, bytearray(), False
+
+    while True:
+        chunk = stream.read(chunk_size)
+        decoder.receive_data(chunk or None)
+
+        event = decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, (File, Field)):
+                name, buf, is_file = event.name, bytearray(), isinstance(event, File)
+            elif isinstance(event, Data):
+                buf += event.data
+                if not event.more_data:
+                    if is_file:
+                        yield name, bytes(buf)
+                    buf = bytearray()
+            event = decoder.next_event()
+
+        if isinstance(event, Epilogue) or not chunk:
+            return
+
+
+class RequestFrames:
+    """
+    Lazily decoded frames of a proctoring request, iterate once.
+
+    - image/jpeg (or png / webp / octet-stream) body: one frame
+    - multipart/form-data: every file part, decoded as it streams in
+    - application/json: base64 data URL(s) under json_field (legacy)
+
+    Frames that fail to decode are counted in received but not yielded;
+    factors[i] is the reduced-decode factor of the i-th yielded frame.
+    Stopping the iteration early leaves the rest of the body unread.
+    """
+
+    def __init__(self, req, json_field: str, max_frames: int = 0, target_size: Optional[Tuple[int, int]] = None):
+        self.req = req
+        self.json_field = json_field
+        self.max_frames = max_frames
+        self.target_size = target_size
+        self.received = 0
+        self.factors: List[int] = []
+
+    @property
+    def decoded(self) -> int:
+        return len(self.factors)
+
+    def _encoded(self) -> Iterator:
+        req = self.req
+        mimetype = req.mimetype or ""
+
+        if mimetype in RAW_IMAGE_TYPES:
+            yield decode_frame, req.get_data(cache=False)
+
+        elif mimetype == "multipart/form-data":
+            boundary = req.mimetype_params.get("boundary")
+            if boundary:
+                for _, part in iter_multipart_files(req.stream, boundary):
+                    yield decode_frame, part
+
+        else:
+            data = req.get_json(silent=True) or {}
+            values = data.get(self.json_field) or []
+            if isinstance(values, str):
+                values = [values]
+            for value in values:
+                yield decode_base64_image, value
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for decode, payload in self._encoded():
+            if self.max_frames and self.received >= self.max_frames:
+                break
+            self.received += 1
+            img, factor = decode(payload, self.target_size)
+            if img is not None:
+                self.factors.append(factor)
+                yield img
+
+
+def read_request_frames(
+    req, json_field: str, max_frames: int = 0, target_size: Optional[Tuple[int, int]] = None
+) -> Tuple[List[np.ndarray], List[int], int]:
+    """Decode every frame of a request at once, returns (frames, factors, received)"""
+    request_frames = RequestFrames(req, json_field, max_frames, target_size)
+    frames = list(request_frames)
+    return frames, request_frames.factors, request_frames.received
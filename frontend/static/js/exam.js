@@ -43,6 +43,9 @@ const ExamState = {
 
     // Answer Management
     answers: {},
+    pendingAnswers: {},   // changed since the last acknowledged save (delta autosave)
+    saveSeq: 0,           // increasing per attempt; the server ignores older saves
+    socketSaves: {},      // seq -> { delta, timer } awaiting 'answersSaved'
     lastSaveTime: 0,
     saveDebounceTimer: null,
 
@@ -71,6 +74,7 @@ function initExam(config) {
     ExamState.secondsLeft = Math.max(0, Math.floor(config.timeRemaining * 60));
     ExamState.maxTabSwitches = config.maxTabSwitches || 3;
     ExamState.tabSwitchCount = config.initialTabSwitchCount || 0;
+    ExamState.saveSeq = config.answersSeq || 0;
     ExamState.showTabSwitches = config.showTabSwitches !== false;
     ExamState.examId = config.examId;
 
@@ -170,6 +174,21 @@ function setupSocketHandlers() {
         ExamState.lastSocketHeartbeat = Date.now();
     });
 
+    // Socket saveAnswers result, sent once the batched writer committed it
+    ExamState.socket.on('answersSaved', (data) => {
+        const save = ExamState.socketSaves[data.seq];
+        if (!save) return;   // already timed out and retried over HTTP
+        clearTimeout(save.timer);
+        delete ExamState.socketSaves[data.seq];
+        if (data.status === 'saved') {
+            acknowledgeAnswers(save.delta);
+            console.log("✅ Answers saved (socket)");
+        } else {
+            console.warn("⚠️ Socket save failed, retrying over HTTP:", data);
+            postAnswers(data.seq, save.delta);
+        }
+    });
+
 
     // ----------------------------------------------------
     // REAL-TIME FORCE END — ENTIRE EXAM
@@ -604,6 +623,7 @@ function updateTimerDisplay() {
 function pad(num) { return num.toString().padStart(2, '0'); }
 
 // ANSWER TRACKING & AUTOSAVE
+const ANSWER_ACK_TIMEOUT_MS = 5000;
 function setupAnswerTracking() {
     console.log("📝 Setting up answer tracking...");
     const existingInputs = document.querySelectorAll('input[type="radio"]:checked');
@@ -618,13 +638,14 @@ function setupAnswerTracking() {
         }
     });
     setInterval(() => {
-        if (Object.keys(ExamState.answers).length > 0) saveAnswers();
+        if (Object.keys(ExamState.pendingAnswers).length > 0) saveAnswers();
     }, 10000);
 }
 function handleAnswerChange(input) {
     const questionId = input.dataset.questionId;
     const answer = input.value;
     ExamState.answers[questionId] = answer;
+    ExamState.pendingAnswers[questionId] = answer;
     const questionCard = input.closest('.question-card');
     if (questionCard) {
         questionCard.querySelectorAll('.option').forEach(opt => opt.classList.remove('selected'));
@@ -635,29 +656,70 @@ function handleAnswerChange(input) {
     ExamState.saveDebounceTimer = setTimeout(() => saveAnswers(), 1200);
 }
 
-async function saveAnswers() {
+async function saveAnswers(final = false) {
     const now = Date.now();
-    if (now - ExamState.lastSaveTime < 900) return;
+    if (!final && now - ExamState.lastSaveTime < 900) return;
     ExamState.lastSaveTime = now;
 
-    console.log("💾 Saving answers...", ExamState.answers);
+    // Delta save: only answers changed since the last acknowledged save
+    const delta = { ...ExamState.pendingAnswers };
+    if (Object.keys(delta).length === 0) return;
+    const seq = ++ExamState.saveSeq;
+
+    console.log(`💾 Saving ${Object.keys(delta).length} changed answer(s), seq ${seq}`);
+
+    // Preferred: the already-authenticated proctoring socket, answered with
+    // 'answersSaved' after the write. The last save before submit goes over
+    // HTTP (keepalive survives the page change)
+    if (!final && ExamState.socket && ExamState.socket.connected) {
+        const timer = setTimeout(() => {
+            delete ExamState.socketSaves[seq];
+            // same seq: a late socket write and this one cannot both apply
+            console.warn("⚠️ Socket save timed out, retrying over HTTP");
+            postAnswers(seq, delta);
+        }, ANSWER_ACK_TIMEOUT_MS);
+        ExamState.socketSaves[seq] = { delta, timer };
+        ExamState.socket.emit('saveAnswers', {
+            studentExamId: ExamState.studentExamId,
+            seq: seq,
+            answers: delta
+        });
+        return;
+    }
+    await postAnswers(seq, delta, final);
+}
+
+// HTTP fallback for saveAnswers
+async function postAnswers(seq, delta, keepalive = false) {
     try {
-        // UPDATED endpoint to match backend '/api/save-answer' expecting JSON { student_exam_id, answers }
         const response = await fetch('/api/save-answer', {
             method: 'POST',
+            keepalive: keepalive,
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 student_exam_id: ExamState.studentExamId,
-                answers: ExamState.answers
+                seq: seq,
+                answers: delta
             })
         });
-        if (response.ok) console.log("✅ Answers saved successfully");
-        else console.warn("⚠️ Answer save failed:", response.status);
+        if (response.ok) {
+            acknowledgeAnswers(delta);
+            console.log("✅ Answers saved successfully");
+        } else {
+            console.warn("⚠️ Answer save failed:", response.status);
+        }
     } catch (error) {
         console.error("❌ Answer save error:", error);
     }
 }
 
+// Drop saved answers from the pending set unless they changed again meanwhile
+function acknowledgeAnswers(delta) {
+    Object.entries(delta).forEach(([questionId, answer]) => {
+        if (ExamState.pendingAnswers[questionId] === answer) delete ExamState.pendingAnswers[questionId];
+    });
+}
+
 // TAB SWITCH DETECTION (debounced)
 function setupVisibilityMonitoring() {
     console.log("👀 Setting up tab switch monitoring...");
@@ -778,7 +840,7 @@ function setupEventListeners() {
 
 function submitExam(autoSubmit = false) {
     console.log("📤 Submitting exam...", autoSubmit ? "(auto)" : "(manual)");
-    saveAnswers();
+    saveAnswers(true);
     if (ExamState.timerInterval) clearInterval(ExamState.timerInterval);
     if (ExamState.proctoringInterval) clearInterval(ExamState.proctoringInterval);
 
@@ -139,6 +139,8 @@ class Exam(db.Model):
     # NEW: AI Proctoring settings
     enable_proctoring = db.Column(db.Boolean, default=True)
     max_violations = db.Column(db.Integer, default=6)  # Auto-submit threshold
+    proctor_backend = db.Column(db.String(20), default='haar')  # Socket.IO face detector: haar / openvino
+    questions_version = db.Column(db.Integer, default=0)  # bumped on every question change (answer-key cache)
 
     questions = db.relationship(
         'Question', backref='exam', lazy=True,
@@ -272,6 +274,12 @@ class StudentAnswer(db.Model):
     is_correct = db.Column(db.Boolean, default=False)
     points_earned = db.Column(db.Float, default=0.0)
     answered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    client_seq = db.Column(db.Integer, default=0)  # autosave sequence number of the last write
+
+    # one row per question per attempt (autosave upserts on it)
+    __table_args__ = (
+        db.UniqueConstraint('student_exam_id', 'question_id', name='uq_student_answer_question'),
+    )
 
     def __repr__(self):
         return f"<StudentAnswer {self.id}>"
@@ -306,6 +314,11 @@ class ExamCalibration(db.Model):
     baseline_yaw = db.Column(db.Float, nullable=False)
     baseline_pitch = db.Column(db.Float, nullable=False)
     baseline_roll = db.Column(db.Float, nullable=False)
+    # face position / size baseline (pixels), restored on session rehydration
+    baseline_cx = db.Column(db.Float, nullable=True)
+    baseline_cy = db.Column(db.Float, nullable=True)
+    baseline_w = db.Column(db.Float, nullable=True)
+    baseline_h = db.Column(db.Float, nullable=True)
     calibrated_at = db.Column(db.DateTime, default=datetime.utcnow)
     calibration_frames = db.Column(db.Integer, default=0)  # Number of frames used for calibration
     
@@ -344,19 +357,20 @@ class ExamViolation(db.Model):
 # 🌀 SHUFFLE ASSIGNMENT HELPER
 # ===========================
 def assign_shuffle(student_exam):
-    """Create a persistent shuffled question & option order for a new StudentExam."""
+    """Create a persistent shuffled question & option order for a new StudentExam.
+    Question ids come from the answer key, checked against the database version."""
     import random, json
 
-    exam = student_exam.exam
-    questions = Question.query.filter_by(exam_id=exam.id).all()
-    random.shuffle(questions)
-    q_order = [q.id for q in questions]
+    from backend.services.answer_key import get_answer_key
+
+    q_order = list(get_answer_key(student_exam.exam_id).question_ids)
+    random.shuffle(q_order)
     option_mapping = {}
 
-    for q in questions:
+    for qid in q_order:
         options = ['A', 'B', 'C', 'D']
         random.shuffle(options)
-        option_mapping[str(q.id)] = options
+        option_mapping[str(qid)] = options
 
     student_exam.question_order = json.dumps(q_order)
     student_exam.option_mapping = json.dumps(option_mapping)
@@ -18,7 +18,8 @@ def add_column_if_missing(table, column, ddl):
     cols = [c[1] for c in cur.fetchall()]
     if column not in cols:
         print(f"➕ Adding column {column} to {table}")
-        cur.execute(f"ALTER TABLE {table} ADD COLUMN {ddl};")
+        # ddl is the type / default only; the column name must come first
+        cur.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {ddl};')
     else:
         print(f"✔ Column {column} already exists in {table}")
 
@@ -28,6 +29,37 @@ add_column_if_missing("exam", "allow_all_students", "BOOLEAN DEFAULT 1")
 # Add allowed_students (stores JSON list)
 add_column_if_missing("exam", "allowed_students", "TEXT DEFAULT NULL")
 
+# Face detector backend for Socket.IO proctoring (haar / openvino)
+add_column_if_missing("exam", "proctor_backend", "VARCHAR(20) DEFAULT 'haar'")
+
+# Answer-key cache version, bumped on every question change
+add_column_if_missing("exam", "questions_version", "INTEGER DEFAULT 0")
+
+# Calibration face position / size baseline (proctor session rehydration)
+for column in ("baseline_cx", "baseline_cy", "baseline_w", "baseline_h"):
+    add_column_if_missing("exam_calibration", column, "FLOAT DEFAULT NULL")
+
+# Autosave sequence number per answer
+add_column_if_missing("student_answer", "client_seq", "INTEGER DEFAULT 0")
+
+# ------------------------
+# One answer row per question per attempt (autosave upserts on it).
+# Duplicates keep the oldest row: the one the old save_answer kept updating
+# ------------------------
+cur.execute("""
+    DELETE FROM student_answer
+    WHERE id NOT IN (
+        SELECT MIN(id) FROM student_answer GROUP BY student_exam_id, question_id
+    );
+""")
+if cur.rowcount:
+    print(f"🧹 Removed {cur.rowcount} duplicate student_answer rows")
+cur.execute(
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_student_answer_question "
+    "ON student_answer (student_exam_id, question_id);"
+)
+print("✔ Unique index uq_student_answer_question present")
+
 conn.commit()
 conn.close()
 
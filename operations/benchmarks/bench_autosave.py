@@ -0,0 +1,295 @@
+"""
+Answer autosave benchmark
+-------------------------
+Compares three autosave protocols for --students concurrent students:
+
+  legacy       the old exam.js: the full answers dict POSTed to
+               /api/save-answer every 10 s and after every change
+  http         delta saves (changed answers + seq) over /api/save-answer
+  socket       the same deltas as 'saveAnswers' on the proctoring Socket.IO
+               connection, coalesced and written by the batched writer
+
+Request rates: the exam.js schedule (1.2 s debounce, 900 ms throttle,
+10 s timer) is replayed for --exam-minutes with --changes answer changes
+per student; reports HTTP requests/s, socket messages/s, answers sent per
+save and DB commits/s (one per HTTP save, one per writer flush window).
+
+Live (--saves > 0): the app on a throwaway SQLite database; one thread
+per student sends --saves delta saves --interval-ms apart through the
+Flask test client (http) and a flask_socketio test client (socket).
+Reports saves/s, p50 / p95 / p99 latency to the acknowledgement (HTTP
+response / 'answersSaved' event), failed saves and DB commits, then checks
+every student's last answers are stored.
+
+Usage:
+    python operations/benchmarks/bench_autosave.py --students 500
+    python operations/benchmarks/bench_autosave.py --students 500 --saves 0 --exam-minutes 90 --changes 60
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from bench_common import PROJECT_ROOT, percentile  # noqa: F401  (puts the project on sys.path)
+
+DEBOUNCE_S = 1.2
+THROTTLE_S = 0.9
+TIMER_S = 10.0
+# exam.js ANSWER_ACK_TIMEOUT_MS
+ACK_TIMEOUT_S = 5.0
+
+
+# ---------- request-rate model ----------
+
+def client_saves(rng, duration, changes, questions, delta):
+    """(time, answers sent) of every save one exam.js client makes"""
+    events = sorted((rng.uniform(0, duration), rng.randrange(questions)) for _ in range(changes))
+    answers, pending = {}, set()
+    saves, last_save = [], -THROTTLE_S
+    timer = rng.uniform(0, TIMER_S)
+    debounce_at = None
+    i = 0
+    while True:
+        next_change = events[i][0] if i < len(events) else None
+        candidates = [t for t in (next_change, debounce_at, timer) if t is not None and t <= duration]
+        if not candidates:
+            return saves
+        now = min(candidates)
+        if now == next_change:
+            answers[events[i][1]] = True
+            pending.add(events[i][1])
+            debounce_at = now + DEBOUNCE_S
+            i += 1
+            continue
+        if now == debounce_at:
+            debounce_at = None
+        else:
+            timer += TIMER_S
+        if now - last_save < THROTTLE_S:
+            continue
+        sent = len(pending) if delta else len(answers)
+        if sent:
+            saves.append((now, sent))
+            last_save = now
+            pending.clear()
+
+
+def request_rates(args):
+    rng = random.Random(args.seed)
+    duration = args.exam_minutes * 60.0
+    flush = args.flush_ms / 1000.0
+    rows = []
+    for protocol in ("legacy", "http", "socket"):
+        saves = []
+        for _ in range(args.students):
+            saves.extend(client_saves(rng, duration, args.changes, args.questions, delta=protocol != "legacy"))
+        answers = sum(n for _, n in saves)
+        commits = len({int(t / flush) for t, _ in saves}) if protocol == "socket" else len(saves)
+        rows.append({
+            "protocol": protocol,
+            "http_per_s": 0.0 if protocol == "socket" else len(saves) / duration,
+            "socket_per_s": len(saves) / duration if protocol == "socket" else 0.0,
+            "answers_per_save": answers / len(saves) if saves else 0.0,
+            "commits_per_s": commits / duration,
+        })
+
+    print(f"\nRequest rates - {args.students} students, {args.exam_minutes} min, "
+          f"{args.changes} answer changes each")
+    print(f"{'protocol':<9} {'HTTP req/s':>11} {'socket msg/s':>13} {'answers/save':>13} {'DB commits/s':>13}")
+    for r in rows:
+        print(f"{r['protocol']:<9} {r['http_per_s']:>11.2f} {r['socket_per_s']:>13.2f} "
+              f"{r['answers_per_save']:>13.2f} {r['commits_per_s']:>13.2f}")
+
+
+# ---------- live ----------
+
+class LiveApp:
+    """The app on a throwaway SQLite database, one attempt per student"""
+
+    def __init__(self, args):
+        tmp = tempfile.mkdtemp(prefix="bench_autosave_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["PROCTOR_STATE_PATH"] = os.path.join(tmp, "proctor_state.db")
+        os.environ["PROCTOR_WARMUP"] = "off"
+        os.environ["EXAM_CLOSEOUT_SECONDS"] = "0"
+        os.environ["ANSWER_WRITER_FLUSH_MS"] = str(args.flush_ms)
+
+        from sqlalchemy import event
+
+        from app import create_app
+        from backend.database import db
+
+        self.app = create_app()
+        # test clients carry no login fingerprint; strong protection would log them out
+        self.app.login_manager.session_protection = None
+        self.commits = 0
+        with self.app.app_context():
+            event.listen(db.engine, "commit", self._count_commit)
+        self.attempts, self.question_ids = self._seed(args.students, args.questions)
+
+    def _count_commit(self, conn):
+        self.commits += 1
+
+    def _seed(self, students, questions):
+        from backend.database import db
+        from models import Exam, Question, StudentExam, User
+
+        with self.app.app_context():
+            faculty = User(username="bench_faculty", email="faculty@bench.local", password_hash="-", role="faculty")
+            db.session.add(faculty)
+            db.session.flush()
+            exam = Exam(title="Autosave benchmark", duration_minutes=600, creator_id=faculty.id)
+            db.session.add(exam)
+            db.session.flush()
+            db.session.add_all(
+                Question(exam_id=exam.id, question_text=f"q{i}", option_a="a", option_b="b",
+                         option_c="c", option_d="d", correct_answer="A", order_number=i)
+                for i in range(questions)
+            )
+            attempts = []
+            for i in range(students):
+                student = User(username=f"bench_student_{i}", email=f"student{i}@bench.local",
+                               password_hash="-", role="student")
+                db.session.add(student)
+                db.session.flush()
+                attempt = StudentExam(student_id=student.id, exam_id=exam.id)
+                db.session.add(attempt)
+                db.session.flush()
+                attempts.append((student.id, attempt.id))
+            db.session.commit()
+            question_ids = [q.id for q in Question.query.filter_by(exam_id=exam.id)]
+        return attempts, question_ids
+
+    def reset_answers(self):
+        from backend.database import db
+        from models import StudentAnswer
+
+        with self.app.app_context():
+            StudentAnswer.query.delete()
+            db.session.commit()
+
+    def stored(self):
+        from models import StudentAnswer
+
+        with self.app.app_context():
+            return {(a.student_exam_id, a.question_id): a.selected_answer for a in StudentAnswer.query}
+
+    def client(self, student_id, protocol):
+        http = self.app.test_client()
+        with http.session_transaction() as sess:
+            sess["_user_id"] = str(student_id)
+            sess["_fresh"] = True
+        if protocol == "http":
+            def send(attempt_id, seq, delta):
+                r = http.post("/api/save-answer", json={"student_exam_id": attempt_id, "seq": seq, "answers": delta})
+                return r.status_code == 200
+            return send, lambda: None
+
+        from backend.routes import socketio
+
+        sock = socketio.test_client(self.app, flask_test_client=http)
+
+        def send(attempt_id, seq, delta):
+            """emit, then wait for the matching 'answersSaved' like exam.js"""
+            sock.emit("saveAnswers", {"studentExamId": attempt_id, "seq": seq, "answers": delta})
+            deadline = time.perf_counter() + ACK_TIMEOUT_S
+            while time.perf_counter() < deadline:
+                for message in sock.get_received():
+                    if message["name"] == "answersSaved" and message["args"][0].get("seq") == seq:
+                        return message["args"][0].get("status") == "saved"
+                time.sleep(0.002)
+            return False
+        return send, sock.disconnect
+
+
+def run_live(live, protocol, args):
+    live.reset_answers()
+    latencies, failures, expected = [], [0], {}
+    lock = threading.Lock()
+    interval = args.interval_ms / 1000.0
+    ready = threading.Barrier(len(live.attempts) + 1)
+
+    def worker(i, student_id, attempt_id):
+        rng = random.Random(args.seed * 7919 + i)
+        send, close = live.client(student_id, protocol)
+        local, failed, last = [], 0, {}
+        ready.wait()
+        start = time.perf_counter() + interval * i / len(live.attempts)
+        try:
+            for n in range(args.saves):
+                delay = start + n * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                delta = {str(rng.choice(live.question_ids)): rng.choice("ABCD") for _ in range(rng.randint(1, 2))}
+                t0 = time.perf_counter()
+                if send(attempt_id, n + 1, delta):
+                    local.append((time.perf_counter() - t0) * 1000.0)
+                    last.update(delta)
+                else:
+                    failed += 1
+        finally:
+            close()
+        with lock:
+            latencies.extend(local)
+            failures[0] += failed
+            expected.update({(attempt_id, int(q)): v for q, v in last.items()})
+
+    threads = [threading.Thread(target=worker, args=(i, sid, aid), daemon=True)
+               for i, (sid, aid) in enumerate(live.attempts)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    commits_before = live.commits
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    stored = live.stored()
+    lost = sum(1 for key, value in expected.items() if stored.get(key) != value)
+    return {
+        "protocol": protocol,
+        "saves": len(latencies),
+        "failed": failures[0],
+        "saves_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "commits": live.commits - commits_before,
+        "lost": lost,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--exam-minutes", type=float, default=60)
+    parser.add_argument("--changes", type=int, default=60, help="answer changes per student (rate model)")
+    parser.add_argument("--saves", type=int, default=5, help="saves per student in the live run (0 skips it)")
+    parser.add_argument("--interval-ms", type=float, default=2000)
+    parser.add_argument("--flush-ms", type=float, default=200, help="answer writer flush interval")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    request_rates(args)
+    if args.saves <= 0:
+        return
+
+    live = LiveApp(args)
+    rows = [run_live(live, protocol, args) for protocol in ("http", "socket")]
+    print(f"\nLive - {args.students} concurrent students, {args.saves} saves each, {args.interval_ms:.0f} ms apart")
+    print(f"{'protocol':<9} {'saves':>6} {'failed':>7} {'saves/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'commits':>8} {'lost':>5}")
+    for r in rows:
+        print(f"{r['protocol']:<9} {r['saves']:>6} {r['failed']:>7} {r['saves_per_s']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['commits']:>8} {r['lost']:>5}")
+    sys.exit(1 if any(r["lost"] for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Batched inference benchmark
+---------------------------
+Pushes frames from N simulated sessions (one thread each) through
+OpenVINOProctor.check_frame, once with per-frame inference and once via
+the shared BatchInferenceScheduler, and reports frames/sec per core.
+
+Usage:
+    python operations/benchmarks/bench_batching.py --sessions 32 --frames 20 --batch 8 --wait-ms 15
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from bench_common import percentile, synthetic_frame
+
+from backend.services.proctor_vision.batch_engine import BatchInferenceScheduler
+from backend.services.proctor_vision.model_registry import get_model_registry
+from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+
+def calibrated_proctor(models, scheduler, i):
+    state = ProctorState(session_id=f"bench-{i}")
+    state.baseline_yaw = state.baseline_pitch = state.baseline_roll = 0.0
+    return OpenVINOProctor(state, models=models, engine=scheduler)
+
+
+def run(models, scheduler, sessions, frames_per_session):
+    frame = synthetic_frame()
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(i):
+        proctor = calibrated_proctor(models, scheduler, i)
+        local = []
+        for _ in range(frames_per_session):
+            start = time.perf_counter()
+            proctor.check_frame(frame)
+            local.append((time.perf_counter() - start) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    total = sessions * frames_per_session
+    return {
+        "fps": total / wall,
+        "fps_per_core": total / cpu if cpu else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=20, help="frames per session")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=15.0)
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--device", default="CPU")
+    args = parser.parse_args()
+
+    models = get_model_registry().get(args.model_dir, args.device)
+    scheduler = BatchInferenceScheduler(models, max_batch_size=args.batch, max_wait_ms=args.wait_ms)
+
+    print("\n" + "=" * 70)
+    print(f"🧪 BATCHED INFERENCE BENCHMARK ({args.sessions} sessions, {os.cpu_count()} CPUs)")
+    print("=" * 70)
+    for name, sched in (("per-frame", None), ("batched", scheduler)):
+        r = run(models, sched, args.sessions, args.frames)
+        print(f"{name:10s} {r['fps']:8.1f} fps  {r['fps_per_core']:8.1f} fps/core  "
+              f"p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms")
+    print(f"avg batch size: {scheduler.avg_batch_size:.2f}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
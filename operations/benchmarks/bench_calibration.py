@@ -0,0 +1,94 @@
+"""
+Calibration latency benchmark
+-----------------------------
+Times OpenVINOProctor.calibrate on a 20+ frame upload, comparing the
+previous one-frame-at-a-time loop with the concurrent calibrate()
+(calibration thread pool, or the shared batch / async engine with
+--engine). Fails (exit 1) when the concurrent p95 misses --target-ms.
+
+Frames come from a directory of images (sorted by name); without one a
+synthetic sequence is used.
+
+Usage:
+    python operations/benchmarks/bench_calibration.py --runs 30 --frames 24 --target-ms 800
+    python operations/benchmarks/bench_calibration.py --frames-dir recordings/calibration --engine batch
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from bench_common import Timer, percentile, synthetic_frame
+
+from backend.services.proctor_vision.model_registry import default_model_config, get_model_registry
+from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+
+def load_frames(frames_dir, count):
+    if frames_dir:
+        frames = [cv2.imread(p, cv2.IMREAD_COLOR) for p in sorted(glob.glob(os.path.join(frames_dir, "*")))]
+        frames = [f for f in frames if f is not None]
+    else:
+        frames = [np.roll(synthetic_frame(seed=i), i % 5, axis=1) for i in range(count)]
+    return frames[:count]
+
+
+def serial_calibrate(proctor, frames):
+    """The loop calibrate() used before: detection then head pose, one frame at a time."""
+    used = 0
+    for frame in frames:
+        analysis = proctor._analyze_full(frame)
+        if analysis.pose is not None:
+            used += 1
+            if used >= proctor.min_calibration_frames:
+                break
+    return used
+
+
+def time_runs(fn, runs):
+    samples = []
+    fn()  # warm-up: per-thread infer requests, engine threads
+    for _ in range(runs):
+        with Timer() as t:
+            fn()
+        samples.append(t.ms)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames-dir")
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--engine", choices=["sync", "batch", "async"], default="sync")
+    parser.add_argument("--target-ms", type=float, default=1000.0, help="p95 target for calibrate()")
+    args = parser.parse_args()
+
+    os.environ["PROCTOR_INFERENCE_MODE"] = args.engine
+    from backend.services.proctor_vision.engines import get_inference_engine
+
+    frames = load_frames(args.frames_dir, args.frames)
+    model_dir, device = default_model_config()
+    models = get_model_registry().get(model_dir, device)
+    proctor = OpenVINOProctor(ProctorState(session_id="bench"), models=models, engine=get_inference_engine(models))
+
+    serial = time_runs(lambda: serial_calibrate(proctor, frames), args.runs)
+    concurrent = time_runs(lambda: proctor.calibrate(frames), args.runs)
+
+    used = sum(1 for entry in proctor.calibration_report if entry["used"])
+    print(f"frames: {len(frames)}  used: {used}  engine: {args.engine}")
+    for label, samples in (("serial", serial), ("calibrate", concurrent)):
+        print(f"  {label:<10} p50 {percentile(samples, 50):8.1f} ms   p95 {percentile(samples, 95):8.1f} ms")
+
+    p95 = percentile(concurrent, 95)
+    verdict = "PASS" if p95 <= args.target_ms else "FAIL"
+    print(f"p95 target {args.target_ms:.0f} ms: {verdict}")
+    sys.exit(0 if verdict == "PASS" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Exam close-out benchmark
+------------------------
+Builds --exams exams of --questions questions, each with --students
+in_progress attempts: most past their deadline, the rest still running.
+Closes the overdue ones with the close-out job (backend/services/
+exam_closeout.py) and, on a fresh copy, with the per-attempt path
+take_exam's auto-submit uses (grade_attempt + one commit per attempt).
+
+Checks: every overdue attempt is submitted with the same score as the
+per-attempt path, running attempts are untouched, and a second run
+grades nothing. Exits 1 on any mismatch.
+
+Runs on an in-memory SQLite database.
+
+Usage:
+    python operations/benchmarks/bench_closeout.py --exams 4 --students 500 --questions 50
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+
+from flask import Flask
+
+from backend.database import db
+from backend.services.answer_key import invalidate_answer_key
+from backend.services.exam_closeout import ExamCloseout
+from backend.services.grading import SUBMIT_POLICY, apply_grades, grade_attempt
+from models import Exam, Question, StudentAnswer, StudentExam, User
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def build(rng, exams, students, questions, overdue_rate=0.8):
+    """Returns {exam_id: set of overdue attempt ids}"""
+    now = datetime.utcnow()
+    faculty = User(username="faculty", email="f@x", password_hash="-", role="faculty")
+    db.session.add(faculty)
+    db.session.flush()
+    db.session.bulk_insert_mappings(User, [
+        dict(username=f"s{s}", email=f"s{s}@x", password_hash="-", role="student") for s in range(students)
+    ])
+    student_ids = [u.id for u in User.query.filter_by(role="student")]
+
+    overdue = {}
+    for e in range(exams):
+        exam = Exam(title=f"closeout {e}", duration_minutes=60, creator_id=faculty.id, passing_score=40.0)
+        db.session.add(exam)
+        db.session.flush()
+        db.session.bulk_insert_mappings(Question, [
+            dict(exam_id=exam.id, question_text=f"q{i}", option_a="a", option_b="b", option_c="c",
+                 option_d="d", correct_answer=rng.choice("ABCD"), points=rng.choice((None, 1.0, 2.0)))
+            for i in range(questions)
+        ])
+        question_ids = [q.id for q in Question.query.filter_by(exam_id=exam.id)]
+        db.session.bulk_insert_mappings(StudentExam, [
+            dict(student_id=sid, exam_id=exam.id, status="in_progress",
+                 started_at=now - timedelta(minutes=rng.choice((90, 75, 65, 30))))
+            for sid in student_ids
+        ])
+        attempts = StudentExam.query.filter_by(exam_id=exam.id).all()
+        db.session.bulk_insert_mappings(StudentAnswer, [
+            dict(student_exam_id=a.id, question_id=qid, selected_answer=rng.choice("ABCD"),
+                 is_correct=False, points_earned=0.0, answered_at=now)
+            for a in attempts for qid in question_ids if rng.random() < 0.7
+        ])
+        overdue[exam.id] = {a.id for a in attempts if a.started_at < now - timedelta(minutes=61)}
+        invalidate_answer_key(exam.id)
+    db.session.commit()
+    return overdue
+
+
+def state():
+    return {
+        se.id: (se.status, se.score, se.total_points, se.passed)
+        for se in StudentExam.query.order_by(StudentExam.id)
+    }
+
+
+def run(app, args, use_job):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        overdue = build(random.Random(args.seed), args.exams, args.students, args.questions)
+        before = state()
+
+    start = time.perf_counter()
+    if use_job:
+        job = ExamCloseout(app, interval=0, grace=30, chunk_size=args.chunk)
+        report = job.run_once()
+        again = job.run_once()["attempts"]
+    else:
+        report, again = None, 0
+        with app.app_context():
+            now = datetime.utcnow()
+            for ids in overdue.values():
+                for se_id in sorted(ids):
+                    se = db.session.get(StudentExam, se_id)
+                    grade = grade_attempt(se, SUBMIT_POLICY)
+                    apply_grades({se_id: grade}, status="submitted", submitted_at=now)
+                    db.session.commit()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        return overdue, before, state(), report, again, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exams", type=int, default=4)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--chunk", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = make_app()
+    overdue, before, loop_state, _, _, loop_s = run(app, args, use_job=False)
+    _, _, job_state, report, again, job_s = run(app, args, use_job=True)
+
+    all_overdue = set().union(*overdue.values())
+    problems = 0
+    for se_id, row in job_state.items():
+        if se_id in all_overdue:
+            problems += row[0] != "submitted" or row != loop_state[se_id]
+        else:
+            problems += row != before[se_id]
+    problems += again != 0
+
+    print(f"overdue attempts      {len(all_overdue)} of {len(job_state)}")
+    print(f"job report            {report}")
+    print(f"per-attempt path      {loop_s * 1000:9.1f} ms")
+    print(f"close-out job         {job_s * 1000:9.1f} ms")
+    print(f"second run graded     {again}")
+    print(f"mismatches: {problems}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Shared helpers for the proctoring benchmark scripts.
+
+Run every benchmark from the project root, e.g.:
+    python operations/benchmarks/bench_model_pool.py --sessions 10 100 500
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def rss_mb():
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    return float(np.percentile(np.asarray(values, dtype=np.float64), pct))
+
+
+def synthetic_frame(width=640, height=480, seed=0):
+    """A webcam-sized BGR frame with a bright face-like blob in the middle."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    cy, cx = height // 2, width // 2
+    ry, rx = height // 4, width // 6
+    yy, xx = np.ogrid[:height, :width]
+    mask = ((yy - cy) / ry) ** 2 + ((xx - cx) / rx) ** 2 <= 1.0
+    frame[mask] = (150, 170, 200)
+    return frame
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.start) * 1000.0
+        return False
@@ -0,0 +1,218 @@
+"""
+Grading engine check and benchmark
+----------------------------------
+Property check: random exams (NULL / zero / fractional points, mixed-case
+keys, missing, blank, "0", padded and lower-case answers) are graded with
+the per-row loops submit_exam and calculate_student_score used before and
+with the set-based engine (backend/services/grading.py). Every
+StudentAnswer (selected_answer, is_correct, points_earned) and every
+attempt total must match. Exits 1 on any mismatch.
+
+Benchmark: grades --students attempts of a --questions question exam
+with the loop (one attempt at a time) and with one grade_attempts call.
+
+Runs on an in-memory SQLite database.
+
+Usage:
+    python operations/benchmarks/bench_grading.py --cases 300
+    python operations/benchmarks/bench_grading.py --cases 0 --students 500 --questions 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bench_common import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+
+from flask import Flask
+
+from backend.database import db
+from backend.services.answer_key import invalidate_answer_key
+from backend.services.grading import SCORE_POLICY, SUBMIT_POLICY, grade_attempts
+from models import Exam, Question, StudentAnswer, StudentExam, User
+
+ANSWER_CHOICES = (None, "", "0", "A", "B", "C", "D", "a", "b", " c", "d ", "  ")
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+# ---------- the loops that shipped before the engine ----------
+
+def reference_submit(student_exam):
+    exam = student_exam.exam
+    questions = Question.query.filter_by(exam_id=exam.id).all()
+    existing = {a.question_id: a for a in StudentAnswer.query.filter_by(student_exam_id=student_exam.id).all()}
+    total_points, score = 0.0, 0.0
+    for q in questions:
+        total_points += (q.points or 0.0)
+        ans = existing.get(q.id)
+        if ans is None:
+            ans = StudentAnswer(student_exam_id=student_exam.id, question_id=q.id, selected_answer="0",
+                                is_correct=False, points_earned=0.0, answered_at=datetime.utcnow())
+            db.session.add(ans)
+        else:
+            sel = (ans.selected_answer or "").strip()
+            if sel == "" or sel == "0":
+                ans.selected_answer = "0"
+                ans.is_correct = False
+                ans.points_earned = 0.0
+            elif q.correct_answer and sel.upper() == q.correct_answer.upper():
+                ans.is_correct = True
+                ans.points_earned = q.points or 0.0
+            else:
+                ans.is_correct = False
+                ans.points_earned = 0.0
+            if not ans.answered_at:
+                ans.answered_at = datetime.utcnow()
+        score += (ans.points_earned or 0.0)
+    percentage = (score / total_points * 100.0) if total_points > 0 else 0.0
+    return score, total_points, percentage, percentage >= (exam.passing_score or 0.0)
+
+
+def reference_score(student_exam):
+    exam = student_exam.exam
+    questions = Question.query.filter_by(exam_id=exam.id).all()
+    answers = {a.question_id: a for a in StudentAnswer.query.filter_by(student_exam_id=student_exam.id).all()}
+    earned, total = 0, 0
+    for question in questions:
+        points = question.points or 1.0
+        total += points
+        ans = answers.get(question.id)
+        if ans and ans.selected_answer:
+            if ans.selected_answer.upper() == question.correct_answer.upper():
+                earned += points
+                ans.is_correct = True
+                ans.points_earned = points
+            else:
+                ans.is_correct = False
+                ans.points_earned = 0
+        elif not ans:
+            db.session.add(StudentAnswer(student_exam_id=student_exam.id, question_id=question.id,
+                                         selected_answer="0", is_correct=False, points_earned=0))
+        else:
+            ans.is_correct = False
+            ans.points_earned = 0
+    percentage = (earned / total * 100) if total > 0 else 0
+    return earned, total, percentage, percentage >= (exam.passing_score or 50.0)
+
+
+REFERENCES = {"submit": (reference_submit, SUBMIT_POLICY), "score": (reference_score, SCORE_POLICY)}
+
+
+# ---------- fixtures ----------
+
+def build_exam(rng, questions, students, answer_rate=0.8):
+    """One exam with random keys / points and `students` partially answered attempts"""
+    faculty = User(username="faculty", email="f@x", password_hash="-", role="faculty")
+    db.session.add(faculty)
+    db.session.flush()
+    exam = Exam(title="grading", duration_minutes=60, creator_id=faculty.id,
+                passing_score=rng.choice((None, 0.0, 40.0, 60.0)))
+    db.session.add(exam)
+    db.session.flush()
+
+    question_ids = []
+    for i in range(questions):
+        q = Question(exam_id=exam.id, question_text=f"q{i}", option_a="a", option_b="b", option_c="c",
+                     option_d="d", correct_answer=rng.choice("ABCDabcd"),
+                     points=rng.choice((None, 0.0, 1.0, 2.0, 2.5)))
+        db.session.add(q)
+        db.session.flush()
+        question_ids.append(q.id)
+
+    started = datetime.utcnow() - timedelta(minutes=30)
+    rows = []
+    for s in range(students):
+        student = User(username=f"s{s}", email=f"s{s}@x", password_hash="-", role="student")
+        db.session.add(student)
+        db.session.flush()
+        attempt = StudentExam(student_id=student.id, exam_id=exam.id, started_at=started)
+        db.session.add(attempt)
+        db.session.flush()
+        for qid in question_ids:
+            if rng.random() < answer_rate:
+                rows.append(dict(student_exam_id=attempt.id, question_id=qid,
+                                 selected_answer=rng.choice(ANSWER_CHOICES),
+                                 is_correct=rng.random() < 0.1, points_earned=0.0,
+                                 answered_at=rng.choice((None, started))))
+    db.session.bulk_insert_mappings(StudentAnswer, rows)
+    db.session.commit()
+    return exam
+
+
+def answer_state():
+    return {
+        (a.student_exam_id, a.question_id): (a.selected_answer, bool(a.is_correct), float(a.points_earned or 0.0))
+        for a in StudentAnswer.query.all()
+    }
+
+
+def run_case(app, seed, kind, questions, students, engine):
+    reference, policy = REFERENCES[kind]
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        exam = build_exam(random.Random(seed), questions, students)
+        invalidate_answer_key(exam.id)   # drop_all reuses exam ids without a Question event
+        attempts = StudentExam.query.filter_by(exam_id=exam.id).all()
+
+        start = time.perf_counter()
+        if engine:
+            grades = grade_attempts(exam, [a.id for a in attempts], policy)
+            totals = {i: (g.score, g.total_points, g.percentage, g.passed) for i, g in grades.items()}
+        else:
+            totals = {a.id: reference(a) for a in attempts}
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+
+        db.session.expire_all()
+        return answer_state(), totals, elapsed
+
+
+def same_totals(a, b):
+    return all(abs(x - y) < 1e-9 for x, y in zip(a[:3], b[:3])) and a[3] == b[3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=200, help="random exams per policy")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = make_app()
+    mismatches = 0
+    for kind in REFERENCES:
+        for case in range(args.cases):
+            seed = args.seed * 100003 + case
+            rng = random.Random(seed)
+            shape = (rng.randint(0, 12), rng.randint(1, 4))
+            expected = run_case(app, seed, kind, *shape, engine=False)
+            got = run_case(app, seed, kind, *shape, engine=True)
+            if expected[0] != got[0] or any(not same_totals(expected[1][k], got[1][k]) for k in expected[1]):
+                mismatches += 1
+                print(f"mismatch: policy {kind}, seed {seed}, {shape[0]} questions x {shape[1]} attempts")
+        print(f"{kind:<7} {args.cases} random exams checked")
+
+    if args.students and args.questions:
+        for kind in REFERENCES:
+            _, _, loop_s = run_case(app, args.seed, kind, args.questions, args.students, engine=False)
+            _, _, engine_s = run_case(app, args.seed, kind, args.questions, args.students, engine=True)
+            print(f"{kind:<7} {args.students} attempts x {args.questions} questions   "
+                  f"loop {loop_s * 1000:9.1f} ms   engine {engine_s * 1000:9.1f} ms")
+
+    print(f"mismatches: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
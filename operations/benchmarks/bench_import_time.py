@@ -0,0 +1,102 @@
+"""
+Import-time budget check
+------------------------
+Runs `python -X importtime` on a fresh interpreter that builds the app
+(`from app import create_app; create_app()`), then reports the total
+import time, the slowest top-level packages and whether any of the heavy
+dependencies (OpenCV, NumPy, pandas, OpenVINO, reportlab, fpdf) were
+imported at startup. Those belong behind the vision / import-export /
+PDF facades and should only load on first use.
+
+Fails (exit 1) when the total exceeds --budget-ms or a heavy package is
+imported during create_app().
+
+Usage:
+    python operations/benchmarks/bench_import_time.py --budget-ms 1500
+    python operations/benchmarks/bench_import_time.py --top 25 --allow numpy
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from bench_common import PROJECT_ROOT
+
+HEAVY_PACKAGES = ("cv2", "numpy", "pandas", "openvino", "reportlab", "fpdf")
+
+BOOT_SNIPPET = "from app import create_app; create_app()"
+
+
+def run_importtime(snippet):
+    """stderr lines of `python -X importtime -c snippet` run from the project root"""
+    # no start-up warm-up: its thread would import OpenVINO mid-measurement
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", PROCTOR_WARMUP="off")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"create_app() failed (exit {proc.returncode})")
+    return proc.stderr.splitlines()
+
+
+def parse_importtime(lines):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def summarize(rows):
+    """Total import time and self time summed per top-level package (ms)"""
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    per_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        per_package[name.split(".", 1)[0]] += self_us
+    packages = sorted(((p, us / 1000.0) for p, us in per_package.items()), key=lambda x: -x[1])
+    return total_us / 1000.0, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="total import-time budget")
+    parser.add_argument("--top", type=int, default=15, help="slowest packages to list")
+    parser.add_argument("--allow", nargs="*", default=[], help="heavy packages allowed at startup")
+    args = parser.parse_args()
+
+    rows = parse_importtime(run_importtime(BOOT_SNIPPET))
+    total_ms, packages = summarize(rows)
+    imported = {name.split(".", 1)[0] for name, _, _, _ in rows}
+    heavy = [p for p in HEAVY_PACKAGES if p in imported and p not in args.allow]
+
+    print(f"modules imported: {len(rows)}  total import time: {total_ms:.1f} ms")
+    print("slowest packages (self time, ms):")
+    for name, ms in packages[:args.top]:
+        marker = "  <- heavy" if name in HEAVY_PACKAGES else ""
+        print(f"  {name:<28} {ms:8.1f}{marker}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"total {total_ms:.0f} ms over budget {args.budget_ms:.0f} ms")
+    if heavy:
+        failures.append("heavy packages imported by create_app(): " + ", ".join(heavy))
+
+    print(f"budget {args.budget_ms:.0f} ms: {'FAIL' if failures else 'PASS'}")
+    for failure in failures:
+        print(f"  - {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
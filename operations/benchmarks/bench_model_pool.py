@@ -0,0 +1,78 @@
+"""
+Model pool benchmark
+--------------------
+Compares one compiled model pair per session (old get_proctor_instance
+behaviour) against the shared ModelRegistry, reporting RSS growth and
+first-frame latency (model compile, if any, + proctor set-up + first
+detection) at several concurrent session counts.
+
+Usage:
+    python operations/benchmarks/bench_model_pool.py --sessions 10 100 500
+    python operations/benchmarks/bench_model_pool.py --model-dir models --legacy-limit 50
+"""
+
+import argparse
+import gc
+
+from bench_common import Timer, percentile, rss_mb, synthetic_frame
+
+from backend.services.proctor_vision.model_registry import ModelRegistry
+from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+
+def run(sessions, model_dir, device, shared):
+    gc.collect()
+    base_rss = rss_mb()
+    frame = synthetic_frame()
+    registry = ModelRegistry()
+    proctors = []
+    first_frame_ms = []
+
+    for i in range(sessions):
+        state = ProctorState(session_id=f"bench-{i}")
+        with Timer() as t:
+            # legacy mode: a private registry per session == a private Core +
+            # compile, timed as part of the session's first frame
+            models = (registry if shared else ModelRegistry()).get(model_dir, device)
+            proctor = OpenVINOProctor(state, models=models)
+            proctor._detect_faces(frame)
+        first_frame_ms.append(t.ms)
+        proctors.append(proctor)
+
+    return {
+        "sessions": sessions,
+        "rss_delta_mb": rss_mb() - base_rss,
+        "first_frame_p50_ms": percentile(first_frame_ms, 50),
+        "first_frame_p95_ms": percentile(first_frame_ms, 95),
+        "first_frame_max_ms": max(first_frame_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--device", default="CPU")
+    parser.add_argument("--legacy-limit", type=int, default=100,
+                        help="skip per-session compilation above this many sessions")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 78)
+    print("🧪 MODEL POOL BENCHMARK")
+    print("=" * 78)
+    print(f"{'mode':8s} {'sessions':>8s} {'RSS Δ MB':>10s} {'p50 ms':>10s} {'p95 ms':>10s} {'max ms':>10s}")
+
+    for n in args.sessions:
+        for shared in (False, True):
+            if not shared and n > args.legacy_limit:
+                print(f"{'legacy':8s} {n:8d} {'skipped (--legacy-limit)':>43s}")
+                continue
+            r = run(n, args.model_dir, args.device, shared)
+            mode = "shared" if shared else "legacy"
+            print(f"{mode:8s} {n:8d} {r['rss_delta_mb']:10.1f} {r['first_frame_p50_ms']:10.1f} "
+                  f"{r['first_frame_p95_ms']:10.1f} {r['first_frame_max_ms']:10.1f}")
+    print("=" * 78 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Motion-gate benchmark
+---------------------
+Replays a recorded frame set through two calibrated OpenVINOProctor
+sessions side by side: one runs full analysis on every frame, the other
+sits behind a MotionGate. Reports CPU time saved, the fraction of frames
+skipped and how often the gated verdict matches the full one.
+
+Frames come from a directory of images (sorted by name) or a video file;
+without either a synthetic sequence with still and moving stretches is used.
+
+Usage:
+    python operations/benchmarks/bench_motion_gate.py --frames-dir recordings/session1
+    python operations/benchmarks/bench_motion_gate.py --video recordings/session1.mp4 --threshold 6 --max-skip 4
+"""
+
+import argparse
+import glob
+import os
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from bench_common import synthetic_frame
+
+from backend.services.proctor_vision.model_registry import default_model_config, get_model_registry
+from backend.services.proctor_vision.motion_gate import MotionGate
+from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+
+def load_frames(frames_dir=None, video=None, limit=0):
+    frames = []
+    if frames_dir:
+        for path in sorted(glob.glob(os.path.join(frames_dir, "*"))):
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is not None:
+                frames.append(img)
+    elif video:
+        cap = cv2.VideoCapture(video)
+        while True:
+            ok, img = cap.read()
+            if not ok:
+                break
+            frames.append(img)
+        cap.release()
+    else:
+        base = synthetic_frame()
+        for i in range(120):
+            # still for 20 frames, then a 10-frame stretch of movement
+            shift = 0 if (i // 10) % 3 != 2 else (i % 10) * 6
+            frames.append(np.roll(base, shift, axis=1))
+    return frames[:limit] if limit else frames
+
+
+def calibrated(models, frames, gate=None, session="bench"):
+    proctor = OpenVINOProctor(ProctorState(session_id=session), models=models, gate=gate)
+    proctor.min_calibration_frames = 1
+    ok, msg = proctor.calibrate(frames[:5])
+    if not ok:
+        # no detectable face in the recording: start from a neutral baseline
+        proctor.state.baseline_yaw = proctor.state.baseline_pitch = proctor.state.baseline_roll = 0.0
+    return proctor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames-dir")
+    parser.add_argument("--video")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=6.0)
+    parser.add_argument("--max-skip", type=int, default=4)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames_dir, args.video, args.limit)
+    if not frames:
+        raise SystemExit("no frames loaded")
+
+    model_dir, device = default_model_config()
+    models = get_model_registry().get(model_dir, device)
+
+    gate = MotionGate(motion_threshold=args.threshold, max_skip=args.max_skip)
+    full = calibrated(models, frames, session="full")
+    gated = calibrated(models, frames, gate=gate, session="gated")
+
+    full_cpu = gated_cpu = 0.0
+    agree = 0
+    mismatches = Counter()
+
+    # interleave the two sessions so their time-based rules see the same clock
+    for frame in frames:
+        start = time.process_time()
+        full_status, _ = full.check_frame(frame)
+        full_cpu += time.process_time() - start
+
+        start = time.process_time()
+        gated_status, _ = gated.check_frame(frame)
+        gated_cpu += time.process_time() - start
+
+        if full_status == gated_status:
+            agree += 1
+        else:
+            mismatches[(full_status, gated_status)] += 1
+
+    n = len(frames)
+    stats = gate.stats()
+    print(f"frames            : {n}")
+    print(f"skipped           : {stats['skipped']} ({stats['skip_ratio'] * 100:.1f}%)")
+    print(f"cpu full / gated  : {full_cpu * 1000:.1f} ms / {gated_cpu * 1000:.1f} ms")
+    saved = (1.0 - gated_cpu / full_cpu) * 100.0 if full_cpu else 0.0
+    print(f"cpu saved         : {saved:.1f}%")
+    print(f"verdict agreement : {agree / n * 100:.1f}%")
+    for (expected, got), count in mismatches.most_common():
+        print(f"  full={expected:<9} gated={got:<9} x{count}")
+
+
+if __name__ == "__main__":
+    main()
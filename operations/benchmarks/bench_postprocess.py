@@ -0,0 +1,101 @@
+"""
+Detection post-processing benchmark
+-----------------------------------
+Checks the vectorized boxes_array_from_detections against the previous
+row-by-row loop and times both.
+
+Detection tensors are loaded from .npy files ([1, 1, N, 7] or [N, 7]
+face-detection-adas-0001 outputs saved with np.save); without --tensors
+a set of random SSD outputs is generated. Exits non-zero on any mismatch.
+
+Usage:
+    python operations/benchmarks/bench_postprocess.py --tensors recordings/detections/*.npy
+    python operations/benchmarks/bench_postprocess.py --random 500 --iterations 200
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from bench_common import percentile
+
+from backend.services.proctor_vision.openvino_vision import boxes_array_from_detections, largest_box
+
+
+def reference_boxes(detections, w, h, conf_thresh=0.6):
+    """Row-by-row implementation that shipped before the vectorized one."""
+    boxes = []
+    for det in detections:
+        conf = float(det[2])
+        if conf < conf_thresh:
+            continue
+        xmin = max(0, int(det[3] * w))
+        ymin = max(0, int(det[4] * h))
+        xmax = min(w - 1, int(det[5] * w))
+        ymax = min(h - 1, int(det[6] * h))
+        if (xmax - xmin) * (ymax - ymin) < 0.02 * w * h:
+            continue
+        boxes.append((xmin, ymin, xmax, ymax))
+    return boxes
+
+
+def random_detections(rng, n=200):
+    det = np.zeros((n, 7), dtype=np.float32)
+    det[:, 1] = 1
+    det[:, 2] = rng.random(n, dtype=np.float32)
+    xy = rng.uniform(-0.1, 0.9, size=(n, 2)).astype(np.float32)
+    wh = rng.uniform(0.0, 0.6, size=(n, 2)).astype(np.float32)
+    det[:, 3:5] = xy
+    det[:, 5:7] = xy + wh
+    return det
+
+
+def load_tensors(paths, count, seed):
+    if paths:
+        return [np.load(p).reshape(-1, 7).astype(np.float32) for p in paths]
+    rng = np.random.default_rng(seed)
+    return [random_detections(rng) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tensors", nargs="*")
+    parser.add_argument("--random", type=int, default=200, help="random tensors when --tensors is not given")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--size", nargs=2, type=int, default=[640, 480], metavar=("W", "H"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    w, h = args.size
+    tensors = load_tensors(args.tensors, args.random, args.seed)
+
+    mismatches = 0
+    for i, det in enumerate(tensors):
+        expected = reference_boxes(det, w, h)
+        got_array = boxes_array_from_detections(det, w, h)
+        got = [tuple(b) for b in got_array.tolist()]
+        if got != expected or largest_box(got_array) != largest_box(expected):
+            mismatches += 1
+            print(f"mismatch in tensor {i}: expected {expected}, got {got}")
+
+    timings = {}
+    for label, fn in (("loop", reference_boxes), ("vectorized", boxes_array_from_detections)):
+        samples = []
+        for _ in range(args.iterations):
+            for det in tensors:
+                start = time.perf_counter()
+                fn(det, w, h)
+                samples.append((time.perf_counter() - start) * 1e6)
+        timings[label] = samples
+
+    print(f"tensors: {len(tensors)}  rows each: {tensors[0].shape[0]}  mismatches: {mismatches}")
+    for label, samples in timings.items():
+        print(f"  {label:<10} p50 {percentile(samples, 50):8.1f} us   p95 {percentile(samples, 95):8.1f} us")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
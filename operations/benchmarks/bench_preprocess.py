@@ -0,0 +1,96 @@
+"""
+Preprocessing microbenchmark
+----------------------------
+Per-frame cost of preparing face-detection and head-pose inputs:
+
+  python    - cv2.resize + transpose(2,0,1) + astype(float32) per frame/face
+  embedded  - u8 NHWC buffer passed as-is, resize/layout/f32 in the model
+
+Reports the Python-side preprocessing time alone and, unless --prep-only
+is given, end-to-end detect + head pose latency with both model variants.
+
+Usage:
+    python operations/benchmarks/bench_preprocess.py --iterations 500 --width 640 --height 480
+    python operations/benchmarks/bench_preprocess.py --prep-only
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from bench_common import percentile, synthetic_frame
+
+FD_SIZE = (672, 384)   # face-detection-adas-0001 (W, H)
+HP_SIZE = (60, 60)     # head-pose-estimation-adas-0001
+
+
+def python_prep(frame, face):
+    fd = cv2.resize(frame, FD_SIZE).transpose(2, 0, 1)[np.newaxis].astype(np.float32)
+    hp = cv2.resize(face, HP_SIZE).transpose(2, 0, 1)[np.newaxis].astype(np.float32)
+    return fd, hp
+
+
+def embedded_prep(frame, face):
+    return np.ascontiguousarray(frame)[np.newaxis], np.ascontiguousarray(face)[np.newaxis]
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def report(label, samples):
+    print(f"  {label:<10} p50 {percentile(samples, 50):8.3f} ms   "
+          f"p95 {percentile(samples, 95):8.3f} ms   mean {np.mean(samples):8.3f} ms")
+
+
+def end_to_end(frame, iterations, model_dir, device):
+    from backend.services.proctor_vision.model_registry import ModelRegistry
+    from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+    registry = ModelRegistry()
+    print("\nend-to-end (_detect_faces + _estimate_head_pose):")
+    for label, embedded in (("python", False), ("embedded", True)):
+        models = registry.get(model_dir, device, embedded_preprocess=embedded)
+        proctor = OpenVINOProctor(ProctorState(session_id=f"bench-{label}"), models=models)
+
+        def one():
+            boxes = proctor._detect_faces(frame)
+            if boxes:
+                x1, y1, x2, y2 = boxes[0]
+                proctor._estimate_head_pose(frame[y1:y2, x1:x2])
+
+        time_calls(one, 10)  # warm-up
+        report(label, time_calls(one, iterations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--device", default="CPU")
+    parser.add_argument("--prep-only", action="store_true")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    h, w = frame.shape[:2]
+    face = frame[h // 4: 3 * h // 4, w // 3: 2 * w // 3]   # strided view, like a real crop
+
+    print(f"preprocessing only ({w}x{h} frame, {face.shape[1]}x{face.shape[0]} face):")
+    report("python", time_calls(lambda: python_prep(frame, face), args.iterations))
+    report("embedded", time_calls(lambda: embedded_prep(frame, face), args.iterations))
+
+    if not args.prep_only:
+        end_to_end(frame, args.iterations, args.model_dir, args.device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Stage-timing overhead benchmark
+-------------------------------
+Times OpenVINOProctor.check_frame wrapped in begin_frame / end_frame with
+per-stage timing disabled and enabled, and measures the fixed cost of the
+instrumentation calls on their own. Fails (exit 1) when the disabled
+layer costs more than --max-overhead percent of a frame.
+
+Usage:
+    python operations/benchmarks/bench_stage_timing.py --frames 300
+"""
+
+import argparse
+import sys
+import time
+
+from bench_common import percentile, synthetic_frame
+
+from backend.services import metrics
+from backend.services.proctor_vision.model_registry import default_model_config, get_model_registry
+from backend.services.proctor_vision.openvino_vision import OpenVINOProctor, ProctorState
+
+# begin_frame + the marks a check_frame hits on the full-detection path + end_frame
+CALLS_PER_FRAME = ("motion_gate", "decode", "resize", "face_detection", "postprocess", "head_pose", "evaluate")
+
+
+def timed_frames(proctor, frames, enabled):
+    metrics.stage_sampling.enabled = enabled
+    samples = []
+    for frame in frames:
+        start = time.perf_counter()
+        metrics.begin_frame(1)
+        proctor.check_frame(frame)
+        metrics.end_frame()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def instrumentation_cost_us(enabled, iterations=20000):
+    metrics.stage_sampling.enabled = enabled
+    start = time.perf_counter()
+    for _ in range(iterations):
+        metrics.begin_frame(1)
+        for stage in CALLS_PER_FRAME:
+            metrics.mark(stage)
+        metrics.end_frame()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--max-overhead", type=float, default=1.0, help="percent of a frame, timing disabled")
+    args = parser.parse_args()
+
+    model_dir, device = default_model_config()
+    models = get_model_registry().get(model_dir, device)
+    state = ProctorState(session_id="bench")
+    state.baseline_yaw = state.baseline_pitch = state.baseline_roll = 0.0
+    proctor = OpenVINOProctor(state, models=models)
+    frames = [synthetic_frame(seed=i) for i in range(args.frames)]
+
+    timed_frames(proctor, frames[:10], enabled=False)   # warm-up
+    off = timed_frames(proctor, frames, enabled=False)
+    on = timed_frames(proctor, frames, enabled=True)
+    cost_off = instrumentation_cost_us(enabled=False)
+    cost_on = instrumentation_cost_us(enabled=True)
+
+    frame_us = percentile(off, 50) * 1000.0
+    overhead_off = cost_off / frame_us * 100.0 if frame_us else 0.0
+    overhead_on = cost_on / frame_us * 100.0 if frame_us else 0.0
+
+    print(f"check_frame p50  disabled {percentile(off, 50):7.2f} ms   enabled {percentile(on, 50):7.2f} ms")
+    print(f"instrumentation  disabled {cost_off:7.2f} us ({overhead_off:.3f}%)   "
+          f"enabled {cost_on:7.2f} us ({overhead_on:.3f}%)")
+    verdict = "PASS" if overhead_off <= args.max_overhead else "FAIL"
+    print(f"disabled overhead target {args.max_overhead:.1f}%: {verdict}")
+    sys.exit(0 if verdict == "PASS" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""
+Proctoring throughput benchmark
+-------------------------------
+How many concurrently proctored students can one box carry? Replays a
+corpus of JPEG frames from N simulated sessions (one thread each, one
+frame every --interval-ms) through one of three entry points:
+
+  vision        decode + OpenVINOProctor.check_frame (shared models / engine)
+  frame_binary  the work handle_frame_binary does for a frame: decode,
+                detect with the exam's backend, counters, violations, DB
+  socketio      the full Socket.IO stack: a flask_socketio test client per
+                session emits 'frameBinary' and waits for 'proctor_result'
+                (FramePipeline workers, CV processes, emits)
+
+For every (target, sessions, interval) it reports frames/sec, p50 / p95 /
+p99 latency, frames that timed out, CPU (this process plus CV worker
+processes, % of one core) and peak RSS, and writes everything to a JSON
+file so runs can be diffed across commits (--compare).
+
+The corpus is a directory of JPEGs (searched recursively, sorted by path);
+without --corpus a synthetic one is generated and can be kept with
+--save-corpus. The frame_binary and socketio targets build the app on a
+throwaway SQLite database with one exam and one attempt per session.
+
+Usage:
+    python operations/benchmarks/bench_throughput.py --target vision --sessions 1 10 50 --interval-ms 200 500
+    python operations/benchmarks/bench_throughput.py --target socketio --corpus recordings/frames --sessions 20 --backend openvino
+    python operations/benchmarks/bench_throughput.py --save-corpus recordings/synthetic --corpus-size 60
+    python operations/benchmarks/bench_throughput.py --target vision --compare results/throughput-abc1234.json
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from bench_common import PROJECT_ROOT, percentile, rss_mb, synthetic_frame
+
+TARGETS = ("vision", "frame_binary", "socketio")
+ENV_KNOBS = (
+    "PROCTOR_INFERENCE_MODE", "PROCTOR_CV_WORKERS", "PROCTOR_IO_WORKERS", "PROCTOR_MOTION_THRESHOLD",
+    "PROCTOR_DETECT_EVERY", "OPENVINO_EMBED_PREPROCESS", "FRAME_REDUCED_DECODE", "OPENVINO_DEVICE",
+)
+
+
+# ---------- corpus ----------
+
+def synthetic_corpus(count, width=640, height=480, quality=85):
+    """JPEG-encoded synthetic webcam frames with a little motion between them"""
+    corpus = []
+    for i in range(count):
+        frame = np.roll(synthetic_frame(width, height, seed=i), (i % 7) - 3, axis=1)
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            corpus.append((f"synthetic_{i:04d}.jpg", buf.tobytes()))
+    return corpus
+
+
+def load_corpus(corpus_dir):
+    paths = sorted(
+        p for p in glob.glob(os.path.join(corpus_dir, "**", "*"), recursive=True)
+        if p.lower().endswith((".jpg", ".jpeg"))
+    )
+    corpus = []
+    for path in paths:
+        with open(path, "rb") as f:
+            corpus.append((os.path.relpath(path, corpus_dir), f.read()))
+    return corpus
+
+
+def save_corpus(corpus, corpus_dir):
+    os.makedirs(corpus_dir, exist_ok=True)
+    for name, data in corpus:
+        with open(os.path.join(corpus_dir, name), "wb") as f:
+            f.write(data)
+
+
+# ---------- resource sampling ----------
+
+def _proc_cpu_seconds(pid):
+    """utime + stime of a process from /proc (Linux), 0.0 elsewhere"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _proc_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+class ResourceSampler:
+    """CPU seconds and peak RSS of this process plus its CV worker processes"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _children():
+        return [p.pid for p in multiprocessing.active_children()]
+
+    def cpu_seconds(self):
+        return time.process_time() + sum(_proc_cpu_seconds(pid) for pid in self._children())
+
+    def _sample(self):
+        rss = rss_mb() + sum(_proc_rss_mb(pid) for pid in self._children())
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self.cpu_start = self.cpu_seconds()
+        self.wall_start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = self.cpu_seconds() - self.cpu_start
+        return False
+
+
+# ---------- targets ----------
+
+class VisionTarget:
+    """decode_frame + OpenVINOProctor.check_frame, one calibrated proctor per session"""
+
+    name = "vision"
+
+    def __init__(self, args):
+        from backend.services.vision import new_proctor
+        from backend.services.proctor_vision.openvino_vision import ProctorState
+        from backend.utils.frame_io import decode_frame
+
+        self.decode_frame = decode_frame
+        self.proctors = {}
+        for i in range(max(args.sessions)):
+            state = ProctorState(session_id=f"bench-{i}")
+            state.baseline_yaw = state.baseline_pitch = state.baseline_roll = 0.0
+            self.proctors[i] = new_proctor(state)
+
+    def session(self, i):
+        proctor = self.proctors[i]
+        target_size = (proctor.fd_w, proctor.fd_h)
+
+        def send(frame_bytes):
+            frame, _ = self.decode_frame(frame_bytes, target_size)
+            if frame is None:
+                return False
+            proctor.check_frame(frame)
+            return True
+
+        return send, lambda: None
+
+
+class AppTarget:
+    """Flask app on a throwaway SQLite database, one StudentExam per session"""
+
+    def __init__(self, args):
+        self.tmp = tempfile.mkdtemp(prefix="bench_throughput_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(self.tmp, 'bench.db')}"
+        os.environ["PROCTOR_STATE_PATH"] = os.path.join(self.tmp, "proctor_state.db")
+        os.environ.setdefault("PROCTOR_WARMUP", "blocking")
+
+        from app import create_app
+        self.app = create_app()
+        self.session_ids = self._seed(max(args.sessions), args.backend)
+
+    def _seed(self, sessions, backend):
+        from werkzeug.security import generate_password_hash
+        from backend.database import db
+        from models import Exam, StudentExam, User
+
+        with self.app.app_context():
+            password = generate_password_hash("bench")
+            faculty = User(username="bench_faculty", email="faculty@bench.local",
+                           password_hash=password, role="faculty")
+            db.session.add(faculty)
+            db.session.flush()
+            exam = Exam(title="Throughput benchmark", duration_minutes=600, creator_id=faculty.id,
+                        proctor_backend=backend, max_violations=10 ** 6)
+            db.session.add(exam)
+            db.session.flush()
+
+            ids = []
+            for i in range(sessions):
+                student = User(username=f"bench_student_{i}", email=f"student{i}@bench.local",
+                               password_hash=password, role="student")
+                db.session.add(student)
+                db.session.flush()
+                attempt = StudentExam(student_id=student.id, exam_id=exam.id, calibration_completed=True)
+                db.session.add(attempt)
+                db.session.flush()
+                ids.append(attempt.id)
+            db.session.commit()
+        return ids
+
+
+class FrameBinaryTarget(AppTarget):
+    """process_proctor_frame inline, as handle_frame_binary does without a pool"""
+
+    name = "frame_binary"
+
+    def session(self, i):
+        from backend.routes import process_proctor_frame
+        from backend.services.proctor_pipeline import FrameJob, detect_and_record
+
+        key = self.session_ids[i]
+
+        def send(frame_bytes):
+            with self.app.app_context():
+                try:
+                    process_proctor_frame(FrameJob(key=key, frame_bytes=frame_bytes), detect_and_record)
+                except Exception:
+                    return False
+            return True
+
+        return send, lambda: None
+
+
+class SocketIOTarget(AppTarget):
+    """flask_socketio test client: emit 'frameBinary', wait for 'proctor_result'"""
+
+    name = "socketio"
+
+    def __init__(self, args):
+        super().__init__(args)
+        self.timeout = args.timeout
+
+    def session(self, i):
+        from backend.routes import socketio
+
+        client = socketio.test_client(self.app)
+        key = self.session_ids[i]
+
+        def send(frame_bytes):
+            client.emit("frameBinary", {"studentExamId": key, "frame": frame_bytes})
+            deadline = time.perf_counter() + self.timeout
+            while time.perf_counter() < deadline:
+                if any(msg["name"] == "proctor_result" for msg in client.get_received()):
+                    return True
+                time.sleep(0.002)
+            return False
+
+        return send, client.disconnect
+
+
+TARGET_CLASSES = {"vision": VisionTarget, "frame_binary": FrameBinaryTarget, "socketio": SocketIOTarget}
+
+
+# ---------- load generator ----------
+
+def run_load(target, corpus, sessions, interval_ms, frames_per_session):
+    """N session threads, each sending a frame every interval_ms (closed loop)"""
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    interval = interval_ms / 1000.0
+    ready = threading.Barrier(sessions + 1)
+
+    def worker(i):
+        send, close = target.session(i)
+        local, failed = [], 0
+        ready.wait()
+        # spread session phases across one interval instead of lockstep
+        start = time.perf_counter() + interval * i / sessions
+        try:
+            for n in range(frames_per_session):
+                delay = start + n * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                _, frame_bytes = corpus[(i + n) % len(corpus)]
+                t0 = time.perf_counter()
+                ok = send(frame_bytes)
+                if ok:
+                    local.append((time.perf_counter() - t0) * 1000.0)
+                else:
+                    failed += 1
+        finally:
+            close()
+        with lock:
+            latencies.extend(local)
+            failures[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    with ResourceSampler() as usage:
+        for t in threads:
+            t.join()
+
+    done = len(latencies)
+    return {
+        "target": target.name,
+        "sessions": sessions,
+        "interval_ms": interval_ms,
+        "frames": done,
+        "failed": failures[0],
+        "elapsed_s": round(usage.wall, 3),
+        "fps": round(done / usage.wall, 2) if usage.wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "cpu_percent": round(100.0 * usage.cpu / usage.wall, 1) if usage.wall else 0.0,
+        "rss_peak_mb": round(usage.peak_rss, 1),
+    }
+
+
+# ---------- results ----------
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return r["target"], r["sessions"], r["interval_ms"]
+
+    old = {key(r): r for r in baseline.get("results", [])}
+    print(f"\ncompared with {baseline.get('commit', '?')} ({baseline_path}):")
+    for r in results:
+        prev = old.get(key(r))
+        if prev is None:
+            continue
+        deltas = "  ".join(
+            f"{k} {prev[k]:.1f}->{r[k]:.1f} ({(r[k] - prev[k]) / prev[k] * 100:+.0f}%)" if prev[k] else f"{k} {r[k]:.1f}"
+            for k in ("fps", "p95_ms", "cpu_percent")
+        )
+        print(f"  {r['target']:<12} {r['sessions']:>4} x {r['interval_ms']:>5.0f} ms  {deltas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=TARGETS, default="vision")
+    parser.add_argument("--corpus", help="directory of JPEG frames")
+    parser.add_argument("--corpus-size", type=int, default=40, help="synthetic frames when --corpus is not given")
+    parser.add_argument("--save-corpus", help="write the synthetic corpus here and exit")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--interval-ms", nargs="+", type=float, default=[200.0])
+    parser.add_argument("--frames", type=int, default=50, help="frames per session")
+    parser.add_argument("--backend", choices=["haar", "openvino"], default="haar",
+                        help="exam detector backend (frame_binary / socketio)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="socketio: seconds to wait for a result")
+    parser.add_argument("--out", help="results JSON (default results/throughput-<commit>-<target>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.corpus_size)
+    if args.save_corpus:
+        save_corpus(corpus, args.save_corpus)
+        print(f"💾 {len(corpus)} frames written to {args.save_corpus}")
+        return
+    if not corpus:
+        sys.exit(f"no JPEG frames found in {args.corpus}")
+
+    target = TARGET_CLASSES[args.target](args)
+    send, close = target.session(0)    # warm-up: models, engine threads, first DB rows
+    send(corpus[0][1])
+    close()
+
+    commit = git_commit()
+    print("\n" + "=" * 70)
+    print(f"🧪 PROCTORING THROUGHPUT ({args.target}, {len(corpus)} frames, {os.cpu_count()} CPUs, {commit})")
+    print("=" * 70)
+    results = []
+    for interval_ms in args.interval_ms:
+        for sessions in args.sessions:
+            r = run_load(target, corpus, sessions, interval_ms, args.frames)
+            results.append(r)
+            print(f"{sessions:>5} sessions @ {interval_ms:>5.0f} ms  {r['fps']:8.1f} fps  "
+                  f"p50 {r['p50_ms']:7.1f}  p95 {r['p95_ms']:7.1f}  p99 {r['p99_ms']:7.1f} ms  "
+                  f"cpu {r['cpu_percent']:6.1f}%  rss {r['rss_peak_mb']:7.1f} MB  failed {r['failed']}")
+    print("=" * 70)
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "host": {"cpus": os.cpu_count(), "platform": platform.platform(), "python": platform.python_version()},
+        "corpus": {"source": args.corpus or "synthetic", "frames": len(corpus)},
+        "target": args.target,
+        "frames_per_session": args.frames,
+        "env": {k: os.getenv(k) for k in ENV_KNOBS if os.getenv(k) is not None},
+        "results": results,
+    }
+    out = args.out or os.path.join(os.path.dirname(__file__), "results", f"throughput-{commit}-{args.target}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"💾 Results written to {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
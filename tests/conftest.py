@@ -0,0 +1,18 @@
+"""
+Test-suite setup: puts the project root and operations/benchmarks on
+sys.path. The benchmark scripts hold the reference implementations the
+tests compare against.
+
+Run from the project root:
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BENCHMARKS = os.path.join(PROJECT_ROOT, "operations", "benchmarks")
+
+for path in (BENCHMARKS, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,53 @@
+"""
+Answer-key cache consumers must see questions committed by another
+worker (another Session here, with this worker's stale key kept in the
+cache): autosave validation and shuffle assignment.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from bench_grading import make_app, run_case  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.services.answer_autosave import clean_answers  # noqa: E402
+from backend.services.answer_key import answer_keys, get_answer_key  # noqa: E402
+from models import Exam, Question, StudentExam, assign_shuffle  # noqa: E402
+
+
+@pytest.fixture
+def exam_with_new_question():
+    """(app, exam id, id of a question this worker's cached key lacks)"""
+    app = make_app()
+    run_case(app, 0, "score", 3, 1, engine=True)
+    with app.app_context():
+        exam_id = Exam.query.one().id
+        stale = get_answer_key(exam_id)
+        with Session(db.engine) as other, other.begin():
+            question = Question(exam_id=exam_id, question_text="new", option_a="a", option_b="b",
+                                correct_answer="B")
+            other.add(question)
+            other.flush()
+            new_id = question.id
+        answer_keys._keys[exam_id] = stale
+    return app, exam_id, new_id
+
+
+def test_autosave_accepts_new_question(exam_with_new_question):
+    app, exam_id, new_id = exam_with_new_question
+    with app.app_context():
+        assert clean_answers(exam_id, {str(new_id): " B "}) == {new_id: "B"}
+
+
+def test_shuffle_includes_new_question(exam_with_new_question):
+    app, exam_id, new_id = exam_with_new_question
+    with app.app_context():
+        attempt = StudentExam.query.first()
+        assign_shuffle(attempt)
+        order = json.loads(attempt.question_order)
+        assert new_id in order
+        assert sorted(order) == sorted(q.id for q in Question.query.filter_by(exam_id=exam_id))
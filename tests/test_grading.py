@@ -0,0 +1,93 @@
+"""
+Property tests for the set-based grading engine: random exams (NULL /
+zero / fractional points, mixed-case keys, missing, blank, "0", padded
+and lower-case answers) graded by the engine and by the per-row loops
+submit_exam and calculate_student_score used before must leave every
+StudentAnswer and every attempt total identical.
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+
+from bench_grading import REFERENCES, make_app, run_case, same_totals  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from backend.database import db  # noqa: E402
+from backend.services.answer_key import answer_keys, get_answer_key  # noqa: E402
+from backend.services.grading import grade_attempts  # noqa: E402
+from models import Exam, Question, StudentAnswer, StudentExam  # noqa: E402
+
+SEEDS = range(40)
+
+
+@pytest.fixture(scope="module")
+def app():
+    return make_app()
+
+
+def random_shape(seed):
+    """(questions, attempts) of a case, as bench_grading draws them"""
+    rng = random.Random(seed)
+    return rng.randint(0, 12), rng.randint(1, 4)
+
+
+@pytest.mark.parametrize("kind", sorted(REFERENCES))
+@pytest.mark.parametrize("seed", SEEDS)
+def test_engine_matches_reference_loops(app, kind, seed):
+    questions, attempts = random_shape(seed)
+    expected_answers, expected_totals, _ = run_case(app, seed, kind, questions, attempts, engine=False)
+    answers, totals, _ = run_case(app, seed, kind, questions, attempts, engine=True)
+
+    assert answers == expected_answers
+    assert totals.keys() == expected_totals.keys()
+    for se_id, expected in expected_totals.items():
+        assert same_totals(expected, totals[se_id]), (se_id, expected, totals[se_id])
+
+
+@pytest.mark.parametrize("kind", sorted(REFERENCES))
+@pytest.mark.parametrize("seed", SEEDS[:10])
+def test_regrading_changes_nothing(app, kind, seed):
+    _, policy = REFERENCES[kind]
+    run_case(app, seed, kind, *random_shape(seed), engine=True)
+    with app.app_context():
+        exam = Exam.query.one()
+        ids = [se.id for se in StudentExam.query]
+        before = [(a.id, a.selected_answer, a.is_correct, a.points_earned) for a in StudentAnswer.query]
+        grades = grade_attempts(exam, ids, policy)
+        db.session.commit()
+        db.session.expire_all()
+        after = [(a.id, a.selected_answer, a.is_correct, a.points_earned) for a in StudentAnswer.query]
+
+    assert after == before
+    for grade in grades.values():
+        assert 0.0 <= grade.score <= grade.total_points + 1e-9
+        assert 0 <= grade.correct_count <= grade.total_questions
+
+
+def test_unknown_attempts_are_ignored(app):
+    run_case(app, 0, "score", 3, 2, engine=True)
+    with app.app_context():
+        exam = Exam.query.one()
+        assert grade_attempts(exam, [10 ** 6]) == {}
+
+
+def test_question_added_by_another_worker_is_graded(app):
+    run_case(app, 0, "score", 3, 2, engine=True)
+    with app.app_context():
+        exam = Exam.query.one()
+        stale = get_answer_key(exam.id)
+        # another worker's session: its commit bumps the version in the DB
+        with Session(db.engine) as other, other.begin():
+            other.add(Question(exam_id=exam.id, question_text="new", option_a="a", option_b="b",
+                               correct_answer="A", points=5.0))
+        answer_keys._keys[exam.id] = stale   # this worker never saw the commit
+
+        key = get_answer_key(exam.id)
+        assert key.version > stale.version and len(key) == len(stale) + 1
+        grades = grade_attempts(exam, None, REFERENCES["score"][1])
+        for grade in grades.values():
+            assert grade.total_questions == len(key)
+            assert grade.total_points == key.total_points(1.0)
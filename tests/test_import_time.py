@@ -0,0 +1,41 @@
+"""
+Start-up import budget: create_app() in a fresh interpreter must stay
+within IMPORT_BUDGET_MS of import time and must not import the heavy
+vision / import-export / PDF packages (they load on first use).
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("flask_socketio")   # create_app needs the full web stack
+
+from bench_import_time import (  # noqa: E402
+    BOOT_SNIPPET,
+    HEAVY_PACKAGES,
+    parse_importtime,
+    run_importtime,
+    summarize,
+)
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1500))
+
+
+@pytest.fixture(scope="module")
+def boot_imports():
+    # a throwaway database and no background jobs for the child interpreter
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", "sqlite://")
+        mp.setenv("EXAM_CLOSEOUT_SECONDS", "0")
+        return parse_importtime(run_importtime(BOOT_SNIPPET))
+
+
+def test_create_app_skips_heavy_packages(boot_imports):
+    imported = {name.split(".", 1)[0] for name, _, _, _ in boot_imports}
+    assert [p for p in HEAVY_PACKAGES if p in imported] == []
+
+
+def test_create_app_import_budget(boot_imports):
+    total_ms, packages = summarize(boot_imports)
+    slowest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in packages[:5])
+    assert total_ms <= BUDGET_MS, f"{total_ms:.0f} ms over {BUDGET_MS:.0f} ms ({slowest})"
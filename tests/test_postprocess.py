@@ -0,0 +1,73 @@
+"""
+Vectorized SSD post-processing against the row-by-row loop it replaced.
+
+tests/data/ssd_detections.npz holds [1, 1, N, 7] face-detection outputs:
+six random sets (bench_postprocess.random_detections) and hand-written
+edge rows (threshold confidence, clamping, zero / 2% area, inverted
+boxes, area ties, padding rows) plus an empty tensor.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("openvino")   # openvino_vision loads the model registry
+
+from backend.services.proctor_vision.openvino_vision import (  # noqa: E402
+    boxes_array_from_detections,
+    boxes_from_detections,
+    largest_box,
+)
+from bench_postprocess import reference_boxes  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(__file__), "data", "ssd_detections.npz")
+
+FRAME_SIZES = [(640, 480), (1280, 720), (300, 300), (97, 61)]
+THRESHOLDS = [0.5, 0.6, 0.9]
+
+
+def saved_tensors():
+    with np.load(DATA) as data:
+        return {name: data[name] for name in data.files}
+
+
+TENSORS = saved_tensors()
+
+
+def reference_largest(boxes):
+    """largest_box as it was for lists of tuples"""
+    if not boxes:
+        return None
+    return max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+
+
+@pytest.mark.parametrize("name", sorted(TENSORS))
+@pytest.mark.parametrize("size", FRAME_SIZES)
+@pytest.mark.parametrize("conf_thresh", THRESHOLDS)
+def test_boxes_match_reference(name, size, conf_thresh):
+    w, h = size
+    det = TENSORS[name][0, 0]
+    expected = reference_boxes(det, w, h, conf_thresh)
+
+    boxes = boxes_array_from_detections(det, w, h, conf_thresh)
+    assert boxes.shape == (len(expected), 4)
+    assert [tuple(b) for b in boxes.tolist()] == expected
+    assert boxes_from_detections(det, w, h, conf_thresh) == expected
+
+
+@pytest.mark.parametrize("name", sorted(TENSORS))
+@pytest.mark.parametrize("size", FRAME_SIZES)
+def test_largest_box_matches_reference(name, size):
+    w, h = size
+    det = TENSORS[name][0, 0]
+    expected = reference_largest(reference_boxes(det, w, h))
+
+    assert largest_box(boxes_array_from_detections(det, w, h)) == expected
+    assert largest_box(boxes_from_detections(det, w, h)) == expected
+
+
+def test_edge_cases_are_exercised():
+    """The hand-written rows keep some boxes and drop others"""
+    kept = reference_boxes(TENSORS["edge_cases"][0, 0], 640, 480)
+    assert 0 < len(kept) < TENSORS["edge_cases"].shape[2]
@@ -0,0 +1,53 @@
+"""
+rehydrate_state rebuilds a proctoring session from the main database:
+only verdicts logged since the latest calibration count.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("cv2")
+
+from bench_grading import make_app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.services.proctor_state_store import rehydrate_state  # noqa: E402
+from models import Exam, ExamCalibration, ExamViolation, StudentExam, User  # noqa: E402
+
+
+@pytest.fixture
+def attempt():
+    """(app, student_exam_id) calibrated now, with verdicts before and after"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        faculty = User(username="f", email="f@x", password_hash="-", role="faculty")
+        student = User(username="s", email="s@x", password_hash="-", role="student")
+        db.session.add_all([faculty, student])
+        db.session.flush()
+        exam = Exam(title="e", duration_minutes=60, creator_id=faculty.id)
+        db.session.add(exam)
+        db.session.flush()
+        se = StudentExam(student_id=student.id, exam_id=exam.id)
+        db.session.add(se)
+        db.session.flush()
+
+        now = datetime.utcnow()
+        db.session.add(ExamCalibration(student_exam_id=se.id, baseline_yaw=1.0, baseline_pitch=2.0,
+                                       baseline_roll=3.0, baseline_cx=320.0, calibrated_at=now))
+        for kind, minutes in (("WARNING", -10), ("WARNING", -5), ("TERMINATE", -4),
+                              ("WARNING", 1), ("LOOKING_AWAY", 2)):
+            db.session.add(ExamViolation(student_exam_id=se.id, violation_type=kind, severity="high",
+                                         timestamp=now + timedelta(minutes=minutes)))
+        db.session.commit()
+        return app, se.id
+
+
+def test_only_verdicts_since_calibration_count(attempt):
+    app, se_id = attempt
+    with app.app_context():
+        state = rehydrate_state(se_id, max_warnings=3)
+    assert state.warning_count == 1
+    assert not state.terminated
+    assert (state.baseline_yaw, state.baseline_cx) == (1.0, 320.0)